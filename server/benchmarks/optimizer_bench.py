@@ -0,0 +1,307 @@
+"""Benchmarks for ItineraryOptimizer on synthetic cities.
+
+Run from the server directory:
+
+    python -m benchmarks.optimizer_bench --out results.json
+    python -m benchmarks.optimizer_bench --sizes 5,50 --days 1,3 --compare results.json
+
+Every place resolves through an offline geocoder built from the generated
+coordinates, so runs never touch the network and are reproducible for a
+given seed. Tour lengths are compared with a minimum-spanning-tree lower
+bound (every route through a day's stops and the hotel is a spanning tree).
+Results are JSON keyed by benchmark, distribution, stops and days, so two
+files from different commits can be compared with --compare.
+"""
+import os
+import sys
+import copy
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from core.services import held_karp
+from core.services.distance_matrix import haversine_matrix
+from core.services.diversity import DiversityConstraints
+from core.services.geocode_cache import GeocodeCache
+from core.services.itinerary_optimizer import ItineraryOptimizer
+from core.services.travel_modes import TravelTimeCache
+from .synthetic import DISTRIBUTIONS, OfflineGeocoder, SyntheticCity
+
+BENCHMARKS = ('day_activities', 'day_route', 'itinerary')
+
+DEFAULT_SIZES = [5, 10, 25, 50, 100, 250, 500]
+DEFAULT_DAYS = [1, 3, 7, 14]
+
+
+def mst_length(coords: List[Tuple[float, float]]) -> float:
+    """Length in km of a minimum spanning tree over the points (Prim, O(n^2))"""
+    n = len(coords)
+    if n < 2:
+        return 0.0
+    matrix = haversine_matrix(coords)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = matrix[0].copy()
+    total = 0.0
+    for _ in range(n - 1):
+        candidates = np.where(in_tree, np.inf, best)
+        nxt = int(np.argmin(candidates))
+        total += float(candidates[nxt])
+        in_tree[nxt] = True
+        best = np.minimum(best, matrix[nxt])
+    return total
+
+
+def make_optimizer(city: SyntheticCity) -> ItineraryOptimizer:
+    return ItineraryOptimizer(
+        geocode_cache=GeocodeCache(':memory:'),
+        geocoder=OfflineGeocoder(),
+        local_geocoder=city.local_geocoder,
+        travel_time_cache=TravelTimeCache(),
+        route_workers=0,
+        # Keep every generated stop so each case routes the size it claims
+        diversity=DiversityConstraints(max_per_category=len(city.places))
+    )
+
+
+def day_bound(city: SyntheticCity, activities: List[Dict]) -> float:
+    coords = [city.coordinates(activity['location']) for activity in activities]
+    return mst_length([city.hotel_coords] + [point for point in coords if point])
+
+
+def run_day_activities(optimizer: ItineraryOptimizer, city: SyntheticCity, itinerary: Dict) -> Dict:
+    visited = set()
+    kept = 0
+    for day_key in sorted(itinerary):
+        kept += len(optimizer.optimize_day_activities(itinerary[day_key], visited, city.name))
+    return {'kept': kept}
+
+
+def run_day_route(optimizer: ItineraryOptimizer, city: SyntheticCity, itinerary: Dict) -> Dict:
+    tour = bound = 0.0
+    solvers: Dict[str, int] = {}
+    for day_key in sorted(itinerary):
+        routed = optimizer.optimize_day_route(itinerary[day_key], city.name, city.hotel, city.hotel)
+        stats = optimizer.last_route_stats
+        if stats:
+            tour += stats['final_length']
+            solvers[stats['solver']] = solvers.get(stats['solver'], 0) + 1
+        bound += day_bound(city, routed)
+    return {'tour_km': tour, 'lower_bound_km': bound, 'solvers': solvers}
+
+
+def run_itinerary(optimizer: ItineraryOptimizer, city: SyntheticCity, itinerary: Dict, regroup: bool = False) -> Dict:
+    result = optimizer.optimize_itinerary(itinerary, city.name, hotel=city.hotel, regroup_days=regroup)
+    tour = bound = 0.0
+    solvers: Dict[str, int] = {}
+    for day_key in sorted(itinerary):
+        stats = result.get(f"{day_key}_route_stats")
+        if stats:
+            tour += stats['final_length']
+            solvers[stats['solver']] = solvers.get(stats['solver'], 0) + 1
+        bound += day_bound(city, result.get(day_key, []))
+    return {'tour_km': tour, 'lower_bound_km': bound, 'solvers': solvers}
+
+
+RUNNERS: Dict[str, Callable[..., Dict]] = {
+    'day_activities': run_day_activities,
+    'day_route': run_day_route,
+    'itinerary': run_itinerary
+}
+
+
+def measure(benchmark: str, city: SyntheticCity, days: int, repeats: int, regroup: bool = False) -> Dict:
+    """Time one case cold (fresh optimizer and route memo) and record its peak memory"""
+    itinerary = city.itinerary(days)
+    extra = {'regroup': regroup} if benchmark == 'itinerary' else {}
+
+    def run() -> Tuple[float, Dict]:
+        held_karp.clear_cache()
+        optimizer = make_optimizer(city)
+        plan = copy.deepcopy(itinerary)
+        started = time.perf_counter()
+        outcome = RUNNERS[benchmark](optimizer, city, plan, **extra)
+        return time.perf_counter() - started, outcome
+
+    timings = []
+    outcome: Dict = {}
+    for _ in range(repeats):
+        elapsed, outcome = run()
+        timings.append(elapsed)
+
+    # Memory is traced in a separate run because tracemalloc slows execution down
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    record = {
+        'benchmark': benchmark,
+        'distribution': city.distribution,
+        'stops': len(city.places),
+        'days': days,
+        'repeats': repeats,
+        'wall_ms_min': round(min(timings) * 1000, 3),
+        'wall_ms_median': round(statistics.median(timings) * 1000, 3),
+        'peak_kib': round(peak / 1024, 1)
+    }
+    if 'tour_km' in outcome:
+        tour, bound = outcome['tour_km'], outcome['lower_bound_km']
+        record.update({
+            'tour_km': round(tour, 3),
+            'lower_bound_km': round(bound, 3),
+            'gap_pct': round((tour - bound) / bound * 100, 2) if bound else 0.0,
+            'solvers': outcome['solvers']
+        })
+    else:
+        record.update(outcome)
+    return record
+
+
+def run_benchmarks(
+    sizes: List[int],
+    days: List[int],
+    distributions: List[str],
+    benchmarks: List[str],
+    repeats: int = 3,
+    seed: int = 0,
+    regroup: bool = False,
+    progress: Optional[Callable[[Dict], None]] = None
+) -> List[Dict]:
+    results = []
+    for distribution in distributions:
+        for stops in sizes:
+            city = SyntheticCity(stops, distribution, seed=seed)
+            for day_count in days:
+                if day_count > stops:
+                    continue
+                for benchmark in benchmarks:
+                    record = measure(benchmark, city, day_count, repeats, regroup)
+                    results.append(record)
+                    if progress:
+                        progress(record)
+    return results
+
+
+def environment() -> Dict:
+    server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=server_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=server_dir, capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform()
+    }
+
+
+def case_key(record: Dict) -> Tuple:
+    return record['benchmark'], record['distribution'], record['stops'], record['days']
+
+
+def compare(baseline: Dict, current: Dict) -> List[Dict]:
+    """Per-case ratios of median wall time and tour gap against a baseline run"""
+    before = {case_key(record): record for record in baseline['results']}
+    rows = []
+    for record in current['results']:
+        old = before.get(case_key(record))
+        if old is None:
+            continue
+        row = {
+            'case': '/'.join(str(part) for part in case_key(record)),
+            'wall_ms': (old['wall_ms_median'], record['wall_ms_median']),
+            'speedup': round(old['wall_ms_median'] / record['wall_ms_median'], 2) if record['wall_ms_median'] else None
+        }
+        if 'gap_pct' in record and 'gap_pct' in old:
+            row['gap_pct'] = (old['gap_pct'], record['gap_pct'])
+        rows.append(row)
+    return rows
+
+
+def format_record(record: Dict) -> str:
+    line = (f"{record['benchmark']:<15} {record['distribution']:<10} stops={record['stops']:<4} days={record['days']:<3}"
+            f" median={record['wall_ms_median']:>10.2f} ms  peak={record['peak_kib']:>9.1f} KiB")
+    if 'gap_pct' in record:
+        line += f"  tour={record['tour_km']:.1f} km  gap={record['gap_pct']:.1f}%"
+    return line
+
+
+def parse_list(value: str, cast=str) -> List:
+    return [cast(part) for part in value.split(',') if part.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark ItineraryOptimizer on synthetic cities')
+    parser.add_argument('--sizes', type=lambda v: parse_list(v, int), default=DEFAULT_SIZES,
+                        help='Comma-separated total stops per trip')
+    parser.add_argument('--days', type=lambda v: parse_list(v, int), default=DEFAULT_DAYS,
+                        help='Comma-separated trip lengths in days')
+    parser.add_argument('--distributions', type=parse_list, default=list(DISTRIBUTIONS),
+                        help=f"Comma-separated spatial distributions ({', '.join(DISTRIBUTIONS)})")
+    parser.add_argument('--benchmarks', type=parse_list, default=list(BENCHMARKS),
+                        help=f"Comma-separated benchmarks ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--regroup', action='store_true', help='Regroup days by clustering in the itinerary benchmark')
+    parser.add_argument('--out', help='Write JSON results here instead of stdout')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    unknown += [name for name in args.distributions if name not in DISTRIBUTIONS]
+    if unknown:
+        parser.error(f"Unknown benchmark or distribution: {', '.join(unknown)}")
+
+    # Benchmarks measure cold runs and must not fill the persistent matrix store
+    os.environ['MATRIX_CACHE_DIR'] = ''
+
+    log = sys.stdout if args.out else sys.stderr
+    results = run_benchmarks(
+        args.sizes, args.days, args.distributions, args.benchmarks,
+        repeats=args.repeats, seed=args.seed, regroup=args.regroup,
+        progress=lambda record: print(format_record(record), file=log, flush=True)
+    )
+    report = {
+        'environment': environment(),
+        'config': {key: getattr(args, key) for key in ('sizes', 'days', 'distributions', 'benchmarks', 'repeats', 'seed', 'regroup')},
+        'results': results
+    }
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline['environment'].get('commit')}:", file=log)
+        for row in compare(baseline, report):
+            line = f"{row['case']:<40} {row['wall_ms'][0]:>10.2f} -> {row['wall_ms'][1]:>10.2f} ms  x{row['speedup']}"
+            if 'gap_pct' in row:
+                line += f"  gap {row['gap_pct'][0]:.1f}% -> {row['gap_pct'][1]:.1f}%"
+            print(line, file=log)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from math import cos, radians
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from core.services.local_geocoder import LocalGeocoder
+
+Coordinates = Tuple[float, float]
+
+DISTRIBUTIONS = ('uniform', 'clustered', 'corridor')
+
+# Name words cycle so places spread over the optimizer's categories
+CATEGORY_WORDS = ['Temple', 'Park', 'Market', 'Cafe', 'Cinema', 'Landmark']
+
+CITY_CENTER = (12.9716, 77.5946)
+
+KM_PER_DEGREE_LAT = 110.574
+
+
+class OfflineGeocoder:
+    """Geocoder that never touches the network; every place is known locally"""
+
+    def geocode(self, place: str, city: str, deadline: Optional[float] = None) -> Tuple[bool, Optional[Coordinates]]:
+        return True, None
+
+
+def offsets_km(
+    n: int,
+    distribution: str,
+    rng: np.random.Generator,
+    extent_km: float = 20.0,
+    clusters: int = 5
+) -> np.ndarray:
+    """(x, y) offsets in km from the city centre.
+
+    uniform spreads places over a square of side extent_km, clustered draws
+    them around a few neighbourhood centres and corridor strings them along
+    a road running through the city.
+    """
+    half = extent_km / 2
+    if distribution == 'uniform':
+        return rng.uniform(-half, half, size=(n, 2))
+    if distribution == 'clustered':
+        centres = rng.uniform(-half, half, size=(clusters, 2))
+        members = rng.integers(0, clusters, size=n)
+        return centres[members] + rng.normal(0, extent_km / 25, size=(n, 2))
+    if distribution == 'corridor':
+        along = rng.uniform(-half, half, size=n)
+        return np.stack([along, 0.3 * along + rng.normal(0, extent_km / 50, size=n)], axis=1)
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+
+class SyntheticCity:
+    """A made-up city with n places, a hotel at its centre and an offline geocoder"""
+
+    def __init__(
+        self,
+        n: int,
+        distribution: str = 'uniform',
+        seed: int = 0,
+        extent_km: float = 20.0,
+        clusters: int = 5,
+        name: str = 'Synthville'
+    ):
+        self.name = name
+        self.distribution = distribution
+        rng = np.random.default_rng(seed)
+        offsets = offsets_km(n, distribution, rng, extent_km, clusters)
+        lat0, lon0 = CITY_CENTER
+        km_per_degree_lon = KM_PER_DEGREE_LAT * cos(radians(lat0))
+
+        self.places: List[Dict] = []
+        for i, (x, y) in enumerate(offsets.tolist()):
+            label = f"Synthetic {CATEGORY_WORDS[i % len(CATEGORY_WORDS)]} {i}"
+            self.places.append({
+                'name': label,
+                'location': label,
+                'lat': lat0 + y / KM_PER_DEGREE_LAT,
+                'lon': lon0 + x / km_per_degree_lon
+            })
+        self.hotel = 'Synthetic Hotel'
+        self.hotel_coords = CITY_CENTER
+
+        self.local_geocoder = LocalGeocoder(dataset_path=None)
+        self.local_geocoder.add(self.hotel, name, self.hotel_coords)
+        for place in self.places:
+            self.local_geocoder.add(place['location'], name, (place['lat'], place['lon']))
+
+    def coordinates(self, location: str) -> Optional[Coordinates]:
+        return self.local_geocoder.lookup(location, self.name)
+
+    def itinerary(self, days: int) -> Dict[str, List[Dict]]:
+        """Split the places over days in generation order, like an unordered LLM plan"""
+        chunks = np.array_split(np.arange(len(self.places)), days)
+        return {
+            f"day_{day + 1}": [
+                {'name': self.places[i]['name'], 'location': self.places[i]['location']}
+                for i in chunk.tolist()
+            ]
+            for day, chunk in enumerate(chunks)
+        }
@@ -1,5 +1,13 @@
+import os
 from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Start the day routing pool before requests arrive, so it is created once per server process
+        workers = int(os.getenv('ROUTE_WORKERS', '0'))
+        if workers > 1:
+            from .services.parallel_routing import start_process_pool
+            start_process_pool(workers)
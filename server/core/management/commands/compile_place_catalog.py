@@ -0,0 +1,43 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from core.services.local_geocoder import get_local_geocoder
+from core.services.place_catalog import (
+    CATALOG_SOURCE_DIR, DEFAULT_CATALOG_DIR, catalog_key, compile_place_catalog, load_catalog_source
+)
+
+
+class Command(BaseCommand):
+    help = 'Compile alternative-place catalogs into memory-mapped arrays, one directory per city'
+
+    def add_arguments(self, parser):
+        parser.add_argument('cities', nargs='*', help='Cities to compile; defaults to every bundled catalog')
+        parser.add_argument('--source', help='Catalog JSON to compile instead of the bundled one (single city only)')
+        parser.add_argument('--out-dir', default=os.getenv('PLACE_CATALOG_DIR', DEFAULT_CATALOG_DIR))
+
+    def handle(self, *args, **options):
+        cities = options['cities'] or sorted(
+            name[:-len('.json')] for name in os.listdir(CATALOG_SOURCE_DIR) if name.endswith('.json')
+        )
+        if options['source'] and len(cities) != 1:
+            raise CommandError('--source needs exactly one city')
+
+        geocoder = get_local_geocoder()
+        for city in cities:
+            key = catalog_key(geocoder.normalize_city(city))
+            source = options['source'] or os.path.join(CATALOG_SOURCE_DIR, f"{key}.json")
+            if not os.path.exists(source):
+                raise CommandError(f"No catalog source for {city}: {source}")
+
+            places = load_catalog_source(source)
+            # Fill in coordinates the source does not carry from the offline index
+            for place in places:
+                if place.get('lat') is None or place.get('lon') is None:
+                    coords = geocoder.lookup(place.get('location', ''), city) or geocoder.lookup(place.get('name', ''), city)
+                    if coords:
+                        place['lat'], place['lon'] = coords
+
+            out_dir = os.path.join(options['out_dir'], key)
+            meta = compile_place_catalog(places, out_dir)
+            self.stdout.write(self.style.SUCCESS(
+                f"Compiled {meta['places']} places in {len(meta['categories'])} categories into {out_dir}"
+            ))
@@ -0,0 +1,21 @@
+import os
+from django.core.management.base import BaseCommand
+from core.services.road_network import DEFAULT_GRAPH_DIR, compile_road_graph
+
+
+class Command(BaseCommand):
+    help = 'Compile a road-graph extract (nodes and edges CSV) into memory-mapped arrays for a city'
+
+    def add_arguments(self, parser):
+        parser.add_argument('city', help='City the graph belongs to, e.g. Bangalore')
+        parser.add_argument('nodes_csv', help='CSV with columns id, lat, lon')
+        parser.add_argument('edges_csv', help='CSV with columns source, target, length_m, speed_kmh[, oneway]')
+        parser.add_argument('--out-dir', default=os.getenv('ROAD_GRAPH_DIR', DEFAULT_GRAPH_DIR))
+
+    def handle(self, *args, **options):
+        city_key = '_'.join(options['city'].lower().split())
+        out_dir = os.path.join(options['out_dir'], city_key)
+        meta = compile_road_graph(options['nodes_csv'], options['edges_csv'], out_dir)
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {meta['nodes']} nodes and {meta['edges']} edges into {out_dir}"
+        ))
@@ -0,0 +1,88 @@
+from typing import List, Optional
+import numpy as np
+
+MAX_ITERATIONS = 20
+
+
+def balanced_sizes(n: int, k: int) -> List[int]:
+    """Split n places into k days whose sizes differ by at most one"""
+    return [n // k + (1 if i < n % k else 0) for i in range(k)]
+
+
+def _initial_medoids(matrix: np.ndarray, k: int) -> List[int]:
+    """Deterministic k-medoids++ style seeding: most central point, then farthest-first"""
+    medoids = [int(np.argmin(matrix.sum(axis=1)))]
+    while len(medoids) < k:
+        nearest = matrix[:, medoids].min(axis=1)
+        nearest[medoids] = -1
+        medoids.append(int(np.argmax(nearest)))
+    return medoids
+
+
+def _assign(matrix: np.ndarray, medoids: List[int], sizes: List[int]) -> np.ndarray:
+    """Assign every point to a medoid while respecting each cluster's size.
+
+    Points with the most to lose from not getting their nearest medoid (the
+    largest regret) choose first.
+    """
+    costs = matrix[:, medoids]
+    preferences = np.argsort(costs, axis=1, kind='stable')
+    if len(medoids) > 1:
+        sorted_costs = np.take_along_axis(costs, preferences, axis=1)
+        regret = sorted_costs[:, 1] - sorted_costs[:, 0]
+    else:
+        regret = np.zeros(len(matrix))
+
+    remaining = list(sizes)
+    labels = np.full(len(matrix), -1, dtype=np.int64)
+    for point in np.argsort(-regret, kind='stable'):
+        for cluster in preferences[point]:
+            if remaining[cluster] > 0:
+                labels[point] = cluster
+                remaining[cluster] -= 1
+                break
+    return labels
+
+
+def cluster_days(matrix: np.ndarray, n_days: int, sizes: Optional[List[int]] = None) -> List[List[int]]:
+    """Group places into days with capacity-constrained k-medoids.
+
+    Returns one list of place indices per day. With explicit sizes, day i
+    gets exactly sizes[i] places. Otherwise days are balanced and ordered by
+    their lowest place index so the first day keeps the first place of the plan.
+    """
+    n = len(matrix)
+    if n == 0 or n_days <= 0:
+        return [[] for _ in range(max(n_days, 0))]
+    if sizes is not None:
+        return _cluster(matrix, list(sizes))
+
+    k = min(n_days, n)
+    clusters = _cluster(matrix, balanced_sizes(n, k))
+    clusters.sort(key=lambda members: members[0])
+    return clusters + [[] for _ in range(n_days - k)]
+
+
+def _cluster(matrix: np.ndarray, day_sizes: List[int]) -> List[List[int]]:
+    active = [day for day, size in enumerate(day_sizes) if size > 0]
+    k = len(active)
+    sizes = [day_sizes[day] for day in active]
+
+    medoids = _initial_medoids(matrix, k)
+    labels = _assign(matrix, medoids, sizes)
+    for _ in range(MAX_ITERATIONS):
+        new_medoids = []
+        for cluster in range(k):
+            members = np.nonzero(labels == cluster)[0]
+            within = matrix[np.ix_(members, members)].sum(axis=1)
+            new_medoids.append(int(members[np.argmin(within)]))
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+        labels = _assign(matrix, medoids, sizes)
+
+    clusters = [[] for _ in day_sizes]
+    for cluster, day in enumerate(active):
+        clusters[day] = sorted(np.nonzero(labels == cluster)[0].tolist())
+    return clusters
+
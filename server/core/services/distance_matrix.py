@@ -0,0 +1,44 @@
+import numpy as np
+from typing import Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+Coordinates = Tuple[float, float]
+
+
+def _to_radians(coords: Sequence[Coordinates]) -> np.ndarray:
+    points = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    return np.radians(points)
+
+
+def haversine_cross(origins: Sequence[Coordinates], destinations: Sequence[Coordinates]) -> np.ndarray:
+    """Great-circle distances in km from every origin to every destination"""
+    a = _to_radians(origins)
+    b = _to_radians(destinations)
+    lat1 = a[:, 0][:, None]
+    lat2 = b[:, 0][None, :]
+    dlat = lat2 - lat1
+    dlon = b[:, 1][None, :] - a[:, 1][:, None]
+
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def haversine_matrix(coords: Sequence[Coordinates]) -> np.ndarray:
+    """Symmetric matrix of all pairwise great-circle distances in km"""
+    matrix = haversine_cross(coords, coords)
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+def route_legs(matrix: np.ndarray, order: Sequence[int]) -> np.ndarray:
+    """Distances of each consecutive leg of a route through the matrix"""
+    order = np.asarray(order, dtype=np.intp)
+    if len(order) < 2:
+        return np.zeros(0)
+    return matrix[order[:-1], order[1:]]
+
+
+def route_length(matrix: np.ndarray, order: Sequence[int]) -> float:
+    """Total length of an open route through the matrix"""
+    return float(route_legs(matrix, order).sum())
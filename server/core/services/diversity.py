@@ -0,0 +1,133 @@
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+Coordinates = Tuple[float, float]
+
+
+class DiversityConstraints:
+    """Limits applied while selecting a trip's activities"""
+
+    def __init__(self, max_per_category: int = 2, min_distinct_categories: int = 0):
+        # Maximum number of places from the same category per day
+        self.max_per_category = max_per_category
+        # Distinct categories the whole trip should cover when alternatives allow it
+        self.min_distinct_categories = min_distinct_categories
+
+
+class DiversitySelector:
+    """Streams a trip's activities through the diversity rules in linear time.
+
+    Visited places, per-day category counters and trip-wide category counts
+    are updated incrementally. Each alternative pool has a cursor that only
+    moves forward, because a place skipped as visited stays visited for the
+    rest of the trip. Each activity therefore costs O(1) amortised plus a scan
+    over the small, fixed set of categories.
+    """
+
+    def __init__(
+        self,
+        alternatives: Dict[str, List[Dict]],
+        classify: Callable[[Dict], str],
+        identify: Callable[[Dict], str],
+        constraints: Optional[DiversityConstraints] = None,
+        visited: Optional[Set[str]] = None,
+        nearest: Optional[Callable[[str, Coordinates, Set[str]], Optional[Dict]]] = None,
+        on_substitute: Optional[Callable[[Dict, Dict, str], None]] = None
+    ):
+        self.alternatives = alternatives
+        self.classify = classify
+        self.identify = identify
+        self.constraints = constraints or DiversityConstraints()
+        self.visited = visited if visited is not None else set()
+        self.nearest = nearest
+        # Called with (original, substitute, reason) whenever an activity is replaced
+        self.on_substitute = on_substitute
+        self.cursors = {category: 0 for category in alternatives}
+        self.trip_categories: Counter = Counter()
+
+    def next_alternative(self, category: str, near: Optional[Coordinates] = None) -> Optional[Dict]:
+        """First unvisited alternative of a category, or the closest one to near"""
+        if category not in self.alternatives:
+            return None
+        if near and self.nearest:
+            place = self.nearest(category, near, self.visited)
+            if place:
+                return place
+        pool = self.alternatives[category]
+        cursor = self.cursors[category]
+        while cursor < len(pool) and self.identify(pool[cursor]) in self.visited:
+            cursor += 1
+        self.cursors[category] = cursor
+        return pool[cursor] if cursor < len(pool) else None
+
+    def select_day(self, activities: List[Dict], near: Optional[Coordinates] = None, remaining: int = 0) -> List[Dict]:
+        """Apply the rules to one day's activities.
+
+        remaining is the number of activities still to come on later days; it
+        lets the trip-wide minimum of distinct categories be met greedily.
+        """
+        selected = []
+        day_counts: Counter = Counter()
+        day_categories = set()
+        max_per_category = self.constraints.max_per_category
+        left = len(activities) + remaining
+
+        for activity in activities:
+            left -= 1
+            place_id = self.identify(activity)
+            category = self.classify(activity)
+
+            if place_id in self.visited:
+                # Already visited: swap in another place of the same category
+                place = None if category in day_categories else self.next_alternative(category, near)
+                if place:
+                    note = f"Alternative to {activity['name']} (previously visited)"
+                    self._add(selected, day_counts, activity, place, note, 'previously_visited')
+                    day_categories.add(category)
+                continue
+
+            missing = self.constraints.min_distinct_categories - len(self.trip_categories)
+            needs_new_category = missing > 0 and left < missing and category in self.trip_categories
+            if day_counts[category] >= max_per_category or needs_new_category:
+                # Too many of this category (or the trip lacks variety): pick another category
+                for alt_category in self.alternatives:
+                    if alt_category in day_categories or (needs_new_category and alt_category in self.trip_categories):
+                        continue
+                    place = self.next_alternative(alt_category, near)
+                    if place:
+                        reason = 'trip_variety' if needs_new_category else 'category_limit'
+                        self._add(selected, day_counts, activity, place, "Alternative activity for better variety", reason)
+                        day_categories.add(alt_category)
+                        break
+                else:
+                    if not needs_new_category:
+                        continue
+                    # No unseen category left to offer, so keep the original
+                    self._keep(selected, day_counts, day_categories, activity, place_id, category)
+                continue
+
+            self._keep(selected, day_counts, day_categories, activity, place_id, category)
+        return selected
+
+    def _keep(self, selected, day_counts, day_categories, activity, place_id, category):
+        activity['category'] = category
+        selected.append(activity)
+        self.visited.add(place_id)
+        day_counts[category] += 1
+        day_categories.add(category)
+        self.trip_categories[category] += 1
+
+    def _add(self, selected, day_counts, activity, place, note, reason):
+        new_activity = activity.copy()
+        new_activity.update({
+            'name': place['name'],
+            'location': place['location'],
+            'category': place['category'],
+            'note': note
+        })
+        selected.append(new_activity)
+        self.visited.add(self.identify(new_activity))
+        day_counts[place['category']] += 1
+        self.trip_categories[place['category']] += 1
+        if self.on_substitute:
+            self.on_substitute(activity, new_activity, reason)
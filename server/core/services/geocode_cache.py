@@ -0,0 +1,151 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+CacheKey = Tuple[str, str]
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'geocode_cache.sqlite3'
+)
+
+# Failed lookups are remembered, but retried once this many seconds have passed
+DEFAULT_FAILURE_TTL = 24 * 60 * 60
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a place or city name and collapse punctuation and whitespace"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def make_key(place: str, city: str) -> CacheKey:
+    """Build the normalized (place, city) key used by the cache"""
+    return (normalize_text(place), normalize_text(city))
+
+
+class GeocodeCache:
+    """Persistent geocode store backed by SQLite.
+
+    The database file is shared by every optimizer instance in a process and by
+    every worker process on the host. Failed lookups are stored as well so the
+    same unknown place is not sent to the geocoder on every plan.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, failure_ttl: int = DEFAULT_FAILURE_TTL):
+        self.path = path
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS geocode ('
+            ' place TEXT NOT NULL,'
+            ' city TEXT NOT NULL,'
+            ' lat REAL,'
+            ' lon REAL,'
+            ' updated_at REAL NOT NULL,'
+            ' PRIMARY KEY (place, city))'
+        )
+        self._conn.commit()
+
+    def lookup(self, place: str, city: str) -> Tuple[bool, Optional[Coordinates]]:
+        """Return (found, coordinates); coordinates is None for a remembered failure"""
+        key = make_key(place, city)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT lat, lon, updated_at FROM geocode WHERE place = ? AND city = ?', key
+            ).fetchone()
+        return self._decode(row)
+
+    def get(self, place: str, city: str) -> Optional[Coordinates]:
+        """Return cached coordinates, or None if unknown or a remembered failure"""
+        return self.lookup(place, city)[1]
+
+    def set(self, place: str, city: str, coords: Optional[Coordinates]):
+        """Store coordinates for a place; pass None to remember a failed lookup"""
+        self.set_many([(place, city, coords)])
+
+    def set_many(self, entries: Iterable[Tuple[str, str, Optional[Coordinates]]]):
+        """Store several lookups in a single transaction"""
+        now = time.time()
+        rows = []
+        for place, city, coords in entries:
+            lat, lon = coords if coords else (None, None)
+            rows.append(make_key(place, city) + (lat, lon, now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO geocode (place, city, lat, lon, updated_at) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[CacheKey, Optional[Coordinates]]:
+        """Look up several (place, city) pairs; only cached entries are returned"""
+        keys = list(dict.fromkeys(make_key(place, city) for place, city in pairs))
+        results = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    'SELECT lat, lon, updated_at FROM geocode WHERE place = ? AND city = ?', key
+                ).fetchone()
+                found, coords = self._decode(row)
+                if found:
+                    results[key] = coords
+        return results
+
+    def preload(self, entries: Iterable[Tuple[str, str, float, float]]):
+        """Bulk-load known coordinates, e.g. from a landmark dataset"""
+        self.set_many((place, city, (float(lat), float(lon))) for place, city, lat, lon in entries)
+
+    def entries(self, city: Optional[str] = None) -> Iterable[Tuple[str, str, float, float]]:
+        """Yield every successful (place, city, lat, lon) entry, optionally for one city"""
+        query = 'SELECT place, city, lat, lon FROM geocode WHERE lat IS NOT NULL'
+        params: Tuple = ()
+        if city is not None:
+            query += ' AND city = ?'
+            params = (normalize_text(city),)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return rows
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._conn.execute('DELETE FROM geocode')
+            self._conn.commit()
+
+    def _decode(self, row) -> Tuple[bool, Optional[Coordinates]]:
+        if row is None:
+            return False, None
+        lat, lon, updated_at = row
+        if lat is None or lon is None:
+            if time.time() - updated_at > self.failure_ttl:
+                return False, None
+            return True, None
+        return True, (lat, lon)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """Return the process-wide geocode cache, opening it on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                path = os.getenv('GEOCODE_CACHE_PATH', DEFAULT_CACHE_PATH)
+                logger.info(f"Opening geocode cache at {path}")
+                _shared_cache = GeocodeCache(path)
+    return _shared_cache
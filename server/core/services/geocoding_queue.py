@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+import requests
+from typing import Dict, Iterable, List, Optional, Tuple
+from .geocode_cache import GeocodeCache, CacheKey, Coordinates, DEFAULT_CACHE_PATH, make_key
+
+logger = logging.getLogger(__name__)
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+NOMINATIM_USER_AGENT = 'TravelPlanner/1.0'
+
+# Nominatim usage policy: an absolute maximum of one request per second
+DEFAULT_MIN_INTERVAL = 1.0
+# Seconds allowed for one request when no deadline is tighter
+DEFAULT_TIMEOUT = float(os.getenv('NOMINATIM_TIMEOUT', '10'))
+
+
+class RateLimiter:
+    """Global request rate limiter shared by every worker on the host.
+
+    The time of the next free request slot is kept in a SQLite table so that
+    separate gunicorn workers pointing at the same file queue behind each other.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, min_interval: float = DEFAULT_MIN_INTERVAL, name: str = 'nominatim'):
+        self.path = path
+        self.min_interval = min_interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS rate_limit (name TEXT PRIMARY KEY, next_slot REAL NOT NULL)')
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Block until this caller may send one request.
+
+        With a deadline (a time.perf_counter() value), gives up without taking
+        a slot and returns False when the next free slot comes after it.
+        """
+        if self.min_interval <= 0:
+            return True
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute('SELECT next_slot FROM rate_limit WHERE name = ?', (self.name,)).fetchone()
+                now = time.time()
+                slot = max(now, row[0]) if row else now
+                if deadline is not None and time.perf_counter() + (slot - now) >= deadline:
+                    self._conn.execute('ROLLBACK')
+                    return False
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO rate_limit (name, next_slot) VALUES (?, ?)',
+                    (self.name, slot + self.min_interval)
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        if slot > now:
+            time.sleep(slot - now)
+        return True
+
+
+class NominatimGeocoder:
+    """Nominatim (OpenStreetMap) client that respects the global rate limit"""
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, timeout: float = DEFAULT_TIMEOUT):
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+
+    def geocode(self, place: str, city: str, deadline: Optional[float] = None) -> Tuple[bool, Optional[Coordinates]]:
+        """Geocode a place.
+
+        Returns (definitive, coordinates). A definitive None means the geocoder
+        does not know the place; a non-definitive None is a transient failure
+        that should not be cached. With a deadline (a time.perf_counter()
+        value) neither the rate-limit wait nor the request runs past it.
+        """
+        try:
+            if self.rate_limiter and not self.rate_limiter.acquire(deadline):
+                return False, None
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.perf_counter())
+                if timeout <= 0:
+                    return False, None
+
+            params = {
+                'q': f"{place}, {city}",
+                'format': 'json',
+                'limit': 1
+            }
+            headers = {
+                'User-Agent': NOMINATIM_USER_AGENT
+            }
+
+            response = requests.get(NOMINATIM_URL, params=params, headers=headers, timeout=timeout)
+            if response.status_code != 200:
+                logger.warning(f"Geocoding {place} failed with status {response.status_code}")
+                return False, None
+
+            data = response.json()
+            if not data:
+                return True, None
+            return True, (float(data[0]['lat']), float(data[0]['lon']))
+
+        except Exception as e:
+            logger.error(f"Error getting coordinates for {place}: {str(e)}")
+            return False, None
+
+
+class GeocodingQueue:
+    """Collects every location an itinerary needs and geocodes them together.
+
+    Locations are de-duplicated by normalized (place, city) and checked against
+    the geocode cache in one pass; only the remaining ones go to the geocoder.
+    """
+
+    def __init__(self, cache: GeocodeCache, geocoder: NominatimGeocoder):
+        self.cache = cache
+        self.geocoder = geocoder
+        self.pending: Dict[CacheKey, Tuple[str, str]] = {}
+        self.skipped: List[CacheKey] = []
+        # Locations the geocoder failed on transiently (throttling, network errors)
+        self.failed: List[CacheKey] = []
+        # Outcome of the last resolve(): locations served by the cache and sent to the geocoder
+        self.cache_hits = 0
+        self.lookups = 0
+
+    def add(self, place: str, city: str) -> CacheKey:
+        """Queue a location and return the key its result will be stored under"""
+        key = make_key(place, city)
+        if place and key not in self.pending:
+            self.pending[key] = (place, city)
+        return key
+
+    def add_many(self, places: Iterable[str], city: str) -> List[CacheKey]:
+        """Queue several locations in the same city"""
+        return [self.add(place, city) for place in places]
+
+    def resolve(self, deadline: Optional[float] = None) -> Dict[CacheKey, Optional[Coordinates]]:
+        """Geocode every queued location and return the results by key.
+
+        Once the deadline (a time.perf_counter() value) has passed, remaining
+        cache misses are left out of the results and listed in self.skipped.
+        Lookups that fail transiently (throttling, network errors, or the next
+        rate-limit slot coming after the deadline) are left out as well and
+        listed in self.failed, so only definitive results are returned.
+        """
+        pending, self.pending = self.pending, {}
+        results = self.cache.get_many(pending.values())
+
+        misses = [(key, place, city) for key, (place, city) in pending.items() if key not in results]
+        if misses:
+            logger.info(f"Geocoding {len(misses)} of {len(pending)} locations")
+
+        self.skipped = []
+        self.failed = []
+        self.cache_hits = len(pending) - len(misses)
+        self.lookups = 0
+        for key, place, city in misses:
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.skipped.append(key)
+                continue
+            definitive, coords = self.geocoder.geocode(place, city, deadline)
+            self.lookups += 1
+            if not definitive:
+                self.failed.append(key)
+                continue
+            self.cache.set(place, city, coords)
+            results[key] = coords
+
+        return results
+
+
+_shared_geocoder = None
+_shared_geocoder_lock = threading.Lock()
+
+
+def get_nominatim_geocoder() -> NominatimGeocoder:
+    """Return the process-wide rate-limited Nominatim client"""
+    global _shared_geocoder
+    if _shared_geocoder is None:
+        with _shared_geocoder_lock:
+            if _shared_geocoder is None:
+                path = os.getenv('GEOCODE_CACHE_PATH', DEFAULT_CACHE_PATH)
+                min_interval = float(os.getenv('NOMINATIM_MIN_INTERVAL', DEFAULT_MIN_INTERVAL))
+                _shared_geocoder = NominatimGeocoder(RateLimiter(path, min_interval))
+    return _shared_geocoder
@@ -1,7 +1,8 @@
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from groq import Groq
 from .weather_service import WeatherService
 from .travel_service import TravelPlannerService
@@ -12,8 +13,35 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model settings shared by the blocking and streaming itinerary calls
+ITINERARY_COMPLETION = {
+    "model": "mixtral-8x7b-32768",
+    "temperature": 0.7,
+    "max_tokens": 2000
+}
+
+
+class Conversation:
+    """State of one chat: the question being asked and the preferences gathered so far"""
+
+    def __init__(self, state: str = "asking_destination", preferences: Optional[Dict] = None):
+        self.state = state
+        self.preferences = dict(preferences or {})
+
+
 class GroqService:
-    def __init__(self):
+    """Chat and itinerary generation on top of Groq.
+
+    Holds only clients and configuration, so one instance can serve many
+    conversations at once (see registry.get_groq_service); the state of a
+    conversation travels with each message as a Conversation.
+    """
+
+    def __init__(
+        self,
+        weather_service: Optional[WeatherService] = None,
+        travel_service: Optional[TravelPlannerService] = None
+    ):
         # Initialize API clients
         api_key = os.getenv('GROQ_API_KEY')
         if not api_key:
@@ -24,67 +52,84 @@ class GroqService:
             base_url="https://api.groq.com/openai/v1"
         )
         
-        self.weather_service = WeatherService()
-        self.travel_service = TravelPlannerService(os.getenv('RAPID_API_KEY'))  # Fix the environment variable name
-        
-        # Initialize conversation state
-        self.conversation_state = "asking_destination"
-        self.conversation_history = []
-        self.current_preferences = {}
+        self.weather_service = weather_service or WeatherService()
+        self.travel_service = travel_service or TravelPlannerService(os.getenv('RAPID_API_KEY'))  # Fix the environment variable name
 
     def generate_itinerary(self, preferences: Dict) -> Dict:
         """Generate a detailed itinerary using all available services."""
         try:
-            destination = preferences.get('destination')
-            days = int(preferences.get('days', 3))
-            interests = preferences.get('interests', [])
-            budget = preferences.get('budget', 'moderate')
-
-            # Get weather forecast
-            logger.info(f"Fetching weather for {destination}")
-            weather_data = self.weather_service.get_forecast(destination, days)
-
-            # Get travel recommendations
-            logger.info(f"Fetching travel recommendations for {destination}")
-            attractions = self.travel_service.get_attractions(destination)
-            restaurants = self.travel_service.get_restaurants(destination)
-
-            # Prepare context for Groq
-            context = {
-                "destination": destination,
-                "days": days,
-                "interests": interests,
-                "budget": budget,
-                "weather": weather_data,
-                "attractions": attractions[:5],  # Top 5 attractions
-                "restaurants": restaurants[:5],  # Top 5 restaurants
-            }
+            sources = self._itinerary_sources(preferences)
 
             # Generate itinerary using Groq
-            prompt = self._create_itinerary_prompt(context)
             response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a travel planning assistant that creates detailed, personalized itineraries."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="mixtral-8x7b-32768",
-                temperature=0.7,
-                max_tokens=2000
+                messages=self._itinerary_messages(preferences, sources),
+                **ITINERARY_COMPLETION
             )
 
             # Parse and format the response
             itinerary = response.choices[0].message.content
-            return {
-                "itinerary": itinerary,
-                "weather_data": weather_data,
-                "attractions": attractions,
-                "restaurants": restaurants
-            }
+            return dict(itinerary=itinerary, **sources)
 
         except Exception as e:
             logger.error(f"Error generating itinerary: {str(e)}")
             raise
 
+    def stream_itinerary(self, preferences: Dict) -> Iterator[Tuple[str, object]]:
+        """Generate an itinerary as it is written.
+
+        Yields ('status', 'fetching_sources') straight away, ('sources', sources)
+        once the forecast and recommendations are in, ('token', text) for each
+        piece of the reply as Groq streams it, then ('data', result) with the
+        same result generate_itinerary returns.
+        """
+        yield 'status', 'fetching_sources'
+        sources = self._itinerary_sources(preferences)
+        yield 'sources', sources
+        stream = self.client.chat.completions.create(
+            messages=self._itinerary_messages(preferences, sources),
+            stream=True,
+            **ITINERARY_COMPLETION
+        )
+        parts = []
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                yield 'token', text
+        yield 'data', dict(itinerary=''.join(parts), **sources)
+
+    def _itinerary_sources(self, preferences: Dict) -> Dict:
+        """Weather forecast and recommendations an itinerary is built from, fetched concurrently"""
+        destination = preferences.get('destination')
+        days = int(preferences.get('days', 3))
+
+        logger.info(f"Fetching weather and travel recommendations for {destination}")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            weather_data = pool.submit(self.weather_service.get_forecast, destination, days)
+            attractions = pool.submit(self.travel_service.get_attractions, destination)
+            restaurants = pool.submit(self.travel_service.get_restaurants, destination)
+            return {
+                "weather_data": weather_data.result(),
+                "attractions": attractions.result(),
+                "restaurants": restaurants.result()
+            }
+
+    def _itinerary_messages(self, preferences: Dict, sources: Dict) -> List[Dict]:
+        # Prepare context for Groq
+        context = {
+            "destination": preferences.get('destination'),
+            "days": int(preferences.get('days', 3)),
+            "interests": preferences.get('interests', []),
+            "budget": preferences.get('budget', 'moderate'),
+            "weather": sources["weather_data"],
+            "attractions": sources["attractions"][:5],  # Top 5 attractions
+            "restaurants": sources["restaurants"][:5],  # Top 5 restaurants
+        }
+        return [
+            {"role": "system", "content": "You are a travel planning assistant that creates detailed, personalized itineraries."},
+            {"role": "user", "content": self._create_itinerary_prompt(context)}
+        ]
+
     def _create_itinerary_prompt(self, context: Dict) -> str:
         """Create a detailed prompt for Groq using all available data."""
         weather_info = "\n".join([
@@ -131,31 +176,32 @@ Please create a day-by-day itinerary that:
 Format the response as a clear, easy-to-read itinerary with daily schedules.
 """
 
-    def process_message(self, message: str) -> Dict:
+    def process_message(self, message: str, conversation: Optional[Conversation] = None) -> Dict:
         """Process a user message and return the appropriate response."""
+        conversation = conversation or Conversation()
         try:
             # Update preferences based on message
-            self.current_preferences = self._update_preferences(message)
+            conversation.preferences = self._update_preferences(message, conversation)
             
             # Check if we have all required information
-            if self._has_all_required_info():
+            if self._has_all_required_info(conversation.preferences):
                 # Generate itinerary
-                itinerary_data = self.generate_itinerary(self.current_preferences)
-                self.conversation_state = "complete"
+                itinerary_data = self.generate_itinerary(conversation.preferences)
+                conversation.state = "complete"
                 return {
                     "reply": itinerary_data["itinerary"],
-                    "state": self.conversation_state,
+                    "state": conversation.state,
                     "data": itinerary_data,
-                    "preferences": self.current_preferences
+                    "preferences": conversation.preferences
                 }
             else:
                 # Get next question
-                next_question = self._get_next_question()
+                next_question = self._get_next_question(conversation.state)
                 return {
                     "reply": next_question,
-                    "state": self.conversation_state,
+                    "state": conversation.state,
                     "data": {},
-                    "preferences": self.current_preferences
+                    "preferences": conversation.preferences
                 }
 
         except Exception as e:
@@ -164,46 +210,92 @@ Format the response as a clear, easy-to-read itinerary with daily schedules.
                 "reply": "I apologize, but I encountered an error. Please try again.",
                 "state": "error",
                 "data": {},
-                "preferences": self.current_preferences
+                "preferences": conversation.preferences
+            }
+
+    def stream_message(self, message: str, conversation: Optional[Conversation] = None) -> Iterator[Tuple[str, Dict]]:
+        """Streaming process_message: yields (event, payload) pairs.
+
+        Once every preference is known a 'status' event goes out at once, a
+        'sources' event follows with the forecast and recommendations, and the
+        itinerary is relayed as 'token' events while Groq writes it. The last
+        event is 'done' with the same payload process_message returns, or
+        'error' if anything failed.
+        """
+        conversation = conversation or Conversation()
+        try:
+            conversation.preferences = self._update_preferences(message, conversation)
+            if not self._has_all_required_info(conversation.preferences):
+                yield 'done', {
+                    "reply": self._get_next_question(conversation.state),
+                    "state": conversation.state,
+                    "data": {},
+                    "preferences": conversation.preferences
+                }
+                return
+
+            for event, payload in self.stream_itinerary(conversation.preferences):
+                if event == 'token':
+                    yield 'token', {"text": payload}
+                elif event == 'status':
+                    yield 'status', {"stage": payload}
+                elif event == 'sources':
+                    yield 'sources', payload
+                else:
+                    conversation.state = "complete"
+                    yield 'done', {
+                        "reply": payload["itinerary"],
+                        "state": conversation.state,
+                        "data": payload,
+                        "preferences": conversation.preferences
+                    }
+
+        except Exception as e:
+            logger.error(f"Error streaming message: {str(e)}")
+            yield 'error', {
+                "reply": "I apologize, but I encountered an error. Please try again.",
+                "state": "error",
+                "data": {},
+                "preferences": conversation.preferences
             }
 
-    def _update_preferences(self, message: str) -> Dict:
+    def _update_preferences(self, message: str, conversation: Conversation) -> Dict:
         """Update preferences based on user message and current state."""
-        preferences = self.current_preferences.copy()
+        preferences = conversation.preferences.copy()
         
-        if self.conversation_state == "asking_destination":
+        if conversation.state == "asking_destination":
             preferences["destination"] = message.strip()
-            self.conversation_state = "asking_duration"
+            conversation.state = "asking_duration"
         
-        elif self.conversation_state == "asking_duration":
+        elif conversation.state == "asking_duration":
             try:
                 days = int(''.join(filter(str.isdigit, message)))
                 preferences["days"] = days
-                self.conversation_state = "asking_interests"
+                conversation.state = "asking_interests"
             except ValueError:
                 preferences["days"] = 3  # Default to 3 days
                 
-        elif self.conversation_state == "asking_interests":
+        elif conversation.state == "asking_interests":
             interests = [interest.strip().lower() for interest in message.split(',')]
             preferences["interests"] = interests
-            self.conversation_state = "asking_budget"
+            conversation.state = "asking_budget"
             
-        elif self.conversation_state == "asking_budget":
+        elif conversation.state == "asking_budget":
             budget = message.strip().lower()
             if budget in ['budget', 'moderate', 'luxury']:
                 preferences["budget"] = budget
             else:
                 preferences["budget"] = 'moderate'  # Default to moderate
-            self.conversation_state = "generating_itinerary"
+            conversation.state = "generating_itinerary"
             
         return preferences
 
-    def _has_all_required_info(self) -> bool:
+    def _has_all_required_info(self, preferences: Dict) -> bool:
         """Check if we have all required information to generate an itinerary."""
         required_fields = ['destination', 'days', 'interests', 'budget']
-        return all(field in self.current_preferences for field in required_fields)
+        return all(field in preferences for field in required_fields)
 
-    def _get_next_question(self) -> str:
+    def _get_next_question(self, state: str) -> str:
         """Get the next question based on current state."""
         questions = {
             "asking_destination": "Where would you like to go?",
@@ -212,4 +304,4 @@ Format the response as a clear, easy-to-read itinerary with daily schedules.
             "asking_budget": "What's your budget level? (budget/moderate/luxury)",
             "generating_itinerary": "Great! Let me create your personalized itinerary..."
         }
-        return questions.get(self.conversation_state, "What else would you like to know?")
+        return questions.get(state, "What else would you like to know?")
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Bitmask DP grows as 2^n * n^2; above this many stops the heuristic is used
+EXACT_SOLVER_MAX_STOPS = 12
+
+CACHE_SIZE = 512
+
+_cache: 'OrderedDict[str, Tuple[List[int], float]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def estimated_seconds(n: int) -> float:
+    """Conservative estimate of the time held_karp_path needs for n nodes"""
+    m = max(n - 1, 0)
+    return 0.0005 + (1 << m) * m * m * 2.5e-8
+
+
+def matrix_key(matrix: np.ndarray, start: int, end: Optional[int]) -> str:
+    """Content hash identifying a routing problem"""
+    digest = hashlib.sha1(np.ascontiguousarray(matrix, dtype=np.float64).tobytes())
+    digest.update(f"{matrix.shape}|{start}|{end}".encode())
+    return digest.hexdigest()
+
+
+def held_karp_path(matrix: np.ndarray, start: int = 0, end: Optional[int] = None) -> Tuple[List[int], float]:
+    """Exact shortest open path through every node of the matrix.
+
+    The path begins at start and, if given, finishes at end. Results are
+    memoized by the content hash of the matrix, so identical days are solved
+    once. The DP is vectorized per popcount layer: all subsets of the same size
+    are relaxed together for each possible last stop.
+    """
+    D = np.asarray(matrix, dtype=np.float64)
+    key = matrix_key(D, start, end)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            route, cost = _cache[key]
+            return list(route), cost
+
+    route, cost = _solve(D, start, end)
+
+    with _cache_lock:
+        _cache[key] = (route, cost)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return list(route), cost
+
+
+def _solve(D: np.ndarray, start: int, end: Optional[int]) -> Tuple[List[int], float]:
+    n = len(D)
+    tail = [end] if end is not None and end != start else []
+    others = [i for i in range(n) if i != start and i not in tail]
+    m = len(others)
+
+    if m == 0:
+        route = [start] + tail
+        return route, float(sum(D[a, b] for a, b in zip(route, route[1:])))
+
+    sub = D[np.ix_(others, others)]
+    size = 1 << m
+    dp = np.full((size, m), np.inf)
+    parent = np.full((size, m), -1, dtype=np.int64)
+    for j in range(m):
+        dp[1 << j, j] = D[start, others[j]]
+
+    masks = np.arange(size)
+    popcount = np.zeros(size, dtype=np.int64)
+    for bit in range(m):
+        popcount += (masks >> bit) & 1
+
+    for k in range(2, m + 1):
+        layer = masks[popcount == k]
+        for j in range(m):
+            bit = 1 << j
+            rows = layer[(layer & bit) != 0]
+            # candidates[r, i] = cost of reaching i through rows[r] without j, then going to j
+            candidates = dp[rows ^ bit] + sub[:, j]
+            best = np.argmin(candidates, axis=1)
+            dp[rows, j] = candidates[np.arange(len(rows)), best]
+            parent[rows, j] = best
+
+    full = size - 1
+    final = dp[full] + (D[others, end] if tail else 0.0)
+    j = int(np.argmin(final))
+    cost = float(final[j])
+
+    order = []
+    mask = full
+    while j != -1:
+        order.append(others[j])
+        previous = int(parent[mask, j])
+        mask ^= 1 << j
+        j = previous
+
+    return [start] + order[::-1] + tail, cost
+
+
+def clear_cache():
+    """Forget every memoized solution"""
+    with _cache_lock:
+        _cache.clear()
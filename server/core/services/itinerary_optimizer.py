@@ -1,52 +1,83 @@
-import requests
+import os
+import time
 from typing import List, Dict, Set, Tuple, Optional
 from math import radians, sin, cos, sqrt, atan2
-import itertools
-from collections import defaultdict
+from contextlib import nullcontext
+from functools import partial
+import numpy as np
+from .distance_matrix import haversine_cross, haversine_matrix, route_length
+from .held_karp import EXACT_SOLVER_MAX_STOPS, estimated_seconds
+from .route_solver import nearest_neighbor_route, solve_route
+from .parallel_routing import ParallelDayRouter
+from .day_clustering import balanced_sizes, cluster_days
+from .scheduler import DayScheduler
+from .road_network import RoadNetwork, get_road_network
+from .matrix_store import MatrixStore, get_matrix_store
+from .geocode_cache import GeocodeCache, get_geocode_cache, make_key, normalize_text
+from .geocoding_queue import GeocodingQueue, NominatimGeocoder, get_nominatim_geocoder
+from .local_geocoder import LocalGeocoder, get_local_geocoder
+from .spatial_index import PlaceIndex
+from .diversity import DiversityConstraints, DiversitySelector
+from .place_catalog import EMPTY_CATALOG, get_place_catalog
+from .travel_modes import PROFILES, TravelTimeCache, get_travel_time_cache, mode_time_matrix, resolve_mode
+from .optimizer_trace import OptimizerTrace
+from .trip_assignment import Candidate, TripAssigner
+from .travel_service import is_bad_weather
 
 class ItineraryOptimizer:
-    def __init__(self):
+    # Assumed travel time to or from a place that could not be geocoded
+    UNKNOWN_TRAVEL_MINUTES = 15
+    # Share of a deadline kept back for scheduling and travel-time annotation
+    DEADLINE_RESERVE = 0.1
+
+    def __init__(
+        self,
+        geocode_cache: Optional[GeocodeCache] = None,
+        geocoder: Optional[NominatimGeocoder] = None,
+        local_geocoder: Optional[LocalGeocoder] = None,
+        route_time_budget: float = 0.05,
+        exact_route_max_stops: int = EXACT_SOLVER_MAX_STOPS,
+        road_network: Optional[RoadNetwork] = None,
+        transport_mode: Optional[str] = None,
+        travel_time_cache: Optional[TravelTimeCache] = None,
+        route_workers: Optional[int] = None,
+        city: Optional[str] = None,
+        diversity: Optional[DiversityConstraints] = None
+    ):
+        self.geocode_cache = geocode_cache or get_geocode_cache()
+        self.geocoder = geocoder or get_nominatim_geocoder()
+        self.local_geocoder = local_geocoder or get_local_geocoder()
+        # Seconds of local search allowed per day route
+        self.route_time_budget = route_time_budget
+        # Days with at most this many stops are solved exactly
+        self.exact_route_max_stops = exact_route_max_stops
+        # Road graph for travel times; looked up per city when not given
+        self.road_network = road_network
+        # Travel profile used for routing and travel times (see travel_modes)
+        self.transport_mode = resolve_mode(transport_mode)
+        self.travel_time_cache = travel_time_cache or get_travel_time_cache()
+        # Processes used to route days in parallel; 0 or 1 routes in this process
+        self.route_workers = route_workers if route_workers is not None else int(os.getenv('ROUTE_WORKERS', '0'))
+        self.last_route_stats = None
+        # perf_counter() time after which optimize_itinerary stops geocoding and improving routes
+        self.deadline = None
+        self.skipped_geocodes = 0
+        # Set only while a traced optimize_itinerary call runs
+        self.trace: Optional[OptimizerTrace] = None
         self.visited_places = set()
+        # Only definitive results are memoized; transient failures are kept
+        # for the current call so a throttled place is not retried within it
         self.place_coordinates = {}
+        self.unresolved_places = set()
         self.place_categories = {}
         self.category_counts = {}
-        self.alternative_places = {
-            'cultural': [
-                {'name': 'ISKCON Temple', 'location': 'Hare Krishna Hill, Rajajinagar', 'category': 'cultural'},
-                {'name': 'Bull Temple', 'location': 'Basavanagudi', 'category': 'cultural'},
-                {'name': 'Bangalore Palace', 'location': 'Palace Road', 'category': 'cultural'},
-                {'name': 'Tipu Sultan Summer Palace', 'location': 'Albert Victor Road', 'category': 'cultural'},
-                {'name': 'St. Mary\'s Basilica', 'location': 'Shivajinagar', 'category': 'cultural'}
-            ],
-            'nature': [
-                {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh', 'category': 'nature'},
-                {'name': 'Cubbon Park', 'location': 'Cubbon Park', 'category': 'nature'},
-                {'name': 'Bannerghatta National Park', 'location': 'Bannerghatta Road', 'category': 'nature'},
-                {'name': 'Ulsoor Lake', 'location': 'Ulsoor', 'category': 'nature'},
-                {'name': 'Hebbal Lake', 'location': 'Hebbal', 'category': 'nature'}
-            ],
-            'shopping': [
-                {'name': 'Commercial Street', 'location': 'Commercial Street', 'category': 'shopping'},
-                {'name': 'Brigade Road', 'location': 'Brigade Road', 'category': 'shopping'},
-                {'name': 'UB City Mall', 'location': 'Vittal Mallya Road', 'category': 'shopping'},
-                {'name': 'Phoenix Marketcity', 'location': 'Whitefield', 'category': 'shopping'},
-                {'name': 'Mantri Square Mall', 'location': 'Malleswaram', 'category': 'shopping'}
-            ],
-            'dining': [
-                {'name': 'MTR Restaurant', 'location': 'Lalbagh Road', 'category': 'dining'},
-                {'name': 'Vidyarthi Bhavan', 'location': 'Gandhi Bazaar', 'category': 'dining'},
-                {'name': 'The Only Place', 'location': 'Museum Road', 'category': 'dining'},
-                {'name': 'Mavalli Tiffin Room', 'location': 'Lalbagh Road', 'category': 'dining'},
-                {'name': 'Koshy\'s', 'location': 'St. Marks Road', 'category': 'dining'}
-            ],
-            'entertainment': [
-                {'name': 'Innovative Film City', 'location': 'Bidadi', 'category': 'entertainment'},
-                {'name': 'Wonderla Amusement Park', 'location': 'Mysore Road', 'category': 'entertainment'},
-                {'name': 'HAL Aerospace Museum', 'location': 'Old Airport Road', 'category': 'entertainment'},
-                {'name': 'National Gallery of Modern Art', 'location': 'Palace Road', 'category': 'entertainment'},
-                {'name': 'Visvesvaraya Industrial Museum', 'location': 'Kasturba Road', 'category': 'entertainment'}
-            ]
-        }
+        # Per-day and per-trip variety rules for activity selection
+        self.diversity = diversity or DiversityConstraints()
+        # Alternative places come from the catalog of the city being planned
+        self.catalog = EMPTY_CATALOG
+        self.alternative_places = {}
+        if city:
+            self.use_catalog(city)
 
     def haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate the distance between two points on Earth using Haversine formula"""
@@ -59,43 +90,94 @@ class ItineraryOptimizer:
         a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
         c = 2 * atan2(sqrt(a), sqrt(1-a))
         return R * c
+
+    def distance_matrix(self, coords: List[Tuple[float, float]]) -> np.ndarray:
+        """Compute all pairwise distances (km) for a list of coordinates in one pass"""
+        return haversine_matrix(coords)
+
+    def place_id(self, location: str) -> str:
+        """Canonical ID of a location within its city's matrix store"""
+        return normalize_text(location)
+
+    def get_matrix_store(self, city: str) -> Optional[MatrixStore]:
+        return get_matrix_store(city)
+
+    def place_distance_matrix(self, coords: List[Tuple[float, float]], city: str, ids: Optional[List[str]] = None) -> np.ndarray:
+        """Distances (km) between places, read from the city's matrix store when IDs are known"""
+        store = self.get_matrix_store(city) if ids else None
+        if store is None:
+            return self.distance_matrix(coords)
+        return store.get('distance', ids, coords, haversine_cross)
         
     def get_coordinates(self, place: str, city: str) -> Tuple[float, float]:
         """Get latitude and longitude for a place using geocoding"""
-        if place in self.place_coordinates:
-            return self.place_coordinates[place]
-            
-        try:
-            # Format the search query
-            search_query = f"{place}, {city}"
-            
-            # Use Nominatim API (OpenStreetMap) for geocoding
-            url = f"https://nominatim.openstreetmap.org/search"
-            params = {
-                'q': search_query,
-                'format': 'json',
-                'limit': 1
-            }
-            headers = {
-                'User-Agent': 'TravelPlanner/1.0'
-            }
-            
-            response = requests.get(url, params=params, headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    lat = float(data[0]['lat'])
-                    lon = float(data[0]['lon'])
-                    self.place_coordinates[place] = (lat, lon)
-                    return (lat, lon)
-            
-            # Return None if geocoding fails
+        key = make_key(place, city)
+        if key in self.place_coordinates:
+            if self.trace is not None:
+                self.trace.count('geocode_memo_hits')
+            return self.place_coordinates[key]
+        if key in self.unresolved_places:
             return None
-            
-        except Exception as e:
-            print(f"Error getting coordinates for {place}: {str(e)}")
+
+        # Known landmarks resolve from the offline index
+        coords = self.local_geocoder.lookup(place, city)
+        if coords:
+            if self.trace is not None:
+                self.trace.count('geocode_local_hits')
+            self.place_coordinates[key] = coords
+            return coords
+
+        # Check the shared geocode cache before going to the network
+        found, coords = self.geocode_cache.lookup(place, city)
+        if found:
+            if self.trace is not None:
+                self.trace.count('geocode_cache_hits')
+            self.place_coordinates[key] = coords
+            return coords
+
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            # Out of time: treat the place as unlocated without remembering that
+            self.skipped_geocodes += 1
             return None
-            
+
+        if self.trace is not None:
+            self.trace.count('geocode_lookups')
+        definitive, coords = self.geocoder.geocode(place, city, self.deadline)
+        if not definitive:
+            self.unresolved_places.add(key)
+            if self.deadline is not None:
+                self.skipped_geocodes += 1
+        else:
+            # Remember places the geocoder does not know about as well
+            self.place_coordinates[key] = coords
+            self.geocode_cache.set(place, city, coords)
+            if coords:
+                self.local_geocoder.add(place, city, coords)
+        return coords
+
+    def prefetch_coordinates(self, places: List[str], city: str):
+        """Geocode a batch of locations up front, one lookup per unique place"""
+        queue = GeocodingQueue(self.geocode_cache, self.geocoder)
+        local_hits = 0
+        for place in places:
+            key = make_key(place, city)
+            if not place or key in self.place_coordinates or key in self.unresolved_places:
+                continue
+            coords = self.local_geocoder.lookup(place, city)
+            if coords:
+                self.place_coordinates[key] = coords
+                local_hits += 1
+            else:
+                queue.add(place, city)
+        for key, coords in queue.resolve(self.deadline).items():
+            self.place_coordinates[key] = coords
+        self.unresolved_places.update(queue.failed)
+        self.skipped_geocodes += len(queue.skipped) + (len(queue.failed) if self.deadline is not None else 0)
+        if self.trace is not None:
+            self.trace.count('geocode_local_hits', local_hits)
+            self.trace.count('geocode_cache_hits', queue.cache_hits)
+            self.trace.count('geocode_lookups', queue.lookups)
+
     def get_place_identifier(self, place: Dict) -> str:
         """Generate a unique identifier for a place"""
         return f"{place.get('name', '')}|{place.get('location', '')}".lower()
@@ -117,79 +199,152 @@ class ItineraryOptimizer:
         
         return 'other'
 
-    def get_alternative_place(self, category: str, visited_places: Set[str], day_categories: Set[str]) -> Optional[Dict]:
-        """Get an alternative place from the same category that hasn't been visited"""
+    def use_catalog(self, city: str):
+        """Switch alternative places to the catalog for a city"""
+        self.catalog = get_place_catalog(self.local_geocoder.normalize_city(city))
+        self.alternative_places = self.catalog.as_dict()
+
+    def get_alternative_index(self) -> PlaceIndex:
+        """Spatial index over the located places of the current catalog"""
+        return self.catalog.spatial_index(self.get_place_identifier)
+
+    def get_alternative_place(
+        self,
+        category: str,
+        visited_places: Set[str],
+        day_categories: Set[str],
+        near: Optional[Tuple[float, float]] = None,
+        city: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Get an alternative place from the same category that hasn't been visited.
+
+        Given a point and city, the closest unvisited alternative to that
+        point is chosen so the substitute stays near the rest of the day.
+        """
+        if city:
+            self.use_catalog(city)
         if category not in self.alternative_places:
             return None
-        
+        if category in day_categories:
+            return None
+
+        if near and city:
+            place = self.get_alternative_index().nearest(category, near, visited_places)
+            if place:
+                return place
+
         # Try to find a place that hasn't been visited
         for place in self.alternative_places[category]:
             place_id = self.get_place_identifier(place)
-            if place_id not in visited_places and category not in day_categories:
+            if place_id not in visited_places:
                 return place
         return None
 
-    def optimize_day_activities(self, activities: List[Dict], visited_places: Set[str]) -> List[Dict]:
-        """Optimize a single day's activities for variety and uniqueness"""
-        optimized = []
-        day_categories = set()
-        max_per_category = 2  # Maximum number of places from the same category per day
-        
-        for activity in activities:
-            place_id = self.get_place_identifier(activity)
-            category = self.get_place_category(activity)
-            
-            # Skip if we've already visited this place
-            if place_id in visited_places:
-                # Try to find an alternative
-                alt_place = self.get_alternative_place(category, visited_places, day_categories)
-                if alt_place:
-                    new_activity = activity.copy()
-                    new_activity.update({
-                        'name': alt_place['name'],
-                        'location': alt_place['location'],
-                        'category': alt_place['category'],
-                        'note': f"Alternative to {activity['name']} (previously visited)"
-                    })
-                    optimized.append(new_activity)
-                    visited_places.add(self.get_place_identifier(new_activity))
-                    day_categories.add(category)
-                continue
-            
-            # Check if we've reached the category limit for this day
-            category_count = sum(1 for act in optimized if self.get_place_category(act) == category)
-            if category_count >= max_per_category:
-                # Try to find an alternative from a different category
-                for alt_category in self.alternative_places.keys():
-                    if alt_category not in day_categories:
-                        alt_place = self.get_alternative_place(alt_category, visited_places, day_categories)
-                        if alt_place:
-                            new_activity = activity.copy()
-                            new_activity.update({
-                                'name': alt_place['name'],
-                                'location': alt_place['location'],
-                                'category': alt_place['category'],
-                                'note': f"Alternative activity for better variety"
-                            })
-                            optimized.append(new_activity)
-                            visited_places.add(self.get_place_identifier(new_activity))
-                            day_categories.add(alt_category)
-                            break
-                continue
-            
-            # Add the original activity
-            activity['category'] = category
-            optimized.append(activity)
-            visited_places.add(place_id)
-            day_categories.add(category)
-        
-        return optimized
+    def day_anchor(self, activities: List[Dict], city: str) -> Optional[Tuple[float, float]]:
+        """Centre of the day's already geocoded places, without any new lookups"""
+        coords = [self.place_coordinates.get(make_key(a.get('location', ''), city)) for a in activities]
+        coords = [c for c in coords if c]
+        if not coords:
+            return None
+        lat, lon = np.mean(np.asarray(coords, dtype=np.float64), axis=0)
+        return (float(lat), float(lon))
 
-    def optimize_day_route(self, places: List[Dict], city: str) -> List[Dict]:
-        """Optimize the route for a day's activities using TSP approach"""
-        if not places:
-            return places
-            
+    def diversity_selector(self, visited_places: Set[str], city: Optional[str] = None) -> DiversitySelector:
+        """Selector applying the diversity constraints over this optimizer's alternatives"""
+        if city:
+            self.use_catalog(city)
+        return DiversitySelector(
+            self.alternative_places,
+            self.get_place_category,
+            self.get_place_identifier,
+            self.diversity,
+            visited_places,
+            self.get_alternative_index().nearest if city else None
+        )
+
+    def optimize_day_activities(self, activities: List[Dict], visited_places: Set[str], city: Optional[str] = None) -> List[Dict]:
+        """Optimize a single day's activities for variety and uniqueness.
+
+        With a city, substitutes come from that city's catalog and are picked
+        closest to the day's other places.
+        """
+        selector = self.diversity_selector(visited_places, city)
+        return selector.select_day(activities, self.day_anchor(activities, city) if city else None)
+
+    def assignment_candidates(self, day_activities: Dict[str, List[Dict]], city: str) -> List[Candidate]:
+        """Every planned place once, followed by catalog alternatives not already planned"""
+        candidates = []
+        seen = set()
+        for day, activities in enumerate(day_activities.values()):
+            for activity in activities:
+                place_id = self.get_place_identifier(activity)
+                if place_id in seen:
+                    continue
+                seen.add(place_id)
+                coords = self.place_coordinates.get(make_key(activity.get('location', ''), city))
+                candidates.append(Candidate(activity, self.get_place_category(activity), coords, day))
+
+        # Enough alternatives per category to fill every day up to its category cap
+        per_category = len(day_activities) * self.diversity.max_per_category
+        catalog_coords = np.asarray(self.catalog.coords)
+        for category, (start, end) in self.catalog.categories.items():
+            added = 0
+            for i, place in zip(range(start, end), self.alternative_places.get(category, [])):
+                if added >= per_category:
+                    break
+                if self.get_place_identifier(place) in seen:
+                    continue
+                coords = tuple(catalog_coords[i].tolist()) if np.isfinite(catalog_coords[i]).all() else None
+                candidates.append(Candidate(place, category, coords, alternative=True))
+                added += 1
+        return candidates
+
+    def assign_days(self, itinerary: Dict, day_keys: List[str], city: str) -> Dict[str, List[Dict]]:
+        """Choose every day's places in one global min-cost-flow solve.
+
+        Each day keeps its number of activities. Duplicates are planned once
+        and the freed slots go to catalog alternatives. Places are spread so
+        that ratings, category balance, weather and distance to the day's
+        other places are traded off across the whole trip at once.
+        """
+        day_activities = {day_key: itinerary.get(day_key, []) for day_key in day_keys}
+        candidates = self.assignment_candidates(day_activities, city)
+        slots = [len(activities) for activities in day_activities.values()]
+        bad_weather = [is_bad_weather(itinerary.get(f"{day_key}_weather")) for day_key in day_keys]
+        assigned = TripAssigner(max_per_category=self.diversity.max_per_category).assign(candidates, slots, bad_weather)
+
+        result = {}
+        for day_key, indices in zip(day_keys, assigned):
+            activities = []
+            for i in indices:
+                candidate = candidates[i]
+                if candidate.alternative:
+                    activity = {
+                        'name': candidate.place['name'],
+                        'location': candidate.place['location'],
+                        'note': 'Suggested to balance the trip'
+                    }
+                else:
+                    activity = candidate.place
+                activity['category'] = candidate.category
+                activities.append(activity)
+            result[day_key] = activities
+        if self.trace is not None:
+            self.trace.count('assigned_alternatives', sum(candidates[i].alternative for day in assigned for i in day))
+        return result
+
+    def route_problem(
+        self,
+        places: List[Dict],
+        city: str,
+        start_location: Optional[str] = None,
+        end_location: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict], np.ndarray, Optional[int], Optional[int]]]:
+        """Build a day's routing problem as (located places, cost matrix, start, end).
+
+        Anchor locations are appended after the places. Returns None when
+        fewer than two places have coordinates.
+        """
         # Get coordinates for all places
         place_coords = []
         for place in places:
@@ -200,73 +355,404 @@ class ItineraryOptimizer:
                     place_coords.append((place, coords))
         
         if len(place_coords) <= 1:
+            return None
+
+        coords = [c for _, c in place_coords]
+        ids = [self.place_id(place.get('location', '')) for place, _ in place_coords]
+        start_coords = self.get_coordinates(start_location, city) if start_location else None
+        end_coords = self.get_coordinates(end_location, city) if end_location else None
+        start = None
+        end = None
+        if start_coords:
+            start = len(coords)
+            coords.append(start_coords)
+            ids.append(self.place_id(start_location))
+        if end_coords:
+            end = len(coords)
+            coords.append(end_coords)
+            ids.append(self.place_id(end_location))
+
+        return [place for place, _ in place_coords], self.route_cost_matrix(coords, city, ids), start, end
+
+    def optimize_day_route(
+        self,
+        places: List[Dict],
+        city: str,
+        start_location: Optional[str] = None,
+        end_location: Optional[str] = None
+    ) -> List[Dict]:
+        """Optimize the route for a day's activities using TSP approach.
+
+        Without anchors the route starts at the first place. A start or end
+        location (e.g. the hotel) fixes that end of the path instead.
+        """
+        self.last_route_stats = None
+        if not places:
             return places
-            
-        # Find the optimal route using nearest neighbor algorithm
-        current_idx = 0  # Start with the first place
-        visited = {0}
-        route = [place_coords[0]]
+        problem = self.route_problem(places, city, start_location, end_location)
+        if problem is None:
+            return places
+
+        located, matrix, start, end = problem
+        route = self.solve_route(matrix, start, end)
         
-        while len(visited) < len(place_coords):
-            current_coords = place_coords[current_idx][1]
-            min_distance = float('inf')
-            next_idx = None
-            
-            # Find the nearest unvisited place
-            for i, (_, coords) in enumerate(place_coords):
-                if i not in visited:
-                    distance = self.haversine_distance(
-                        current_coords[0], current_coords[1],
-                        coords[0], coords[1]
-                    )
-                    if distance < min_distance:
-                        min_distance = distance
-                        next_idx = i
-            
-            if next_idx is not None:
-                visited.add(next_idx)
-                route.append(place_coords[next_idx])
-                current_idx = next_idx
+        # Return places in optimized order, without the anchors
+        return [located[i] for i in route if i < len(located)]
+
+    def route_days(
+        self,
+        day_activities: Dict[str, List[Dict]],
+        city: str,
+        hotel: Optional[str] = None
+    ) -> Dict[str, Tuple[List[Dict], Optional[Dict]]]:
+        """Route every day, returning {day: (ordered activities, route stats)}.
+
+        Days are independent once activities are assigned, so with more than
+        one route worker they are solved in parallel on a process pool. Under
+        a deadline every day first gets its construction route and the time
+        left is shared out for improvement.
+        """
+        problems = {}
+        routed = {}
+        with self._stage('route_matrices'):
+            for day_key, activities in day_activities.items():
+                problem = self.route_problem(activities, city, hotel, hotel) if activities else None
+                if problem is None:
+                    routed[day_key] = (activities, None)
+                else:
+                    problems[day_key] = problem
+
+        with self._stage('routing'):
+            if self.deadline is not None:
+                solutions = self.solve_routes_until(list(problems.values()), self.deadline)
+            elif self.route_workers > 1 and len(problems) > 1:
+                router = ParallelDayRouter(self.route_workers, self.route_time_budget, self.exact_route_max_stops)
+                solutions = router.route([(matrix, start, end) for _, matrix, start, end in problems.values()])
+            else:
+                solutions = [
+                    solve_route(matrix, start, end, self.route_time_budget, self.exact_route_max_stops)
+                    for _, matrix, start, end in problems.values()
+                ]
+
+        for (day_key, (located, matrix, start, end)), (route, stats) in zip(problems.items(), solutions):
+            routed[day_key] = ([located[i] for i in route if i < len(located)], stats)
+            if self.trace is not None:
+                self.trace_route(day_key, located, matrix, start, end, stats)
+        return {day_key: routed[day_key] for day_key in day_activities}
+
+    def trace_route(self, day_key: str, located: List[Dict], matrix: np.ndarray, start: Optional[int], end: Optional[int], stats: Dict):
+        """Record a day's route length in the given order, after construction and after improvement"""
+        given = ([start] if start is not None else []) + list(range(len(located))) + ([end] if end is not None else [])
+        self.trace.routes[day_key] = {
+            'stops': len(located),
+            'solver': stats['solver'],
+            'given_length': round(route_length(matrix, given), 3),
+            'construction_length': stats['initial_length'],
+            'final_length': stats['final_length'],
+            'unit': 'km' if self.transport_mode == 'default' else 'minutes'
+        }
+
+    def _stage(self, name: str):
+        """Time a block under the current trace; a no-op when not tracing"""
+        return self.trace.stage(name) if self.trace is not None else nullcontext()
+
+    def exact_limit(self, budget: float) -> int:
+        """Largest day the exact solver can finish within the budget (seconds)"""
+        limit = 0
+        for n in range(2, self.exact_route_max_stops + 1):
+            if estimated_seconds(n) <= budget:
+                limit = n
+        return limit
+
+    def solve_routes_until(self, problems: List[Tuple], deadline: float) -> List[Tuple[List[int], Dict]]:
+        """Solve routing problems, sharing the time left before the deadline between them"""
+        if self.route_workers > 1 and len(problems) > 1:
+            remaining = max(deadline - time.perf_counter(), 0.0)
+            budget = remaining * min(self.route_workers, len(problems)) / len(problems)
+            router = ParallelDayRouter(self.route_workers, budget, self.exact_limit(budget))
+            return router.route([(matrix, start, end) for _, matrix, start, end in problems])
+
+        solutions = []
+        for i, (_, matrix, start, end) in enumerate(problems):
+            # Days left to solve share the remaining time evenly
+            budget = max(deadline - time.perf_counter(), 0.0) / (len(problems) - i)
+            solutions.append(solve_route(matrix, start, end, budget, self.exact_limit(budget)))
+        return solutions
+
+    def solve_route(self, matrix: np.ndarray, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Order every node of the matrix, exactly for small days and heuristically otherwise"""
+        route, self.last_route_stats = solve_route(
+            matrix, start, end, self.route_time_budget, self.exact_route_max_stops
+        )
+        return route
+
+    def nearest_neighbor_route(self, matrix: np.ndarray, start: int = 0) -> List[int]:
+        """Build a route by always moving to the nearest unvisited place"""
+        return nearest_neighbor_route(matrix, start)
+
+    def add_travel_times(self, activities: List[Dict], city: str):
+        """Annotate each activity with the travel time to the next one"""
+        coords = [self.get_coordinates(activity.get('location', ''), city) for activity in activities]
+        if sum(1 for c in coords if c) < 2:
+            return
         
-        # Return places in optimized order
-        return [place for place, _ in route]
+        ids = [self.place_id(activity.get('location', '')) for activity in activities]
+        minutes = self.travel_time_matrix(coords, city, ids)
+        for i in range(len(activities) - 1):
+            if coords[i] and coords[i + 1]:
+                activities[i]['travel_to_next'] = f"{int(minutes[i, i + 1])} minutes"
+
+    def regroup_days(self, day_activities: Dict[str, List[Dict]], city: str) -> Dict[str, List[Dict]]:
+        """Reassign activities to days by geographic proximity with balanced day sizes.
+
+        Activities without coordinates stay on their original day and count
+        towards that day's size.
+        """
+        located = []
+        regrouped = {day_key: [] for day_key in day_activities}
+        for day_key, activities in day_activities.items():
+            for activity in activities:
+                coords = self.get_coordinates(activity.get('location', ''), city)
+                if coords:
+                    located.append((activity, coords, self.place_id(activity.get('location', ''))))
+                else:
+                    regrouped[day_key].append(activity)
+        if not located:
+            return day_activities
+
+        # Balance total activities per day, counting the ones that cannot move
+        targets = balanced_sizes(sum(len(a) for a in day_activities.values()), len(day_activities))
+        sizes = [max(0, target - len(fixed)) for target, fixed in zip(targets, regrouped.values())]
+        while sum(sizes) < len(located):
+            sizes[sizes.index(min(sizes))] += 1
+        while sum(sizes) > len(located):
+            sizes[sizes.index(max(sizes))] -= 1
+
+        matrix = self.route_cost_matrix([coords for _, coords, _ in located], city, [place_id for _, _, place_id in located])
+        clusters = cluster_days(matrix, len(sizes), sizes)
+        for day_key, members in zip(day_activities, clusters):
+            regrouped[day_key] = [located[i][0] for i in members] + regrouped[day_key]
+        return regrouped
+
+    def get_road_network(self, city: str) -> Optional[RoadNetwork]:
+        return self.road_network or get_road_network(city)
+
+    def route_cost_matrix(self, coords: List[Tuple[float, float]], city: str, ids: Optional[List[str]] = None) -> np.ndarray:
+        """Cost matrix used to order and group places.
+
+        Routes minimise distance by default and travel minutes once a
+        transport mode has been chosen.
+        """
+        if self.transport_mode == 'default':
+            return self.place_distance_matrix(coords, city, ids)
+        return self.mode_time_matrix(coords, city, ids)
+
+    def mode_time_matrix(self, coords: List[Tuple[float, float]], city: str, ids: Optional[List[str]] = None) -> np.ndarray:
+        """Travel minutes between located places in the current transport mode.
+
+        Driving modes use the city's road graph when one is available. Matrices
+        are cached per (city, mode, places), so repeated plans reuse them, and
+        distances and road times persist in the city's matrix store.
+        """
+        mode = self.transport_mode
+        network = self.get_road_network(city) if mode in ('default', 'car') else None
+
+        def road_minutes(origins, destinations) -> np.ndarray:
+            return network.time_matrix(origins, destinations) / 60
+
+        def compute() -> np.ndarray:
+            minutes = mode_time_matrix(self.place_distance_matrix(coords, city, ids), mode)
+            if network is not None:
+                store = self.get_matrix_store(city) if ids else None
+                if store is not None:
+                    layer = f"road_{os.path.basename(os.path.normpath(network.path))}"
+                    road = store.get(layer, ids, coords, road_minutes)
+                else:
+                    road = network.time_matrix(coords) / 60
+                road = road + PROFILES[mode].fixed_minutes
+                # Unreachable pairs fall back to straight-line estimates
+                minutes = np.where(np.isfinite(road), road, minutes)
+                np.fill_diagonal(minutes, 0.0)
+            return minutes
+
+        cache_mode = f"{mode}@{network.path}" if network is not None else mode
+        return self.travel_time_cache.get_or_compute(city, cache_mode, coords, compute)
+
+    def travel_time_matrix(
+        self,
+        coords: List[Optional[Tuple[float, float]]],
+        city: str,
+        ids: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """Travel minutes between every pair of coordinates.
+
+        Places without coordinates are assumed to be a fixed time away.
+        """
+        minutes = np.full((len(coords), len(coords)), float(self.UNKNOWN_TRAVEL_MINUTES))
+        located = [i for i, c in enumerate(coords) if c]
+        if located:
+            minutes[np.ix_(located, located)] = self.mode_time_matrix(
+                [coords[i] for i in located], city, [ids[i] for i in located] if ids else None
+            )
+        np.fill_diagonal(minutes, 0.0)
+        return minutes
+
+    def schedule_day(self, activities: List[Dict], city: str, scheduler: Optional[DayScheduler] = None) -> List[Dict]:
+        """Give each activity a realistic start time given opening hours, meals and travel.
+
+        Activities that cannot fit into the day are kept at the end with a note
+        and no time.
+        """
+        if not activities:
+            return activities
+        scheduler = scheduler or DayScheduler()
+        coords = [self.get_coordinates(activity.get('location', ''), city) for activity in activities]
+        ids = [self.place_id(activity.get('location', '')) for activity in activities]
+        scheduled, unscheduled = scheduler.schedule(activities, self.travel_time_matrix(coords, city, ids))
+        for activity in unscheduled:
+            activity = dict(activity)
+            activity['time'] = ''
+            activity['note'] = "Could not be fitted into the day's schedule"
+            scheduled.append(activity)
+        return scheduled
+
+    def optimize_itinerary(
+        self,
+        itinerary: Dict,
+        city: str,
+        hotel: Optional[str] = None,
+        regroup_days: bool = False,
+        schedule: bool = False,
+        transport_mode: Optional[str] = None,
+        deadline_ms: Optional[float] = None,
+        trace: bool = False,
+        global_assignment: bool = False
+    ) -> Dict:
+        """Optimize the full itinerary for better route planning and diversity.
+
+        If a hotel is given, every day's route starts and ends there. With
+        regroup_days, places are first reassigned to days by geographic
+        clustering instead of keeping the incoming day grouping. With schedule,
+        each day's activities get start times that respect opening hours,
+        meal windows and travel time. transport_mode takes the user's preference
+        (public, private, walking or mixed) and switches routing and travel
+        times to that mode. Substitutes come from the city's place catalog.
+
+        With deadline_ms, geocoding stops and route improvement is cut short
+        so a valid plan returns within roughly that many milliseconds. The
+        result then carries an 'optimization' entry with the achieved
+        objective and whether every day was fully optimized.
 
-    def optimize_itinerary(self, itinerary: Dict, city: str) -> Dict:
-        """Optimize the full itinerary for better route planning and diversity"""
+        With trace, the result also carries a 'trace' entry with per-stage
+        timings, geocoding hit counts, travel-time cache hits, every
+        substitution and why it was made, and each day's route length in the
+        given order, after construction and after improvement. Without it no
+        tracing work is done.
+
+        With global_assignment, places are assigned to days in one
+        min-cost-flow solve over the whole trip (see assign_days) instead of
+        streaming the days in order through the diversity rules.
+        """
+        started = time.perf_counter()
+        if deadline_ms is not None:
+            self.deadline = started + deadline_ms / 1000 * (1 - self.DEADLINE_RESERVE)
+            self.skipped_geocodes = 0
+        if trace:
+            self.trace = OptimizerTrace()
+            cache_hits, cache_misses = self.travel_time_cache.hits, self.travel_time_cache.misses
+        # Places that failed transiently in an earlier call are tried again
+        self.unresolved_places = set()
+        # A requested mode applies to this call only; the optimizer's own mode is restored after it
+        default_mode = self.transport_mode
+        mode = resolve_mode(transport_mode) if transport_mode else default_mode
+        self.transport_mode = mode
+        try:
+            optimized_itinerary = self._optimize_itinerary(
+                itinerary, city, hotel, regroup_days, schedule, global_assignment
+            )
+            if trace:
+                self.trace.count('travel_time_cache_hits', self.travel_time_cache.hits - cache_hits)
+                self.trace.count('travel_time_cache_misses', self.travel_time_cache.misses - cache_misses)
+                optimized_itinerary['trace'] = self.trace.as_dict()
+        finally:
+            self.deadline = None
+            self.trace = None
+            self.transport_mode = default_mode
+
+        if deadline_ms is not None:
+            stats = [value for key, value in optimized_itinerary.items() if key.endswith('_route_stats')]
+            optimized_itinerary['optimization'] = {
+                'deadline_ms': deadline_ms,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+                'objective': round(sum(s['final_length'] for s in stats), 3),
+                'objective_unit': 'km' if mode == 'default' else 'minutes',
+                'converged': all(s['converged'] for s in stats) and not self.skipped_geocodes,
+                'skipped_geocodes': self.skipped_geocodes
+            }
+        return optimized_itinerary
+
+    def _optimize_itinerary(
+        self,
+        itinerary: Dict,
+        city: str,
+        hotel: Optional[str],
+        regroup_days: bool,
+        schedule: bool,
+        global_assignment: bool = False
+    ) -> Dict:
+        self.use_catalog(city)
         optimized_itinerary = {}
         visited_places = set()
         
         # Sort days to ensure we process them in order
         days = sorted([k for k in itinerary.keys() if k.startswith('day_')])
         
-        for day_key in days:
-            activities = itinerary.get(day_key, [])
-            if not isinstance(activities, list):
-                continue
-            
-            # Optimize activities for this day
-            optimized_activities = self.optimize_day_activities(activities, visited_places)
-            
-            # Optimize route if we have coordinates
-            optimized_activities = self.optimize_day_route(optimized_activities, city)
+        # Geocode every location in the plan in one batch, so substitutes can be picked by proximity
+        with self._stage('geocoding'):
+            self.prefetch_coordinates(
+                [activity.get('location', '') for day_key in days if isinstance(itinerary.get(day_key), list)
+                 for activity in itinerary[day_key] if isinstance(activity, dict)],
+                city
+            )
+
+        # Optimize activities for every day first so all locations are known
+        with self._stage('selection'):
+            plan_days = [day_key for day_key in days if isinstance(itinerary.get(day_key, []), list)]
+            if global_assignment:
+                day_activities = self.assign_days(itinerary, plan_days, city)
+            else:
+                selector = self.diversity_selector(visited_places, city)
+                remaining = sum(len(itinerary.get(day_key, [])) for day_key in plan_days)
+                day_activities = {}
+                for day_key in plan_days:
+                    activities = itinerary.get(day_key, [])
+                    remaining -= len(activities)
+                    if self.trace is not None:
+                        selector.on_substitute = partial(self.trace.substitution, day_key)
+                    day_activities[day_key] = selector.select_day(activities, self.day_anchor(activities, city), remaining)
+
+        # Substitutes and the hotel may still need geocoding
+        with self._stage('geocoding'):
+            self.prefetch_coordinates(
+                [activity.get('location', '') for activities in day_activities.values() for activity in activities] + [hotel or ''],
+                city
+            )
+
+        if regroup_days:
+            with self._stage('regroup'):
+                day_activities = self.regroup_days(day_activities, city)
+
+        # Days are independent from here on, so their routes can be solved together
+        routed = self.route_days(day_activities, city, hotel)
+
+        for day_key, (optimized_activities, route_stats) in routed.items():
+            if schedule:
+                with self._stage('scheduling'):
+                    optimized_activities = self.schedule_day(optimized_activities, city)
             
             # Add travel time estimates
-            if len(optimized_activities) > 1:
-                for i in range(len(optimized_activities) - 1):
-                    current = optimized_activities[i]
-                    next_place = optimized_activities[i + 1]
-                    current_coords = self.get_coordinates(current['location'], city)
-                    next_coords = self.get_coordinates(next_place['location'], city)
-                    
-                    if current_coords and next_coords:
-                        distance = self.haversine_distance(
-                            current_coords[0], current_coords[1],
-                            next_coords[0], next_coords[1]
-                        )
-                        # Estimate travel time (assuming average speed of 20 km/h in city)
-                        hours = distance / 20
-                        minutes = int(hours * 60)
-                        current['travel_to_next'] = f"{minutes} minutes"
+            with self._stage('travel_times'):
+                self.add_travel_times(optimized_activities, city)
             
             optimized_itinerary[day_key] = optimized_activities
             
@@ -274,5 +760,139 @@ class ItineraryOptimizer:
             for key, value in itinerary.items():
                 if key.startswith(f"{day_key}_"):
                     optimized_itinerary[key] = value
+
+            if route_stats:
+                optimized_itinerary[f"{day_key}_route_stats"] = route_stats
         
         return optimized_itinerary
+
+    def reoptimize_itinerary(
+        self,
+        itinerary: Dict,
+        changes: List[Dict],
+        city: str,
+        hotel: Optional[str] = None,
+        transport_mode: Optional[str] = None
+    ) -> Tuple[Dict, Dict]:
+        """Apply activity edits and re-plan only the days they touch.
+
+        Each change is {'op': 'add', 'day', 'activity'[, 'position']},
+        {'op': 'remove', 'day', 'name' or 'index'} or
+        {'op': 'move', 'from_day', 'to_day', 'name' or 'index'[, 'position']}.
+        Returns the updated itinerary and a diff of the affected days only.
+        Raises ValueError for malformed changes.
+        """
+        self.unresolved_places = set()
+        default_mode = self.transport_mode
+        if transport_mode:
+            self.transport_mode = resolve_mode(transport_mode)
+        try:
+            return self._reoptimize_itinerary(itinerary, changes, city, hotel)
+        finally:
+            self.transport_mode = default_mode
+
+    def _reoptimize_itinerary(
+        self,
+        itinerary: Dict,
+        changes: List[Dict],
+        city: str,
+        hotel: Optional[str]
+    ) -> Tuple[Dict, Dict]:
+        updated = dict(itinerary)
+        affected: List[str] = []
+
+        for change in changes:
+            if not isinstance(change, dict):
+                raise ValueError("Each change must be an object")
+            op = change.get('op')
+            if op == 'add':
+                if not isinstance(change.get('activity'), dict):
+                    raise ValueError("An 'add' change needs an activity")
+                day = self._edit_day(updated, change.get('day'), affected)
+                day.insert(self._change_index(change, 'position', len(day), len(day)), dict(change['activity']))
+            elif op == 'remove':
+                day = self._edit_day(updated, change.get('day'), affected)
+                day.pop(self._find_activity(day, change))
+            elif op == 'move':
+                source = self._edit_day(updated, change.get('from_day'), affected)
+                activity = source.pop(self._find_activity(source, change))
+                target = self._edit_day(updated, change.get('to_day'), affected)
+                target.insert(self._change_index(change, 'position', len(target), len(target)), activity)
+            else:
+                raise ValueError(f"Unknown change operation: {op}")
+
+        diff = {}
+        for day_key in affected:
+            activities = [
+                {k: v for k, v in activity.items() if k != 'travel_to_next'}
+                for activity in updated[day_key]
+            ]
+            activities = self.optimize_day_route(activities, city, hotel, hotel)
+            route_stats = self.last_route_stats
+            self.add_travel_times(activities, city)
+            updated[day_key] = activities
+            if route_stats:
+                updated[f"{day_key}_route_stats"] = route_stats
+            else:
+                # No route was solved (fewer than two located places); drop the previous plan's stats
+                updated.pop(f"{day_key}_route_stats", None)
+
+            diff[day_key] = self._day_diff(itinerary.get(day_key, []), activities)
+            if route_stats:
+                diff[day_key]['route_stats'] = route_stats
+        return updated, diff
+
+    def _edit_day(self, itinerary: Dict, day_key: Optional[str], affected: List[str]) -> List[Dict]:
+        """Return a private copy of a day's activities that may be edited"""
+        if not day_key or not isinstance(itinerary.get(day_key), list):
+            raise ValueError(f"Unknown day: {day_key}")
+        if day_key not in affected:
+            itinerary[day_key] = [dict(activity) for activity in itinerary[day_key]]
+            affected.append(day_key)
+        return itinerary[day_key]
+
+    def _change_index(self, change: Dict, key: str, default: int, limit: int) -> int:
+        """Integer field of a change within 0..limit, raising ValueError for anything else"""
+        value = change.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"Invalid {key}: {value!r}")
+        try:
+            index = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid {key}: {value!r}")
+        if not 0 <= index <= limit:
+            raise ValueError(f"{key.capitalize()} out of range: {index}")
+        return index
+
+    def _find_activity(self, activities: List[Dict], change: Dict) -> int:
+        if 'index' in change:
+            if not activities:
+                raise ValueError("Activity index out of range: the day is empty")
+            return self._change_index(change, 'index', 0, len(activities) - 1)
+        for index, activity in enumerate(activities):
+            if activity.get('name') == change.get('name'):
+                return index
+        raise ValueError(f"Activity not found: {change.get('name')}")
+
+    def _day_diff(self, before: List[Dict], after: List[Dict]) -> Dict:
+        """Describe how a day changed: added/removed places, new order and changed travel times"""
+        before_ids = [self.get_place_identifier(activity) for activity in before]
+        after_ids = [self.get_place_identifier(activity) for activity in after]
+        previous_travel = {
+            place_id: activity.get('travel_to_next') for place_id, activity in zip(before_ids, before)
+        }
+
+        diff = {
+            'added': [activity for place_id, activity in zip(after_ids, after) if place_id not in before_ids],
+            'removed': [place_id for place_id in before_ids if place_id not in after_ids]
+        }
+        if after_ids != [place_id for place_id in before_ids if place_id in after_ids] or diff['added']:
+            diff['order'] = after_ids
+        travel = {
+            place_id: activity.get('travel_to_next')
+            for place_id, activity in zip(after_ids, after)
+            if activity.get('travel_to_next') != previous_travel.get(place_id)
+        }
+        if travel:
+            diff['travel_to_next'] = travel
+        return diff
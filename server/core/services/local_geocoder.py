@@ -0,0 +1,142 @@
+import os
+import json
+import bisect
+import difflib
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+from .geocode_cache import GeocodeCache, Coordinates, normalize_text, get_geocode_cache
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+LANDMARKS_PATH = os.path.join(DATA_DIR, 'landmarks.json')
+
+# Shorter queries match too many landmarks to be trusted as prefixes
+MIN_PREFIX_LENGTH = 4
+# An ambiguous prefix is accepted only if it covers more than this share of the name's words
+PREFIX_WORD_COVERAGE = 0.5
+FUZZY_CUTOFF = 0.88
+
+
+class LocalGeocoder:
+    """Offline coordinate index for landmarks that never move.
+
+    Names and aliases are normalized and kept per city in a dict for exact
+    lookups and in a sorted list for prefix lookups. Fuzzy matching is the
+    last resort and only compares names within the same city.
+    """
+
+    def __init__(self, dataset_path: Optional[str] = LANDMARKS_PATH, geocode_cache: Optional[GeocodeCache] = None):
+        self.city_aliases: Dict[str, str] = {}
+        self.city_centers: Dict[str, Coordinates] = {}
+        self.index: Dict[str, Dict[str, Coordinates]] = {}
+        self.sorted_keys: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+        if dataset_path:
+            self.load_dataset(dataset_path)
+        if geocode_cache is not None:
+            self.load_cache(geocode_cache)
+
+    def load_dataset(self, path: str):
+        """Add every landmark and alias from a bundled JSON dataset"""
+        with open(path) as f:
+            data = json.load(f)
+
+        for alias, city in data.get('city_aliases', {}).items():
+            self.city_aliases[normalize_text(alias)] = normalize_text(city)
+        for city, (lat, lon) in data.get('cities', {}).items():
+            self.city_centers[self.normalize_city(city)] = (lat, lon)
+        for landmark in data.get('landmarks', []):
+            coords = (landmark['lat'], landmark['lon'])
+            for name in [landmark['name']] + landmark.get('aliases', []):
+                self.add(name, landmark['city'], coords)
+
+    def load_cache(self, geocode_cache: GeocodeCache):
+        """Add every successful lookup already stored in the geocode cache"""
+        for place, city, lat, lon in geocode_cache.entries():
+            self.add(place, city, (lat, lon))
+
+    def normalize_city(self, city: str) -> str:
+        city = normalize_text(city)
+        return self.city_aliases.get(city, city)
+
+    def add(self, place: str, city: str, coords: Coordinates):
+        """Add or replace a single name in the index"""
+        city_key = self.normalize_city(city)
+        key = normalize_text(place)
+        if not key:
+            return
+        with self._lock:
+            city_index = self.index.setdefault(city_key, {})
+            keys = self.sorted_keys.setdefault(city_key, [])
+            if key not in city_index:
+                bisect.insort(keys, key)
+            city_index[key] = coords
+
+    def lookup(self, place: str, city: str) -> Optional[Coordinates]:
+        """Resolve a place by exact, unambiguous prefix and finally fuzzy name match"""
+        city_key = self.normalize_city(city)
+        city_index = self.index.get(city_key)
+        if not city_index:
+            return None
+
+        key = normalize_text(place)
+        if key in city_index:
+            return city_index[key]
+
+        # "Cubbon Park, Bangalore" and similar queries carry the city as a suffix
+        for suffix in {city_key, normalize_text(city)}:
+            if suffix and key.endswith(' ' + suffix):
+                stripped = key[:-len(suffix) - 1].strip()
+                if stripped in city_index:
+                    return city_index[stripped]
+                key = stripped
+
+        matches = self.prefix(key, city, limit=len(city_index))
+        if matches:
+            # A generic prefix ("National", "Lake") must not pick some landmark at random:
+            # accept it only if every match is the same place or it names most of the shortest one
+            if len({city_index[match] for match in matches}) == 1:
+                return city_index[matches[0]]
+            if len(key.split()) / len(matches[0].split()) > PREFIX_WORD_COVERAGE:
+                return city_index[matches[0]]
+
+        fuzzy = difflib.get_close_matches(key, self.sorted_keys[city_key], n=1, cutoff=FUZZY_CUTOFF)
+        if fuzzy:
+            return city_index[fuzzy[0]]
+        return None
+
+    def prefix(self, query: str, city: str, limit: int = 10) -> List[str]:
+        """Return indexed names in a city that start with the query, shortest first"""
+        query = normalize_text(query)
+        if len(query) < MIN_PREFIX_LENGTH:
+            return []
+        keys = self.sorted_keys.get(self.normalize_city(city), [])
+        start = bisect.bisect_left(keys, query)
+        matches = []
+        for key in keys[start:]:
+            if not key.startswith(query):
+                break
+            matches.append(key)
+        return sorted(matches, key=len)[:limit]
+
+    def city_center(self, city: str) -> Optional[Coordinates]:
+        """Return the reference coordinates of a city, if known"""
+        return self.city_centers.get(self.normalize_city(city))
+
+
+_shared_geocoder = None
+_shared_geocoder_lock = threading.Lock()
+
+
+def get_local_geocoder() -> LocalGeocoder:
+    """Return the process-wide local geocoder, building the index on first use"""
+    global _shared_geocoder
+    if _shared_geocoder is None:
+        with _shared_geocoder_lock:
+            if _shared_geocoder is None:
+                _shared_geocoder = LocalGeocoder(LANDMARKS_PATH, get_geocode_cache())
+                logger.info(f"Loaded local geocoder with {sum(len(i) for i in _shared_geocoder.index.values())} names")
+    return _shared_geocoder
@@ -0,0 +1,265 @@
+import os
+import glob
+import json
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from numpy.lib.format import open_memmap
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; only in-process locking is used there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+
+INITIAL_CAPACITY = 64
+
+# Places kept per city; each layer then takes at most MAX_PLACES^2 * 8 bytes (32 MB at 2048)
+MAX_PLACES = int(os.getenv('MATRIX_STORE_MAX_PLACES', '2048'))
+
+# Coordinates closer than this (in degrees) count as unchanged
+COORDINATE_TOLERANCE = 1e-6
+
+
+class MatrixStore:
+    """Persistent pairwise matrices for the places of one city.
+
+    Every place has a canonical ID mapped to a fixed row and column. Each layer
+    (distances, road times, ...) is a memory-mapped capacity x capacity array
+    in which NaN marks pairs not computed yet. Lookups return the slice for
+    the requested places and compute only the rows and columns of places
+    with missing pairs. Capacity doubles
+    as places are added, up to max_places; after that the oldest place's slot
+    is reused, so disk use per city is bounded. A place whose coordinates
+    change has its row and column cleared in every layer.
+
+    Readers on the same host share a file lock and writers take it
+    exclusively, only to register places and store computed pairs; missing
+    pairs are computed outside the lock.
+    """
+
+    def __init__(self, path: str, max_places: Optional[int] = None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.max_places = max_places or MAX_PLACES
+        self.index: Dict[str, int] = {}
+        self.coords: List[Coordinates] = []
+        self.capacity = 0
+        # Slot the next new place takes once the store is full
+        self.next_slot = 0
+        self._layers: Dict[str, np.memmap] = {}
+        self._meta_mtime = None
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.path, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, 'meta.json')
+
+    def _refresh(self):
+        """Pick up places registered by other processes"""
+        meta_path = self._meta_path()
+        if not os.path.exists(meta_path):
+            return
+        mtime = os.stat(meta_path).st_mtime_ns
+        if mtime == self._meta_mtime:
+            return
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self.index = {place_id: i for i, place_id in enumerate(meta['ids'])}
+        self.coords = [tuple(point) for point in meta['coords']]
+        if meta['capacity'] != self.capacity:
+            self._layers = {}
+        self.capacity = meta['capacity']
+        self.next_slot = meta.get('next_slot', 0)
+        self._meta_mtime = mtime
+
+    def _save_meta(self):
+        ids = sorted(self.index, key=self.index.get)
+        tmp_path = self._meta_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'ids': ids, 'coords': self.coords, 'capacity': self.capacity, 'next_slot': self.next_slot}, f)
+        os.replace(tmp_path, self._meta_path())
+        self._meta_mtime = os.stat(self._meta_path()).st_mtime_ns
+
+    def _layer_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, '*.npy')))
+
+    def _layer(self, name: str) -> np.memmap:
+        if name not in self._layers:
+            file_path = os.path.join(self.path, f"{name}.npy")
+            if os.path.exists(file_path):
+                self._layers[name] = np.load(file_path, mmap_mode='r+')
+            else:
+                layer = open_memmap(file_path, mode='w+', dtype=np.float64, shape=(self.capacity, self.capacity))
+                layer[:] = np.nan
+                self._layers[name] = layer
+        return self._layers[name]
+
+    def _grow(self, capacity: int):
+        """Copy every layer into larger arrays, keeping computed pairs"""
+        n = len(self.coords)
+        for file_path in self._layer_files():
+            old = np.load(file_path, mmap_mode='r')
+            tmp_path = file_path + '.tmp'
+            new = open_memmap(tmp_path, mode='w+', dtype=np.float64, shape=(capacity, capacity))
+            new[:] = np.nan
+            new[:n, :n] = old[:n, :n]
+            new.flush()
+            del old, new
+            os.replace(tmp_path, file_path)
+        self.capacity = capacity
+        self._layers = {}
+        logger.info(f"Grew matrix store {self.path} to {capacity} places")
+
+    def _clear(self, i: int):
+        for file_path in self._layer_files():
+            name = os.path.basename(file_path)[:-len('.npy')]
+            layer = self._layer(name)
+            layer[i, :] = np.nan
+            layer[:, i] = np.nan
+
+    def _evict_slot(self, keep: Set[str]) -> int:
+        """Free the slot of the oldest place not in keep and return it"""
+        owners = {i: place_id for place_id, i in self.index.items()}
+        for _ in range(self.capacity):
+            slot = self.next_slot
+            self.next_slot = (self.next_slot + 1) % self.capacity
+            if owners.get(slot) not in keep:
+                del self.index[owners[slot]]
+                self._clear(slot)
+                return slot
+        raise ValueError("More places requested than the store holds")
+
+    def _register(self, ids: Sequence[str], coords: Sequence[Coordinates]):
+        dirty = False
+        keep = set(ids)
+        for place_id, point in zip(ids, coords):
+            point = (float(point[0]), float(point[1]))
+            i = self.index.get(place_id)
+            if i is None:
+                if len(self.index) < self.capacity:
+                    i = len(self.index)
+                elif self.capacity < self.max_places:
+                    self._grow(min(max(INITIAL_CAPACITY, self.capacity * 2), self.max_places))
+                    i = len(self.index)
+                else:
+                    i = self._evict_slot(keep)
+                self.index[place_id] = i
+                if i == len(self.coords):
+                    self.coords.append(point)
+                else:
+                    self.coords[i] = point
+                dirty = True
+            elif (abs(self.coords[i][0] - point[0]) > COORDINATE_TOLERANCE
+                  or abs(self.coords[i][1] - point[1]) > COORDINATE_TOLERANCE):
+                # The place moved: everything computed for it is stale
+                self._clear(i)
+                self.coords[i] = point
+                dirty = True
+        if dirty:
+            self._save_meta()
+
+    def _is_current(self, place_id: str, point: Coordinates) -> bool:
+        """Whether the place is registered at the given coordinates"""
+        i = self.index.get(place_id)
+        return (i is not None and abs(self.coords[i][0] - point[0]) <= COORDINATE_TOLERANCE
+                and abs(self.coords[i][1] - point[1]) <= COORDINATE_TOLERANCE)
+
+    def get(
+        self,
+        layer: str,
+        ids: Sequence[str],
+        coords: Sequence[Coordinates],
+        compute: Callable[[Sequence[Coordinates], Sequence[Coordinates]], np.ndarray]
+    ) -> np.ndarray:
+        """Matrix of a layer for the given places, computing only the missing pairs.
+
+        compute(origins, destinations) returns the rectangular matrix between
+        two lists of places. Only the rows and columns of places whose pairs
+        are not all stored are computed and written back.
+        """
+        points = [(float(point[0]), float(point[1])) for point in coords]
+        n = len(points)
+        if len(set(ids)) > self.max_places:
+            matrix = np.asarray(compute(points, points), dtype=np.float64)
+            np.fill_diagonal(matrix, 0.0)
+            return matrix
+
+        block = np.full((n, n), np.nan)
+        with self._locked(exclusive=False):
+            self._refresh()
+            known = [i for i, (place_id, point) in enumerate(zip(ids, points)) if self._is_current(place_id, point)]
+            if known and os.path.exists(os.path.join(self.path, f"{layer}.npy")):
+                rows = np.array([self.index[ids[i]] for i in known], dtype=np.int64)
+                block[np.ix_(known, known)] = self._layer(layer)[np.ix_(rows, rows)]
+        np.fill_diagonal(block, 0.0)
+        # Places not stored yet, then the stored places with the most gaps until every pair is covered
+        missing = np.ones(n, dtype=bool)
+        missing[known] = False
+        gaps = np.isnan(block) & ~missing[:, None] & ~missing[None, :]
+        while gaps.any():
+            worst = int(np.argmax(gaps.sum(axis=0) + gaps.sum(axis=1)))
+            missing[worst] = True
+            gaps[worst, :] = gaps[:, worst] = False
+        if not missing.any():
+            return block
+
+        # Compute outside the lock so other readers and writers are not held up
+        new = np.flatnonzero(missing)
+        old = np.flatnonzero(~missing)
+        block[new, :] = compute([points[i] for i in new], points)
+        if len(old):
+            block[np.ix_(old, new)] = compute([points[i] for i in old], [points[i] for i in new])
+        np.fill_diagonal(block, 0.0)
+
+        with self._locked():
+            self._refresh()
+            self._register(ids, points)
+            matrix = self._layer(layer)
+            rows = np.array([self.index[place_id] for place_id in ids], dtype=np.int64)
+            matrix[np.ix_(rows[new], rows)] = block[new, :]
+            matrix[np.ix_(rows, rows[new])] = block[:, new]
+        return block
+
+    def invalidate(self, place_id: str):
+        """Forget every pair computed for a place"""
+        with self._locked():
+            self._refresh()
+            i = self.index.get(place_id)
+            if i is not None:
+                self._clear(i)
+
+
+_stores: Dict[str, Optional[MatrixStore]] = {}
+_stores_lock = threading.Lock()
+
+
+def get_matrix_store(city: str) -> Optional[MatrixStore]:
+    """Return the matrix store for a city, or None unless MATRIX_CACHE_DIR names a directory"""
+    directory = os.getenv('MATRIX_CACHE_DIR', '')
+    key = '_'.join((city or '').lower().split())
+    if not directory or not key:
+        return None
+    path = os.path.join(directory, key)
+    if path not in _stores:
+        with _stores_lock:
+            if path not in _stores:
+                _stores[path] = MatrixStore(path)
+    return _stores[path]
@@ -0,0 +1,83 @@
+import heapq
+from typing import List, Tuple
+
+
+class MinCostFlow:
+    """Min-cost max-flow by successive shortest paths.
+
+    Shortest paths use Dijkstra with node potentials, so edge costs must be
+    non-negative. Each augmentation is O(E log V) and there are at most as
+    many augmentations as units of flow, which keeps trip-sized networks
+    (a few hundred nodes) well under a millisecond per unit.
+    """
+
+    def __init__(self, nodes: int):
+        self.nodes = nodes
+        # Edge i is stored as [to, capacity, cost]; its reverse edge is i ^ 1
+        self.edges: List[List] = []
+        self.graph: List[List[int]] = [[] for _ in range(nodes)]
+
+    def add_node(self) -> int:
+        self.graph.append([])
+        self.nodes += 1
+        return self.nodes - 1
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: float) -> int:
+        """Add a directed edge and return its id for reading the flow later"""
+        if cost < 0:
+            raise ValueError("Edge costs must be non-negative")
+        self.graph[u].append(len(self.edges))
+        self.edges.append([v, capacity, cost])
+        self.graph[v].append(len(self.edges))
+        self.edges.append([u, 0, -cost])
+        return len(self.edges) - 2
+
+    def flow(self, edge: int) -> int:
+        """Units of flow sent along an edge"""
+        return self.edges[edge ^ 1][1]
+
+    def solve(self, source: int, sink: int) -> Tuple[int, float]:
+        """Send as much flow as possible at minimum cost; returns (flow, cost)"""
+        potential = [0.0] * self.nodes
+        total_flow = 0
+        total_cost = 0.0
+        while True:
+            dist = [float('inf')] * self.nodes
+            prev_edge = [-1] * self.nodes
+            dist[source] = 0.0
+            heap = [(0.0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for e in self.graph[u]:
+                    v, capacity, cost = self.edges[e]
+                    if capacity <= 0:
+                        continue
+                    nd = d + cost + potential[u] - potential[v]
+                    if nd < dist[v] - 1e-12:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] == float('inf'):
+                break
+            for v in range(self.nodes):
+                if dist[v] < float('inf'):
+                    potential[v] += dist[v]
+
+            # Bottleneck along the path, then push it
+            push = float('inf')
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                push = min(push, self.edges[e][1])
+                v = self.edges[e ^ 1][0]
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                self.edges[e][1] -= push
+                self.edges[e ^ 1][1] += push
+                total_cost += push * self.edges[e][2]
+                v = self.edges[e ^ 1][0]
+            total_flow += push
+        return total_flow, total_cost
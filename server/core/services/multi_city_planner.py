@@ -0,0 +1,200 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .distance_matrix import haversine_matrix
+from .itinerary_optimizer import ItineraryOptimizer
+from .local_geocoder import LocalGeocoder, get_local_geocoder
+from .place_catalog import get_place_catalog
+from .route_solver import solve_route
+
+logger = logging.getLogger(__name__)
+
+# Activities planned per day before route optimization trims or reorders them
+ACTIVITIES_PER_DAY = 3
+
+# Distinct cities accepted in one trip
+MAX_CITIES = 12
+
+# Longest trip accepted, in days
+MAX_DAYS = 30
+
+
+class MultiCityPlanner:
+    """Plans one trip across several cities.
+
+    Days are split across cities by attraction density and cities are visited
+    in the order that minimises inter-city travel, starting from the first city
+    named. Places and weather for every city are fetched concurrently and each
+    city's days are optimized in parallel, so the wall-clock cost stays close
+    to that of a single-city plan.
+    """
+
+    def __init__(
+        self,
+        travel_service,
+        weather_service=None,
+        local_geocoder: Optional[LocalGeocoder] = None,
+        optimizer_factory: Callable[[], ItineraryOptimizer] = ItineraryOptimizer,
+        max_workers: int = 8
+    ):
+        self.travel_service = travel_service
+        self.weather_service = weather_service
+        self.local_geocoder = local_geocoder or get_local_geocoder()
+        self.optimizer_factory = optimizer_factory
+        self.max_workers = max_workers
+
+    def order_cities(self, cities: List[str]) -> List[str]:
+        """Visit order that starts at the first city and minimises inter-city distance.
+
+        Cities without known coordinates keep their requested order at the end.
+        """
+        centers = {city: self.local_geocoder.city_center(city) for city in cities}
+        located = [cities[0]] if centers[cities[0]] else []
+        located += [city for city in cities[1:] if centers[city]]
+        unknown = [city for city in cities if not centers[city]]
+        if len(located) < 3:
+            return located + unknown
+
+        # Exact for a handful of cities, heuristic beyond that, so request size cannot blow up the DP
+        route, _ = solve_route(haversine_matrix([centers[city] for city in located]), 0)
+        return [located[i] for i in route] + unknown
+
+    def transfers(self, cities: List[str]) -> List[Dict]:
+        """Straight-line legs between consecutive cities"""
+        legs = []
+        for origin, destination in zip(cities, cities[1:]):
+            a = self.local_geocoder.city_center(origin)
+            b = self.local_geocoder.city_center(destination)
+            distance = round(float(haversine_matrix([a, b])[0, 1]), 1) if a and b else None
+            legs.append({'from': origin, 'to': destination, 'distance_km': distance})
+        return legs
+
+    def allocate_days(self, densities: Dict[str, int], total_days: int) -> Dict[str, int]:
+        """Split the trip's days across cities in proportion to their attractions.
+
+        Every city gets at least one day when there are enough days; the rest
+        are shared out by largest remainder.
+        """
+        cities = list(densities)
+        if total_days < len(cities):
+            ranked = sorted(cities, key=lambda city: -densities[city])[:total_days]
+            return {city: (1 if city in ranked else 0) for city in cities}
+
+        allocation = {city: 1 for city in cities}
+        spare = total_days - len(cities)
+        total = sum(densities.values()) or len(cities)
+        shares = {city: spare * (densities[city] or 1) / total for city in cities}
+        for city in cities:
+            allocation[city] += int(shares[city])
+        leftover = total_days - sum(allocation.values())
+        for city in sorted(cities, key=lambda c: -(shares[c] - int(shares[c])))[:leftover]:
+            allocation[city] += 1
+        return allocation
+
+    def fetch_city(self, city: str, total_days: int) -> Dict:
+        """Attractions and forecast for one city"""
+        attractions = self.travel_service.get_attractions(city) or []
+        if not attractions:
+            # Fall back to the city's place catalog when the places API has nothing
+            attractions = [
+                place for places in get_place_catalog(self.local_geocoder.normalize_city(city)).as_dict().values()
+                for place in places
+            ]
+        forecast = self.weather_service.get_forecast(city, total_days) if self.weather_service else []
+        return {'attractions': attractions, 'forecast': forecast or []}
+
+    def city_itinerary(self, attractions: List[Dict], days: int) -> Dict[str, List[Dict]]:
+        """Spread a city's attractions over its days"""
+        activities = [
+            {
+                'name': place.get('name', ''),
+                'location': place.get('location') or place.get('address') or place.get('name', ''),
+                'description': place.get('description', '')
+            }
+            for place in attractions[:days * ACTIVITIES_PER_DAY]
+        ]
+        return {f"day_{day + 1}": activities[day::days] for day in range(days)}
+
+    def optimize_city(self, city: str, itinerary: Dict, hotel: Optional[str], transport_mode: Optional[str]) -> Dict:
+        optimizer = self.optimizer_factory()
+        return optimizer.optimize_itinerary(
+            itinerary, city, hotel=hotel, regroup_days=len(itinerary) > 1, transport_mode=transport_mode
+        )
+
+    def plan(
+        self,
+        cities: List[str],
+        days: int,
+        hotels: Optional[Dict[str, str]] = None,
+        transport_mode: Optional[str] = None
+    ) -> Dict:
+        """Build a day-by-day plan across cities.
+
+        Days are numbered across the whole trip; each day carries day_N_city
+        and, when a forecast is available, day_N_weather.
+        """
+        unique = {}
+        for city in cities:
+            city = (city or '').strip()
+            # A city named twice is visited once, where it first appears
+            if city:
+                unique.setdefault(self.local_geocoder.normalize_city(city), city)
+        cities = list(unique.values())
+        if not cities:
+            raise ValueError("At least one city is required")
+        if len(cities) > MAX_CITIES:
+            raise ValueError(f"At most {MAX_CITIES} cities can be planned in one trip")
+        if days < 1:
+            raise ValueError("Duration must be at least 1 day")
+        if days > MAX_DAYS:
+            raise ValueError(f"At most {MAX_DAYS} days can be planned in one trip")
+        if hotels is not None and not isinstance(hotels, dict):
+            raise ValueError("Hotels must map each city to a hotel")
+        hotels = hotels or {}
+
+        workers = min(self.max_workers, len(cities)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            fetched = dict(zip(cities, pool.map(lambda city: self.fetch_city(city, days), cities)))
+
+        ordered = self.order_cities(cities)
+        allocation = self.allocate_days({city: len(fetched[city]['attractions']) for city in ordered}, days)
+        visited = [city for city in ordered if allocation[city] > 0]
+
+        start_days = {}
+        next_day = 1
+        for city in visited:
+            start_days[city] = next_day
+            next_day += allocation[city]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                city: pool.submit(
+                    self.optimize_city,
+                    city,
+                    self.city_itinerary(fetched[city]['attractions'], allocation[city]),
+                    hotels.get(city),
+                    transport_mode
+                )
+                for city in visited
+            }
+            optimized = {city: future.result() for city, future in futures.items()}
+
+        plan = {
+            'cities': [
+                {'city': city, 'days': allocation[city], 'start_day': start_days[city]}
+                for city in visited
+            ],
+            'transfers': self.transfers(visited)
+        }
+        for city in visited:
+            forecast = fetched[city]['forecast']
+            for day in range(1, allocation[city] + 1):
+                trip_day = start_days[city] + day - 1
+                plan[f"day_{trip_day}"] = optimized[city].get(f"day_{day}", [])
+                plan[f"day_{trip_day}_city"] = city
+                if trip_day <= len(forecast):
+                    plan[f"day_{trip_day}_weather"] = forecast[trip_day - 1]
+                if f"day_{day}_route_stats" in optimized[city]:
+                    plan[f"day_{trip_day}_route_stats"] = optimized[city][f"day_{day}_route_stats"]
+        logger.info(f"Planned {days} days across {', '.join(visited)}")
+        return plan
@@ -0,0 +1,51 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class OptimizerTrace:
+    """Timings and counters collected while tracing one optimize_itinerary call.
+
+    Stage times accumulate, so a stage entered once per day reports its total.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counters: Counter = Counter()
+        self.substitutions: List[Dict] = []
+        self.routes: Dict[str, Dict] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def substitution(self, day: str, original: Dict, replacement: Dict, reason: str):
+        self.substitutions.append({
+            'day': day,
+            'original': original.get('name', ''),
+            'replacement': replacement.get('name', ''),
+            'category': replacement.get('category'),
+            'reason': reason
+        })
+
+    def as_dict(self) -> Dict:
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'counters': dict(self.counters),
+            'substitutions': {
+                'count': len(self.substitutions),
+                'by_reason': dict(Counter(s['reason'] for s in self.substitutions)),
+                'items': self.substitutions
+            },
+            'routes': self.routes
+        }
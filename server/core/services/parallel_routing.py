@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .held_karp import EXACT_SOLVER_MAX_STOPS
+from .route_solver import solve_route
+
+logger = logging.getLogger(__name__)
+
+# A routing problem: cost matrix plus optional fixed start and end nodes
+RouteProblem = Tuple[np.ndarray, Optional[int], Optional[int]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Workers never fork from the (multi-threaded) server process: a fork there can
+# copy locks held by other threads and deadlock the child
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def start_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Create the process-wide routing pool; call once at startup (see CoreConfig.ready)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(START_METHOD)
+            )
+            logger.info(f"Started day routing pool with {workers} workers ({START_METHOD})")
+        return _pool
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the routing pool, starting it if startup did not.
+
+    The pool keeps the size it was created with; it is never replaced, so
+    days already submitted to it are not cut off.
+    """
+    return _pool or start_process_pool(workers)
+
+
+def _route_shared(
+    name: str,
+    offset: int,
+    size: int,
+    start: Optional[int],
+    end: Optional[int],
+    time_budget: float,
+    exact_max_stops: int
+) -> Tuple[List[int], Dict]:
+    """Worker entry point: solve one day whose matrix lives in shared memory"""
+    # Workers share the parent's resource tracker, so attaching only re-registers
+    # the block there; the parent alone closes and unlinks it
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    matrix = np.ndarray((size, size), dtype=np.float64, buffer=shm.buf, offset=offset)
+    try:
+        return solve_route(matrix, start, end, time_budget, exact_max_stops)
+    finally:
+        del matrix
+        shm.close()
+
+
+class ParallelDayRouter:
+    """Routes independent days on a process pool.
+
+    All day matrices are packed into one shared-memory block, so workers read
+    them in place and only indices and the resulting routes are pickled.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        time_budget: float = 0.05,
+        exact_max_stops: int = EXACT_SOLVER_MAX_STOPS
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.time_budget = time_budget
+        self.exact_max_stops = exact_max_stops
+
+    def route(self, problems: List[RouteProblem]) -> List[Tuple[List[int], Dict]]:
+        """Solve every problem, returning (route, stats) in input order"""
+        if not problems:
+            return []
+        sizes = [len(matrix) for matrix, _, _ in problems]
+        offsets = np.cumsum([0] + [n * n * 8 for n in sizes]).tolist()
+        shm = shared_memory.SharedMemory(create=True, size=max(offsets[-1], 1))
+        try:
+            for (matrix, _, _), offset, n in zip(problems, offsets, sizes):
+                view = np.ndarray((n, n), dtype=np.float64, buffer=shm.buf, offset=offset)
+                view[:] = matrix
+                del view
+
+            pool = get_process_pool(self.workers)
+            futures = [
+                pool.submit(_route_shared, shm.name, offset, n, start, end, self.time_budget, self.exact_max_stops)
+                for (_, start, end), offset, n in zip(problems, offsets, sizes)
+            ]
+            return [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
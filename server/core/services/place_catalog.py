@@ -0,0 +1,164 @@
+import os
+import json
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .spatial_index import PlaceIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'place_catalogs'
+)
+
+# Catalog sources shipped with the app, one JSON file per city
+CATALOG_SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'catalogs')
+
+
+def catalog_key(city: str) -> str:
+    return '_'.join((city or '').lower().split())
+
+
+def load_catalog_source(path: str) -> List[Dict]:
+    """Read a catalog source file: {"city": ..., "places": [{name, location, category, lat, lon}]}"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('places', [])
+
+
+def _pack(places: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[List]]:
+    """Group places by category and pack them into coordinate, offset and text arrays"""
+    # Categories keep the order in which they first appear in the source
+    first_seen = {}
+    for place in places:
+        first_seen.setdefault(place.get('category', 'other'), len(first_seen))
+    places = sorted(places, key=lambda p: first_seen[p.get('category', 'other')])
+    coords = np.array([
+        [float(p['lat']) if p.get('lat') is not None else np.nan,
+         float(p['lon']) if p.get('lon') is not None else np.nan]
+        for p in places
+    ], dtype=np.float64).reshape(-1, 2)
+
+    # Names and locations alternate in one UTF-8 blob
+    chunks = []
+    for place in places:
+        chunks.append(place.get('name', '').encode('utf-8'))
+        chunks.append(place.get('location', '').encode('utf-8'))
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+    text = np.frombuffer(b''.join(chunks), dtype=np.uint8)
+
+    categories = []
+    for i, place in enumerate(places):
+        category = place.get('category', 'other')
+        if categories and categories[-1][0] == category:
+            categories[-1][2] = i + 1
+        else:
+            categories.append([category, i, i + 1])
+    return coords, offsets, text, categories
+
+
+def compile_place_catalog(places: List[Dict], out_dir: str) -> Dict:
+    """Compile places into memory-mappable arrays plus a small meta.json"""
+    coords, offsets, text, categories = _pack(places)
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'coords.npy'), coords)
+    np.save(os.path.join(out_dir, 'offsets.npy'), offsets)
+    np.save(os.path.join(out_dir, 'text.npy'), text)
+    meta = {'places': len(coords), 'categories': categories}
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+class PlaceCatalog:
+    """Read-only catalog of alternative places for one city.
+
+    Compiled catalogs are memory-mapped, so every worker process shares the
+    same pages. Place dicts and the spatial index are built on first use and
+    then shared by every request in the process; treat them as read-only.
+    """
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray, text: np.ndarray, categories: List[List]):
+        self.coords = coords
+        self.offsets = offsets
+        self.text = text
+        self.categories = {category: (start, end) for category, start, end in categories}
+        self._places: Optional[Dict[str, List[Dict]]] = None
+        self._index: Optional[PlaceIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'PlaceCatalog':
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ('coords', 'offsets', 'text')]
+        return cls(*arrays, meta['categories'])
+
+    @classmethod
+    def from_places(cls, places: List[Dict]) -> 'PlaceCatalog':
+        return cls(*_pack(places))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def _string(self, k: int) -> str:
+        start, end = self.offsets[k:k + 2].tolist()
+        return bytes(self.text[start:end]).decode('utf-8')
+
+    def place(self, i: int) -> Dict:
+        category = next(c for c, (start, end) in self.categories.items() if start <= i < end)
+        return {'name': self._string(2 * i), 'location': self._string(2 * i + 1), 'category': category}
+
+    def as_dict(self) -> Dict[str, List[Dict]]:
+        """Places grouped by category, in the shape of ItineraryOptimizer.alternative_places"""
+        if self._places is None:
+            with self._lock:
+                if self._places is None:
+                    self._places = {
+                        category: [self.place(i) for i in range(start, end)]
+                        for category, (start, end) in self.categories.items()
+                    }
+        return self._places
+
+    def spatial_index(self, identify: Callable[[Dict], str]) -> PlaceIndex:
+        """Per-category spatial index over the places that have coordinates"""
+        if self._index is None:
+            places = [place for members in self.as_dict().values() for place in members]
+            coords = np.asarray(self.coords)
+            located = [i for i in range(len(places)) if np.isfinite(coords[i]).all()]
+            index = PlaceIndex([places[i] for i in located], [tuple(coords[i]) for i in located], identify)
+            with self._lock:
+                if self._index is None:
+                    self._index = index
+        return self._index
+
+
+EMPTY_CATALOG = PlaceCatalog.from_places([])
+
+_catalogs: Dict[str, PlaceCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_place_catalog(city: str) -> PlaceCatalog:
+    """Return the alternative-place catalog for a city.
+
+    A compiled catalog under PLACE_CATALOG_DIR wins; otherwise the bundled
+    source for the city is used, and cities without either get an empty one.
+    """
+    key = catalog_key(city)
+    if key not in _catalogs:
+        with _catalogs_lock:
+            if key not in _catalogs:
+                compiled = os.path.join(os.getenv('PLACE_CATALOG_DIR', DEFAULT_CATALOG_DIR), key)
+                source = os.path.join(CATALOG_SOURCE_DIR, f"{key}.json")
+                if key and os.path.exists(os.path.join(compiled, 'meta.json')):
+                    catalog = PlaceCatalog.load(compiled)
+                    logger.info(f"Loaded place catalog for {city} with {len(catalog)} places")
+                elif key and os.path.exists(source):
+                    catalog = PlaceCatalog.from_places(load_catalog_source(source))
+                else:
+                    catalog = EMPTY_CATALOG
+                _catalogs[key] = catalog
+    return _catalogs[key]
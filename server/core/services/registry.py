@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import Any, Callable, Dict
+from .email_service import EmailService
+from .groq_service import GroqService
+from .travel_service import TravelPlannerService
+from .weather_service import WeatherService
+
+
+class ServiceRegistry:
+    """Process-wide service instances, built once on first use and shared by every request.
+
+    Services kept here hold only configuration and long-lived clients (the
+    Groq client keeps its HTTP connection pool), never per-request or
+    per-conversation state, so concurrent requests can borrow the same
+    instance. A factory that raises (e.g. a missing API key) is retried on
+    the next request instead of caching the failure.
+    """
+
+    def __init__(self):
+        self._services: Dict[str, Any] = {}
+        # Reentrant: a factory may borrow other registered services while building
+        self._lock = threading.RLock()
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    service = factory()
+                    self._services[name] = service
+        return service
+
+    def clear(self):
+        """Forget every instance, e.g. after configuration changes"""
+        with self._lock:
+            self._services.clear()
+
+
+_registry = ServiceRegistry()
+
+
+def get_service_registry() -> ServiceRegistry:
+    return _registry
+
+
+def get_weather_service() -> WeatherService:
+    return _registry.get('weather', WeatherService)
+
+
+def get_travel_service() -> TravelPlannerService:
+    return _registry.get('travel', lambda: TravelPlannerService(os.getenv('RAPID_API_KEY')))
+
+
+def get_groq_service() -> GroqService:
+    return _registry.get('groq', lambda: GroqService(get_weather_service(), get_travel_service()))
+
+
+def get_email_service() -> EmailService:
+    return _registry.get('email', EmailService)
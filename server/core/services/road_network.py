@@ -0,0 +1,279 @@
+import os
+import csv
+import json
+import heapq
+import threading
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .distance_matrix import haversine_cross
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy is optional; the pure-Python search is used instead
+    csr_matrix = None
+    csgraph_dijkstra = None
+    cKDTree = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRAPH_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'road_graphs'
+)
+
+# Speed used to reach the nearest road node from the exact place
+ACCESS_SPEED_KMH = 5.0
+
+# Matrix searches stop expanding beyond this many seconds of travel
+MAX_SEARCH_SECONDS = 4 * 60 * 60
+
+# A matrix search first only expands as far as this speed covers the longest
+# straight line between the places, and widens only for targets it missed
+SEARCH_SPEED_KMH = 40.0
+MIN_SEARCH_SECONDS = 10 * 60
+
+EARTH_RADIUS_KM = 6371.0
+
+ARRAYS = ['lat', 'lon', 'indptr', 'indices', 'weights', 'rev_indptr', 'rev_indices', 'rev_weights']
+
+
+def _csr(sources: np.ndarray, targets: np.ndarray, weights: np.ndarray, n_nodes: int):
+    # int32 indices and float64 weights are what scipy's csgraph works on, so
+    # the mapped arrays are used as they are instead of being cast per call
+    order = np.argsort(sources, kind='stable')
+    indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32), weights[order].astype(np.float64)
+
+
+def _unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Points on the unit sphere; the nearest by chord is the nearest by great circle"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+
+
+def compile_road_graph(nodes_csv: str, edges_csv: str, out_dir: str) -> Dict:
+    """Compile a road-graph extract into memory-mappable CSR arrays.
+
+    nodes_csv has columns id, lat, lon. edges_csv has columns source, target,
+    length_m, speed_kmh and optionally oneway (1/0). Edge weights are stored
+    as travel seconds, with a reverse graph for backward searches.
+    """
+    with open(nodes_csv) as f:
+        rows = list(csv.DictReader(f))
+    ids = {row['id']: i for i, row in enumerate(rows)}
+    lat = np.array([float(row['lat']) for row in rows])
+    lon = np.array([float(row['lon']) for row in rows])
+
+    sources, targets, seconds = [], [], []
+    with open(edges_csv) as f:
+        for row in csv.DictReader(f):
+            a, b = ids[row['source']], ids[row['target']]
+            cost = float(row['length_m']) / (float(row['speed_kmh']) / 3.6)
+            sources.append(a)
+            targets.append(b)
+            seconds.append(cost)
+            if row.get('oneway', '0') not in ('1', 'true', 'True', 'yes'):
+                sources.append(b)
+                targets.append(a)
+                seconds.append(cost)
+
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    seconds = np.array(seconds, dtype=np.float64)
+    indptr, indices, weights = _csr(sources, targets, seconds, len(rows))
+    rev_indptr, rev_indices, rev_weights = _csr(targets, sources, seconds, len(rows))
+
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {
+        'lat': lat, 'lon': lon,
+        'indptr': indptr, 'indices': indices, 'weights': weights,
+        'rev_indptr': rev_indptr, 'rev_indices': rev_indices, 'rev_weights': rev_weights
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+    meta = {'nodes': len(rows), 'edges': int(len(indices))}
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+class RoadNetwork:
+    """Read-only road graph answering shortest-time queries.
+
+    Arrays are memory-mapped, so every worker process on the host shares the
+    same pages. Point-to-point queries use bidirectional Dijkstra. Places are
+    snapped to nodes through a KD-tree over the node coordinates. Matrices
+    use scipy's compiled Dijkstra over the mapped arrays when scipy is
+    installed, bounded to the area the targets lie in and widened only for
+    targets not reached; otherwise one multi-target Dijkstra per origin that
+    stops once every destination is settled.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+        self.n_nodes = len(self.lat)
+        self._graph = None
+        self._tree = None
+        self._lock = threading.Lock()
+
+    @property
+    def graph(self):
+        """The forward graph as a scipy CSR matrix sharing the mapped arrays"""
+        if self._graph is None:
+            # Graphs compiled with int64/float32 arrays are converted once here
+            self._graph = csr_matrix(
+                (np.asarray(self.weights, dtype=np.float64), np.asarray(self.indices, dtype=np.int32),
+                 np.asarray(self.indptr, dtype=np.int32)),
+                shape=(self.n_nodes, self.n_nodes), copy=False
+            )
+        return self._graph
+
+    @property
+    def tree(self):
+        """KD-tree over the nodes on the unit sphere, built on first use"""
+        if self._tree is None:
+            with self._lock:
+                if self._tree is None:
+                    self._tree = cKDTree(_unit_vectors(np.asarray(self.lat), np.asarray(self.lon)))
+        return self._tree
+
+    def nearest_nodes(self, coords: Sequence[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Snap coordinates to their nearest graph nodes; returns (nodes, access seconds)"""
+        points = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        lat = np.asarray(self.lat)
+        lon = np.asarray(self.lon)
+        if cKDTree is not None:
+            _, nodes = self.tree.query(_unit_vectors(points[:, 0], points[:, 1]))
+            nodes = np.asarray(nodes, dtype=np.int64)
+        else:
+            # Equirectangular distance is enough to pick the nearest node
+            scale = np.cos(np.radians(points[:, 0]))[:, None]
+            d2 = (lat[None, :] - points[:, 0][:, None]) ** 2 + ((lon[None, :] - points[:, 1][:, None]) * scale) ** 2
+            nodes = np.argmin(d2, axis=1)
+        access_km = haversine_cross(points, np.stack([lat[nodes], lon[nodes]], axis=1)).diagonal()
+        return nodes, access_km / ACCESS_SPEED_KMH * 3600
+
+    def _neighbours(self, node: int, reverse: bool = False):
+        indptr, indices, weights = (
+            (self.rev_indptr, self.rev_indices, self.rev_weights) if reverse
+            else (self.indptr, self.indices, self.weights)
+        )
+        start, end = indptr[node:node + 2].tolist()
+        return zip(indices[start:end].tolist(), weights[start:end].tolist())
+
+    def shortest_time(self, source: int, target: int) -> float:
+        """Shortest travel time in seconds between two nodes (inf if unreachable)"""
+        if source == target:
+            return 0.0
+        dist = [{source: 0.0}, {target: 0.0}]
+        settled = [set(), set()]
+        heaps = [[(0.0, source)], [(0.0, target)]]
+        best = float('inf')
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, node = heapq.heappop(heaps[side])
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+            for neighbour, weight in self._neighbours(node, reverse=side == 1):
+                nd = d + weight
+                if nd < dist[side].get(neighbour, float('inf')):
+                    dist[side][neighbour] = nd
+                    heapq.heappush(heaps[side], (nd, neighbour))
+                    if neighbour in dist[1 - side]:
+                        best = min(best, nd + dist[1 - side][neighbour])
+        return best
+
+    def _times_from(self, source: int, targets: set) -> Dict[int, float]:
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = {}
+        remaining = set(targets)
+        while heap and remaining:
+            d, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = d
+            remaining.discard(node)
+            for neighbour, weight in self._neighbours(node):
+                nd = d + weight
+                if nd < dist.get(neighbour, float('inf')):
+                    dist[neighbour] = nd
+                    heapq.heappush(heap, (nd, neighbour))
+        return settled
+
+    def _search_times(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """Seconds from each source node to each target node with scipy (inf if unreachable)"""
+        unique_sources, source_rows = np.unique(sources, return_inverse=True)
+        lat, lon = np.asarray(self.lat), np.asarray(self.lon)
+        spread_km = haversine_cross(
+            np.stack([lat[unique_sources], lon[unique_sources]], axis=1), np.stack([lat[targets], lon[targets]], axis=1)
+        ).max()
+        limit = min(max(spread_km / SEARCH_SPEED_KMH * 3600, MIN_SEARCH_SECONDS), MAX_SEARCH_SECONDS)
+
+        times = np.full((len(unique_sources), len(targets)), np.inf)
+        pending = np.arange(len(unique_sources))
+        while True:
+            # Exact for every node within the limit; only sources that missed a target search again
+            found = csgraph_dijkstra(self.graph, indices=unique_sources[pending], limit=limit)[:, targets]
+            times[pending] = found
+            pending = pending[~np.isfinite(found).all(axis=1)]
+            if not len(pending) or limit >= MAX_SEARCH_SECONDS:
+                break
+            limit = min(limit * 2, MAX_SEARCH_SECONDS)
+        return times[source_rows]
+
+    def time_matrix(
+        self,
+        coords: Sequence[Tuple[float, float]],
+        destinations: Optional[Sequence[Tuple[float, float]]] = None
+    ) -> np.ndarray:
+        """Travel seconds from each of coords to each destination, including access to the road.
+
+        Without destinations the matrix is square over coords.
+        """
+        nodes, access = self.nearest_nodes(coords)
+        if destinations is None:
+            targets, target_access = nodes, access
+        else:
+            targets, target_access = self.nearest_nodes(destinations)
+        if csgraph_dijkstra is not None:
+            matrix = self._search_times(nodes, targets) + access[:, None] + target_access[None, :]
+        else:
+            matrix = np.full((len(nodes), len(targets)), np.inf)
+            for i, source in enumerate(nodes.tolist()):
+                times = self._times_from(source, set(targets.tolist()))
+                for j, target in enumerate(targets.tolist()):
+                    if target in times:
+                        matrix[i, j] = times[target] + access[i] + target_access[j]
+        if destinations is None:
+            np.fill_diagonal(matrix, 0.0)
+        return matrix
+
+
+_networks: Dict[str, Optional[RoadNetwork]] = {}
+_networks_lock = threading.Lock()
+
+
+def get_road_network(city: str) -> Optional[RoadNetwork]:
+    """Return the compiled road graph for a city, or None if there is none"""
+    key = ' '.join((city or '').lower().split()).replace(' ', '_')
+    if key not in _networks:
+        with _networks_lock:
+            if key not in _networks:
+                path = os.path.join(os.getenv('ROAD_GRAPH_DIR', DEFAULT_GRAPH_DIR), key)
+                network = None
+                if os.path.exists(os.path.join(path, 'meta.json')):
+                    network = RoadNetwork(path)
+                    logger.info(f"Loaded road graph for {city} with {network.n_nodes} nodes")
+                _networks[key] = network
+    return _networks[key]
@@ -0,0 +1,123 @@
+import time
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+# Or-opt moves relocate segments of up to this many consecutive stops
+MAX_SEGMENT_LENGTH = 3
+
+# Improvements smaller than this are treated as rounding noise
+EPSILON = 1e-9
+
+
+def _path_cost(dist: List[List[float]], route: Sequence[int]) -> float:
+    return sum(dist[route[k]][route[k + 1]] for k in range(len(route) - 1))
+
+
+def _prefix_costs(dist: List[List[float]], route: Sequence[int]) -> Tuple[List[float], List[float]]:
+    """Cumulative forward and backward leg costs, so reversals are O(1) to price"""
+    forward = [0.0]
+    backward = [0.0]
+    for k in range(len(route) - 1):
+        forward.append(forward[-1] + dist[route[k]][route[k + 1]])
+        backward.append(backward[-1] + dist[route[k + 1]][route[k]])
+    return forward, backward
+
+
+def _two_opt_pass(dist: List[List[float]], route: List[int], first: int, last: int, deadline: float) -> bool:
+    """Apply the first improving segment reversal found; return whether one was applied"""
+    n = len(route)
+    forward, backward = _prefix_costs(dist, route)
+    for i in range(first, last):
+        if time.perf_counter() > deadline:
+            return False
+        a = route[i - 1]
+        b = route[i]
+        for j in range(i + 1, last + 1):
+            c = route[j]
+            delta = dist[a][c] - dist[a][b]
+            if j + 1 < n:
+                d = route[j + 1]
+                delta += dist[b][d] - dist[c][d]
+            # Interior legs change direction when the matrix is asymmetric
+            delta += (backward[j] - backward[i]) - (forward[j] - forward[i])
+            if delta < -EPSILON:
+                route[i:j + 1] = route[i:j + 1][::-1]
+                return True
+    return False
+
+
+def _or_opt_pass(dist: List[List[float]], route: List[int], first: int, last: int, deadline: float) -> bool:
+    """Apply the first improving segment relocation found; return whether one was applied"""
+    n = len(route)
+    for length in range(1, MAX_SEGMENT_LENGTH + 1):
+        for i in range(first, last - length + 2):
+            if time.perf_counter() > deadline:
+                return False
+            end = i + length - 1
+            prev = route[i - 1]
+            head = route[i]
+            tail = route[end]
+            removal_gain = dist[prev][head]
+            if end + 1 < n:
+                following = route[end + 1]
+                removal_gain += dist[tail][following] - dist[prev][following]
+
+            for p in range(0, last + 1):
+                if i - 1 <= p <= end:
+                    continue
+                u = route[p]
+                insertion_cost = dist[u][head]
+                if p + 1 < n:
+                    v = route[p + 1]
+                    insertion_cost += dist[tail][v] - dist[u][v]
+                if insertion_cost - removal_gain < -EPSILON:
+                    segment = route[i:end + 1]
+                    del route[i:end + 1]
+                    insert_at = p + 1 if p < i else p + 1 - length
+                    route[insert_at:insert_at] = segment
+                    return True
+    return False
+
+
+def improve_route(
+    matrix: np.ndarray,
+    route: Sequence[int],
+    time_budget: float = 0.05,
+    fixed_end: bool = False
+) -> Tuple[List[int], Dict]:
+    """Improve an open route with 2-opt and Or-opt moves.
+
+    The first stop always stays first; with fixed_end the last stop also stays
+    last. Moves are priced with O(1) deltas against the matrix, and the search
+    stops at a local optimum or when the time budget (seconds) runs out.
+    """
+    started = time.perf_counter()
+    dist = np.asarray(matrix, dtype=np.float64).tolist()
+    route = list(route)
+    initial = _path_cost(dist, route)
+
+    first = 1
+    last = len(route) - 2 if fixed_end else len(route) - 1
+    iterations = 0
+    converged = True
+
+    deadline = started + time_budget
+    while True:
+        if time.perf_counter() > deadline:
+            converged = False
+            break
+        if not (_two_opt_pass(dist, route, first, last, deadline) or _or_opt_pass(dist, route, first, last, deadline)):
+            converged = time.perf_counter() <= deadline
+            break
+        iterations += 1
+
+    final = _path_cost(dist, route)
+    return route, {
+        'initial_length': round(initial, 3),
+        'final_length': round(final, 3),
+        'improvement': round(initial - final, 3),
+        'improvement_pct': round((initial - final) / initial * 100, 1) if initial else 0.0,
+        'iterations': iterations,
+        'converged': converged,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
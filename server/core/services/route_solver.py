@@ -0,0 +1,56 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .distance_matrix import route_length
+from .held_karp import held_karp_path, EXACT_SOLVER_MAX_STOPS
+from .route_improvement import improve_route
+
+
+def nearest_neighbor_route(matrix: np.ndarray, start: int = 0) -> List[int]:
+    """Build a route by always moving to the nearest unvisited place"""
+    visited = np.zeros(len(matrix), dtype=bool)
+    visited[start] = True
+    route = [start]
+    current = start
+
+    for _ in range(len(matrix) - 1):
+        current = int(np.argmin(np.where(visited, np.inf, matrix[current])))
+        visited[current] = True
+        route.append(current)
+
+    return route
+
+
+def solve_route(
+    matrix: np.ndarray,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    time_budget: float = 0.05,
+    exact_max_stops: int = EXACT_SOLVER_MAX_STOPS
+) -> Tuple[List[int], Dict]:
+    """Order every node of the matrix, exactly for small days and heuristically otherwise.
+
+    Returns the route and statistics comparing it with the nearest-neighbour
+    construction.
+    """
+    first = 0 if start is None else start
+    nodes = [i for i in range(len(matrix)) if i != end]
+    construction = nearest_neighbor_route(matrix[np.ix_(nodes, nodes)], nodes.index(first))
+    construction = [nodes[i] for i in construction] + ([end] if end is not None else [])
+
+    if len(matrix) <= exact_max_stops:
+        route, _ = held_karp_path(matrix, first, end)
+        initial = route_length(matrix, construction)
+        final = route_length(matrix, route)
+        return route, {
+            'solver': 'exact',
+            'initial_length': round(initial, 3),
+            'final_length': round(final, 3),
+            'improvement': round(initial - final, 3),
+            'improvement_pct': round((initial - final) / initial * 100, 1) if initial else 0.0,
+            'iterations': 0,
+            'converged': True
+        }
+
+    # Improve the constructed route with 2-opt and Or-opt moves
+    route, stats = improve_route(matrix, construction, time_budget, fixed_end=end is not None)
+    return route, {'solver': 'heuristic', **stats}
@@ -0,0 +1,215 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Typical visit length in minutes by activity category
+DEFAULT_DURATIONS = {
+    'cultural': 90,
+    'nature': 90,
+    'shopping': 60,
+    'dining': 60,
+    'food': 60,
+    'restaurants': 60,
+    'entertainment': 120,
+    'attractions': 90,
+    'other': 60
+}
+
+# Meals are scheduled inside these windows, in order
+DEFAULT_MEAL_WINDOWS = [
+    ('12:00', '14:30'),
+    ('19:00', '21:30')
+]
+
+MEAL_CATEGORIES = {'dining', 'food', 'restaurants'}
+
+
+def parse_time(value: str) -> int:
+    """Convert 'HH:MM' into minutes after midnight"""
+    hours, minutes = value.strip().split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+# A clock time such as '9', '09:30', '9 AM' or '9.30pm'
+CLOCK_PATTERN = re.compile(r'(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?', re.IGNORECASE)
+HOURS_PATTERN = re.compile(
+    r'^\s*(?P<opens>\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?\s*m\.?)?)\s*(?:-|–|—|to)\s*'
+    r'(?P<closes>\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?\s*m\.?)?)',
+    re.IGNORECASE
+)
+
+
+def parse_clock(value) -> Optional[int]:
+    """Minutes after midnight for a free-form clock time, or None if it is not one"""
+    match = CLOCK_PATTERN.fullmatch(str(value or '').strip())
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = (match.group(3) or '').lower()
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem == 'p' else 0)
+    if hours > 24 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def parse_opening_hours(hours) -> Optional[Tuple[int, int]]:
+    """(opens, closes) in minutes from a dict or a string like '9 AM - 5 PM'.
+
+    Returns None for anything that cannot be read ('Closed', 'By appointment',
+    per-weekday lists), so callers can fall back to the whole day.
+    """
+    if isinstance(hours, dict):
+        opens, closes = parse_clock(hours.get('open')), parse_clock(hours.get('close'))
+    elif isinstance(hours, str):
+        match = HOURS_PATTERN.match(hours)
+        if not match:
+            return None
+        opens, closes = parse_clock(match.group('opens')), parse_clock(match.group('closes'))
+    else:
+        return None
+    if opens is None or closes is None:
+        return None
+    # Past-midnight closing keeps the place open for the rest of the day
+    return (opens, closes if closes > opens else 24 * 60)
+
+
+# One part of a free-form duration such as '2 hours', '1h 30m' or '45 mins'
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(h(?:ou)?rs?|h|m(?:in(?:ute)?s?)?)(?![a-z])', re.IGNORECASE)
+
+
+def parse_duration(value) -> Optional[int]:
+    """Visit length in minutes from a number of minutes or a string like '2 hours'.
+
+    Returns None for anything that cannot be read ('half a day', 'varies'),
+    so callers can fall back to the category default.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        minutes = float(value)
+    else:
+        text = str(value or '').strip()
+        parts = DURATION_PATTERN.findall(text)
+        if parts:
+            minutes = sum(float(amount) * (60 if unit[0].lower() == 'h' else 1) for amount, unit in parts)
+        else:
+            try:
+                minutes = float(text)
+            except ValueError:
+                return None
+    if not 0 < minutes <= 24 * 60:
+        return None
+    return int(round(minutes))
+
+
+def format_time(minutes: float) -> str:
+    """Convert minutes after midnight into 'HH:MM'"""
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class DayScheduler:
+    """Builds a feasible timed schedule for one day (a single-vehicle VRPTW).
+
+    Every activity has a time window and a visit duration. Activities are
+    inserted one at a time, tightest window first, at the position that
+    delays the end of the day the least while keeping every later activity
+    inside its window. Activities that fit nowhere are reported separately.
+    """
+
+    def __init__(
+        self,
+        day_start: str = '09:00',
+        day_end: str = '22:00',
+        durations: Optional[Dict[str, int]] = None,
+        meal_windows: Optional[List[Tuple[str, str]]] = None
+    ):
+        self.day_start = parse_time(day_start)
+        self.day_end = parse_time(day_end)
+        self.durations = {**DEFAULT_DURATIONS, **(durations or {})}
+        self.meal_windows = [(parse_time(a), parse_time(b)) for a, b in (meal_windows or DEFAULT_MEAL_WINDOWS)]
+
+    def duration(self, activity: Dict) -> int:
+        minutes = parse_duration(activity.get('duration'))
+        if minutes:
+            return minutes
+        category = activity.get('category') or activity.get('type') or 'other'
+        return self.durations.get(category, self.durations['other'])
+
+    def time_windows(self, activities: Sequence[Dict]) -> List[Tuple[int, int]]:
+        """Resolve each activity's (earliest start, latest end) in minutes"""
+        windows = []
+        meals = iter(self.meal_windows)
+        for activity in activities:
+            opening = parse_opening_hours(activity.get('opening_hours'))
+            if opening:
+                window = opening
+            elif (activity.get('category') or activity.get('type')) in MEAL_CATEGORIES:
+                window = next(meals, (self.day_start, self.day_end))
+            else:
+                window = (self.day_start, self.day_end)
+            windows.append((max(window[0], self.day_start), min(window[1], self.day_end)))
+        return windows
+
+    def schedule(self, activities: List[Dict], travel_minutes: np.ndarray) -> Tuple[List[Dict], List[Dict]]:
+        """Return (scheduled activities with 'time' set, activities that did not fit).
+
+        travel_minutes[i][j] is the travel time between activities i and j.
+        """
+        travel = np.asarray(travel_minutes, dtype=np.float64).tolist()
+        windows = self.time_windows(activities)
+        durations = [self.duration(a) for a in activities]
+
+        # Tightest windows first; the incoming (routed) order breaks ties
+        order = sorted(range(len(activities)), key=lambda i: (windows[i][1] - windows[i][0] - durations[i], i))
+
+        route: List[int] = []
+        unscheduled = []
+        for candidate in order:
+            best = None
+            for position in range(len(route) + 1):
+                trial = route[:position] + [candidate] + route[position:]
+                finish = self._finish_time(trial, travel, windows, durations)
+                if finish is not None and (best is None or finish < best[0]):
+                    best = (finish, trial)
+            if best is None:
+                unscheduled.append(activities[candidate])
+            else:
+                route = best[1]
+
+        scheduled = []
+        for index, start in zip(route, self._start_times(route, travel, windows, durations)):
+            activity = dict(activities[index])
+            activity['time'] = format_time(start)
+            activity['end_time'] = format_time(start + durations[index])
+            scheduled.append(activity)
+        return scheduled, unscheduled
+
+    def _start_times(self, route, travel, windows, durations) -> List[float]:
+        starts = []
+        clock = self.day_start
+        previous = None
+        for index in route:
+            if previous is not None:
+                clock += travel[previous][index]
+            clock = max(clock, windows[index][0])
+            starts.append(clock)
+            clock += durations[index]
+            previous = index
+        return starts
+
+    def _finish_time(self, route, travel, windows, durations) -> Optional[float]:
+        """End of the last activity, or None if any window is violated"""
+        clock = self.day_start
+        previous = None
+        for index in route:
+            if previous is not None:
+                clock += travel[previous][index]
+            clock = max(clock, windows[index][0]) + durations[index]
+            if clock > windows[index][1]:
+                return None
+            previous = index
+        return clock
@@ -0,0 +1,96 @@
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy is optional; queries fall back to a linear scan
+    cKDTree = None
+
+Coordinates = Tuple[float, float]
+
+
+def to_unit_vectors(coords: List[Coordinates]) -> np.ndarray:
+    """Project (lat, lon) pairs onto the unit sphere.
+
+    Straight-line distance between the vectors grows monotonically with
+    great-circle distance, so nearest neighbours are preserved.
+    """
+    points = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+    lat, lon = points[:, 0], points[:, 1]
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+
+
+class SpatialIndex:
+    """Nearest-neighbour index over a fixed set of points"""
+
+    def __init__(self, coords: List[Coordinates]):
+        self.size = len(coords)
+        self.points = to_unit_vectors(coords)
+        self.tree = cKDTree(self.points) if cKDTree is not None and self.size else None
+
+    def nearest(self, point: Coordinates, accept: Callable[[int], bool]) -> Optional[int]:
+        """Index of the nearest point for which accept(index) is true.
+
+        The tree is asked for the k nearest points, doubling k until an
+        acceptable one turns up, so the usual case costs a single O(log n) query.
+        """
+        if not self.size:
+            return None
+        target = to_unit_vectors([point])[0]
+        if self.tree is None:
+            order = np.argsort(((self.points - target) ** 2).sum(axis=1), kind='stable').tolist()
+            return next((i for i in order if accept(i)), None)
+
+        checked = 0
+        k = 1
+        while checked < self.size:
+            k = min(k, self.size)
+            _, indices = self.tree.query(target, k=k)
+            for i in np.atleast_1d(indices)[checked:].tolist():
+                if accept(i):
+                    return i
+            checked = k
+            k *= 2
+        return None
+
+
+class PlaceIndex:
+    """Per-category spatial indexes answering "nearest unvisited place of category C to P" """
+
+    def __init__(self, places: List[Dict], coords: List[Coordinates], identify: Callable[[Dict], str]):
+        self.identify = identify
+        grouped = defaultdict(list)
+        for place, point in zip(places, coords):
+            grouped[place.get('category', 'other')].append((place, point))
+        self.places: Dict[str, List[Dict]] = {}
+        self.indexes: Dict[str, SpatialIndex] = {}
+        for category, members in grouped.items():
+            self.places[category] = [place for place, _ in members]
+            self.indexes[category] = SpatialIndex([point for _, point in members])
+
+    def nearest(self, category: str, point: Coordinates, exclude: Set[str]) -> Optional[Dict]:
+        """Closest place of the category whose identifier is not excluded"""
+        if category not in self.indexes:
+            return None
+        places = self.places[category]
+        index = self.indexes[category].nearest(point, lambda i: self.identify(places[i]) not in exclude)
+        return None if index is None else places[index]
+
+    def nearest_in(self, categories: List[str], point: Coordinates, exclude: Set[str]) -> Optional[Dict]:
+        """Closest place in any of the categories whose identifier is not excluded"""
+        target = to_unit_vectors([point])[0]
+        best = None
+        best_distance = np.inf
+        for category in categories:
+            if category not in self.indexes:
+                continue
+            places = self.places[category]
+            index = self.indexes[category]
+            i = index.nearest(point, lambda i: self.identify(places[i]) not in exclude)
+            if i is None:
+                continue
+            distance = float(((index.points[i] - target) ** 2).sum())
+            if distance < best_distance:
+                best, best_distance = places[i], distance
+        return best
@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+import numpy as np
+
+
+class TravelModeProfile:
+    """Turns straight-line distances into door-to-door minutes for one mode.
+
+    detour_factor stretches the straight line to the real path length and
+    fixed_minutes covers waiting, parking or boarding on every leg.
+    """
+
+    def __init__(self, name: str, speed_kmh: float, detour_factor: float = 1.0, fixed_minutes: float = 0.0):
+        self.name = name
+        self.speed_kmh = speed_kmh
+        self.detour_factor = detour_factor
+        self.fixed_minutes = fixed_minutes
+
+    def minutes(self, distance_km: np.ndarray) -> np.ndarray:
+        minutes = distance_km * self.detour_factor / self.speed_kmh * 60 + self.fixed_minutes
+        return np.where(distance_km > 0, minutes, 0.0)
+
+
+PROFILES = {
+    # The historical estimate: straight line at an average 20 km/h
+    'default': TravelModeProfile('default', speed_kmh=20),
+    'walking': TravelModeProfile('walking', speed_kmh=4.5, detour_factor=1.25),
+    'transit': TravelModeProfile('transit', speed_kmh=18, detour_factor=1.3, fixed_minutes=10),
+    'car': TravelModeProfile('car', speed_kmh=22, detour_factor=1.3, fixed_minutes=5),
+}
+
+# Extra minutes for getting on or off transit when a mixed leg uses it
+MODE_SWITCH_MINUTES = 3
+
+# Preferences as extracted by TravelPlannerService.extract_transport_preference
+MODE_ALIASES = {
+    'public': 'transit',
+    'private': 'car',
+    'walking': 'walking',
+    'mixed': 'mixed',
+    'transit': 'transit',
+    'car': 'car',
+    'default': 'default',
+}
+
+
+def resolve_mode(preference: Optional[str]) -> str:
+    """Map a user transport preference to a profile name"""
+    return MODE_ALIASES.get((preference or 'default').strip().lower(), 'default')
+
+
+def mode_time_matrix(distance_km: np.ndarray, mode: str) -> np.ndarray:
+    """Travel minutes for every pair of places in the given mode.
+
+    Mixed travel walks short legs and takes transit for long ones, paying a
+    switching penalty whenever transit is used.
+    """
+    if mode == 'mixed':
+        walking = PROFILES['walking'].minutes(distance_km)
+        transit = PROFILES['transit'].minutes(distance_km) + MODE_SWITCH_MINUTES
+        return np.where(distance_km > 0, np.minimum(walking, transit), 0.0)
+    return PROFILES[mode].minutes(distance_km)
+
+
+class TravelTimeCache:
+    """LRU cache of time matrices keyed by (city, mode, place coordinates)"""
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self._entries: 'OrderedDict[Tuple[str, str, str], np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(city: str, mode: str, coords: Sequence[Tuple[float, float]]) -> Tuple[str, str, str]:
+        digest = hashlib.sha1(np.asarray(coords, dtype=np.float64).tobytes()).hexdigest()
+        return (' '.join((city or '').lower().split()), mode, digest)
+
+    def get_or_compute(self, city: str, mode: str, coords: Sequence[Tuple[float, float]], compute: Callable[[], np.ndarray]) -> np.ndarray:
+        key = self.key(city, mode, coords)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        matrix = compute()
+        matrix.setflags(write=False)
+        with self._lock:
+            self._entries[key] = matrix
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return matrix
+
+
+_shared_cache = TravelTimeCache()
+
+
+def get_travel_time_cache() -> TravelTimeCache:
+    """Return the process-wide travel time cache"""
+    return _shared_cache
@@ -2,6 +2,7 @@ import os
 import re
 import json
 import requests
+import threading
 import logging
 import random
 from typing import Dict, List, Optional, Any
@@ -10,6 +11,22 @@ from typing import Dict, List, Optional, Any
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Forecast conditions that move a day's plan indoors
+BAD_WEATHER_CONDITIONS = ['rain', 'storm', 'snow']
+
+# Categories preferred over outdoor ones when the weather is bad
+INDOOR_CATEGORIES = ['cultural', 'entertainment']
+
+# Categories that suffer in bad weather
+OUTDOOR_CATEGORIES = {'nature'}
+
+
+def is_bad_weather(weather: Optional[Dict]) -> bool:
+    """Whether a forecast calls for indoor activities"""
+    condition = (weather or {}).get('condition', '').lower()
+    return any(bad_weather in condition for bad_weather in BAD_WEATHER_CONDITIONS)
+
+
 class TravelPlannerService:
     """Service for planning travel itineraries using RapidAPI."""
     
@@ -32,8 +49,17 @@ class TravelPlannerService:
             'X-RapidAPI-Key': api_key,
             'X-RapidAPI-Host': 'travel-advisor.p.rapidapi.com'
         }
+        # One Session per thread: the service is shared across request threads, a Session is not thread-safe
+        self._local = threading.local()
         logger.info("✅ Initialized TravelPlannerService with RapidAPI")
 
+    @property
+    def session(self) -> requests.Session:
+        """This thread's HTTP session, reusing pooled connections across its calls"""
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
     def determine_conversation_state(self, user_message: str, current_state: Dict) -> Dict:
         """Determine the next conversation state based on user input."""
         try:
@@ -289,7 +315,7 @@ class TravelPlannerService:
             logger.info(f"🔍 Searching for places in {destination}...")
             
             # Make the API request
-            response = requests.get(
+            response = self.session.get(
                 url,
                 headers=self.headers,
                 params=querystring,
@@ -378,7 +404,7 @@ class TravelPlannerService:
                 'lang': 'en'
             }
 
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             data = response.json().get('data', [])
 
@@ -450,7 +476,7 @@ class TravelPlannerService:
                 'lang': 'en'
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -484,7 +510,7 @@ class TravelPlannerService:
                 'sort': 'rating'
             }
 
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             data = response.json().get('data', [])
 
@@ -527,7 +553,7 @@ class TravelPlannerService:
                 'sort': 'rating'
             }
 
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             data = response.json().get('data', [])
 
@@ -561,7 +587,7 @@ class TravelPlannerService:
                 'limit': '1'
             }
 
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             data = response.json().get('data', [])
 
@@ -616,13 +642,11 @@ class TravelPlannerService:
         ]
         
         # Weather-based activity selection
-        is_good_weather = True
+        is_good_weather = not is_bad_weather(weather)
         weather_note = ""
-        if weather:
+        if not is_good_weather:
             condition = weather.get('condition', '').lower()
-            is_good_weather = not any(bad_weather in condition for bad_weather in ['rain', 'storm', 'snow'])
-            if not is_good_weather:
-                weather_note = f"Note: {condition} forecast. Consider indoor activities."
+            weather_note = f"Note: {condition} forecast. Consider indoor activities."
         
         # Select places based on activity type and weather
         for time, period in time_slots:
@@ -643,7 +667,7 @@ class TravelPlannerService:
                 if activity_type == 'culture':
                     preferred_categories = ['cultural', 'attractions']
                 elif activity_type == 'nature':
-                    preferred_categories = ['nature', 'attractions'] if is_good_weather else ['cultural', 'entertainment']
+                    preferred_categories = ['nature', 'attractions'] if is_good_weather else INDOOR_CATEGORIES
                 elif activity_type == 'shopping':
                     preferred_categories = ['shopping', 'entertainment']
                 else:  # mixed
@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .distance_matrix import haversine_cross
+from .min_cost_flow import MinCostFlow
+from .travel_service import OUTDOOR_CATEGORIES
+
+Coordinates = Tuple[float, float]
+
+
+class AssignmentWeights:
+    """Cost terms for placing a candidate on a day, in common penalty points"""
+
+    def __init__(
+        self,
+        rating: float = 2.0,
+        default_rating: float = 4.0,
+        alternative: float = 3.0,
+        weather: float = 6.0,
+        distance_km: float = 0.5,
+        balance: float = 2.0,
+        unlocated_km: float = 5.0
+    ):
+        # Per star below a perfect 5
+        self.rating = rating
+        # Assumed rating of places that carry none
+        self.default_rating = default_rating
+        # Catalog alternatives only win over planned places when clearly better
+        self.alternative = alternative
+        # Outdoor place on a bad-weather day
+        self.weather = weather
+        # Per km from the day's centre
+        self.distance_km = distance_km
+        # Each further place of a category already on the day costs this much more
+        self.balance = balance
+        # Distance assumed for places without coordinates
+        self.unlocated_km = unlocated_km
+
+
+class Candidate:
+    """A place that may be assigned to a day"""
+
+    def __init__(
+        self,
+        place: Dict,
+        category: str,
+        coords: Optional[Coordinates] = None,
+        day: Optional[int] = None,
+        alternative: bool = False
+    ):
+        self.place = place
+        self.category = category
+        self.coords = coords
+        # Day the place was originally planned on, if any
+        self.day = day
+        self.alternative = alternative
+
+    def rating(self, default: float) -> float:
+        try:
+            return min(max(float(self.place.get('rating')), 0.0), 5.0)
+        except (TypeError, ValueError):
+            return default
+
+
+class TripAssigner:
+    """Assigns candidate places to the days of a trip in one min-cost-flow solve.
+
+    The network runs source -> candidate -> (day, category) -> day -> sink.
+    Candidates carry one unit each, so every place is used at most once.
+    Candidate-to-day edges cost rating, weather suitability and distance from
+    the day's centre. (day, category) -> day has one edge per allowed place
+    with rising cost, which balances categories and caps them per day. Day
+    capacities are the number of slots to fill. Successive shortest paths
+    fill every slot at minimum total cost, so late days are not left with
+    what the early days passed over.
+    """
+
+    def __init__(self, weights: Optional[AssignmentWeights] = None, max_per_category: int = 2):
+        self.weights = weights or AssignmentWeights()
+        self.max_per_category = max_per_category
+
+    def day_centres(self, candidates: List[Candidate], days: int) -> List[Optional[Coordinates]]:
+        """Centroid of each day's originally planned places, or of the whole trip"""
+        located = [c for c in candidates if c.coords and not c.alternative]
+        if not located:
+            return [None] * days
+        trip = tuple(np.mean([c.coords for c in located], axis=0))
+        centres = []
+        for day in range(days):
+            points = [c.coords for c in located if c.day == day]
+            centres.append(tuple(np.mean(points, axis=0)) if points else trip)
+        return centres
+
+    def costs(self, candidates: List[Candidate], bad_weather: List[bool]) -> np.ndarray:
+        """Candidate x day cost matrix"""
+        days = len(bad_weather)
+        w = self.weights
+        base = np.array([
+            w.rating * (5.0 - c.rating(w.default_rating)) + (w.alternative if c.alternative else 0.0)
+            for c in candidates
+        ]).reshape(-1, 1)
+        outdoor = np.array([c.category in OUTDOOR_CATEGORIES for c in candidates]).reshape(-1, 1)
+        weather = w.weather * (outdoor & np.array(bad_weather, dtype=bool).reshape(1, -1))
+
+        distance = np.full((len(candidates), days), w.unlocated_km)
+        centres = self.day_centres(candidates, days)
+        located = [i for i, c in enumerate(candidates) if c.coords]
+        with_centre = [d for d in range(days) if centres[d]]
+        if located and with_centre:
+            km = haversine_cross([candidates[i].coords for i in located], [centres[d] for d in with_centre])
+            distance[np.ix_(located, with_centre)] = km
+        return base + weather + w.distance_km * distance
+
+    def assign(self, candidates: List[Candidate], slots: List[int], bad_weather: Optional[List[bool]] = None) -> List[List[int]]:
+        """Indices of the candidates chosen for each day"""
+        days = len(slots)
+        bad_weather = bad_weather or [False] * days
+        if not candidates or not days:
+            return [[] for _ in range(days)]
+        cost = self.costs(candidates, bad_weather)
+        categories = sorted({c.category for c in candidates})
+
+        flow = MinCostFlow(2)
+        source, sink = 0, 1
+        day_nodes = [flow.add_node() for _ in range(days)]
+        for day, node in enumerate(day_nodes):
+            flow.add_edge(node, sink, slots[day], 0.0)
+        bucket = {}
+        for day, node in enumerate(day_nodes):
+            for category in categories:
+                bucket[day, category] = flow.add_node()
+                for k in range(min(self.max_per_category, slots[day])):
+                    flow.add_edge(bucket[day, category], node, 1, self.weights.balance * k)
+
+        edges = []
+        for i, candidate in enumerate(candidates):
+            node = flow.add_node()
+            flow.add_edge(source, node, 1, 0.0)
+            for day in range(days):
+                edges.append((i, day, flow.add_edge(node, bucket[day, candidate.category], 1, float(cost[i, day]))))
+        flow.solve(source, sink)
+
+        assigned = [[] for _ in range(days)]
+        for i, day, edge in edges:
+            if flow.flow(edge):
+                assigned[day].append(i)
+        return assigned
@@ -1,5 +1,6 @@
 import os
 import requests
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List
 
@@ -9,6 +10,15 @@ class WeatherService:
         if not self.api_key:
             raise ValueError("Weather API key not found")
         self.base_url = 'http://api.weatherapi.com/v1'
+        # One Session per thread: the service is shared across request threads, a Session is not thread-safe
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """This thread's HTTP session, reusing pooled connections across its calls"""
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
 
     def get_forecast(self, city: str, days: int) -> List[Dict]:
         """Get weather forecast for a city for the specified number of days."""
@@ -22,7 +32,7 @@ class WeatherService:
             }
 
             print(f"Fetching weather for {city} for {days} days...")
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -87,7 +97,7 @@ class WeatherService:
                 'aqi': 'no'
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -5,10 +5,13 @@ urlpatterns = [
     # Chat API
     path('api/chat/start', chat_views.start_chat, name='start_chat'),
     path('api/chat/process', chat_views.process_chat, name='process_chat'),
+    path('api/chat/process/stream', chat_views.process_chat_stream, name='process_chat_stream'),
     path('api/chat/send-itinerary', chat_views.send_itinerary_email, name='send_itinerary_email'),
     
     # Travel planning API
     path('api/travel/plan', travel_views.plan_travel, name='plan_travel'),
+    path('api/travel/reoptimize', travel_views.reoptimize_travel, name='reoptimize_travel'),
+    path('api/travel/multi-city', travel_views.plan_multi_city, name='plan_multi_city'),
     
     # Health check API
     path('api/health', health_views.health_check, name='health_check'),
@@ -1,10 +1,9 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
-from ..services.groq_service import GroqService
-from ..services.weather_service import WeatherService
-from ..services.email_service import EmailService
+from ..services.groq_service import Conversation
+from ..services.registry import get_email_service, get_groq_service
 import logging
 
 # Configure logging
@@ -18,6 +17,21 @@ def add_cors_headers(response):
     response["Access-Control-Allow-Headers"] = "Content-Type"
     return response
 
+def sse_event(event: str, payload: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def chat_response(result: dict) -> dict:
+    """Body process_chat returns for a processed message"""
+    return {
+        "message": result["reply"],
+        "currentState": {
+            "state": result["state"],
+            "data": result.get("data", {})
+        },
+        "preferences": result["preferences"]
+    }
+
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
 def start_chat(request):
@@ -67,27 +81,15 @@ def process_chat(request):
         logger.info(f"Current state: {current_state}")
         logger.info(f"Current preferences: {current_preferences}")
         
-        # Initialize services
-        groq_service = GroqService()
-        
-        # Set the current state and preferences from the request
-        state = current_state.get('state', 'asking_destination')
-        groq_service.conversation_state = state
-        groq_service.current_preferences = current_preferences or {}
+        # The conversation travels with the request; the service is shared
+        conversation = Conversation(current_state.get('state', 'asking_destination'), current_preferences)
         
         # Process the message
-        result = groq_service.process_message(message)
+        result = get_groq_service().process_message(message, conversation)
         
         logger.info(f"Processing result: {result}")
         
-        response = JsonResponse({
-            "message": result["reply"],
-            "currentState": {
-                "state": result["state"],
-                "data": result.get("data", {})
-            },
-            "preferences": result["preferences"]
-        })
+        response = JsonResponse(chat_response(result))
         return add_cors_headers(response)
 
     except Exception as e:
@@ -100,6 +102,49 @@ def process_chat(request):
         }, status=500)
         return add_cors_headers(response)
 
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def process_chat_stream(request):
+    """process_chat as Server-Sent Events.
+
+    A 'status' event is sent before the upstream lookups, 'sources' when they
+    are done, and the itinerary arrives as 'token' events while it is
+    generated; the final 'done' (or 'error') event carries the body
+    process_chat would return, including the weather, attractions and
+    preferences.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+
+    try:
+        data = json.loads(request.body)
+        conversation = Conversation(data.get('currentState', {}).get('state', 'asking_destination'), data.get('preferences', {}))
+        message = data.get('message', '')
+    except Exception as e:
+        logger.error(f"Error processing chat stream: {str(e)}")
+        response = JsonResponse({
+            "message": "I apologize, but I encountered an error. Please try again.",
+            "error": str(e)
+        }, status=500)
+        return add_cors_headers(response)
+
+    def events():
+        try:
+            groq_service = get_groq_service()
+        except Exception as e:
+            logger.error(f"Error processing chat stream: {str(e)}")
+            yield sse_event("error", {"message": "I apologize, but I encountered an error. Please try again.", "error": str(e)})
+            return
+        for event, payload in groq_service.stream_message(message, conversation):
+            yield sse_event(event, chat_response(payload) if event in ("done", "error") else payload)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream, which would hold back the first token
+    response["X-Accel-Buffering"] = "no"
+    return add_cors_headers(response)
+
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
 def send_itinerary_email(request):
@@ -119,11 +164,8 @@ def send_itinerary_email(request):
             }, status=400)
             return add_cors_headers(response)
             
-        # Initialize email service
-        email_service = EmailService()
-        
         # Send email
-        success = email_service.send_itinerary_email(email, itinerary_data)
+        success = get_email_service().send_itinerary_email(email, itinerary_data)
         
         if success:
             response = JsonResponse({
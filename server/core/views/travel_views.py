@@ -2,7 +2,9 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
-from ..services.travel_service import TravelPlannerService
+from ..services.itinerary_optimizer import ItineraryOptimizer
+from ..services.multi_city_planner import MultiCityPlanner
+from ..services.registry import get_travel_service, get_weather_service
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
@@ -31,8 +33,8 @@ def plan_travel(request):
         # Calculate max_tokens based on the trip length
         max_tokens = min(500 + (days * 100), 2000)  # Cap at 2000
 
-        # Initialize travel planner service
-        service = TravelPlannerService()
+        # Shared travel planner service
+        service = get_travel_service()
 
         # Generate itinerary with max_tokens
         result = service.generate_itinerary(data, max_tokens=max_tokens)
@@ -50,3 +52,64 @@ def plan_travel(request):
     except Exception as e:
         print(f"Error in plan_travel: {str(e)}")
         return JsonResponse({"error": str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def reoptimize_travel(request):
+    """Apply activity edits to an itinerary and re-plan only the affected days"""
+    try:
+        data = json.loads(request.body)
+        itinerary = data.get("itinerary")
+        changes = data.get("changes", [])
+        city = data.get("city") or data.get("destination", "")
+
+        if not isinstance(itinerary, dict) or not city:
+            return JsonResponse({"error": "Itinerary and city are required"}, status=400)
+        if not isinstance(changes, list):
+            return JsonResponse({"error": "Changes must be a list"}, status=400)
+
+        # Optimizers carry per-trip state, so each request gets its own; caches and geocoders are shared
+        optimizer = ItineraryOptimizer()
+        updated, diff = optimizer.reoptimize_itinerary(
+            itinerary,
+            changes,
+            city,
+            hotel=data.get("hotel"),
+            transport_mode=data.get("transport_mode")
+        )
+        return JsonResponse({"itinerary": updated, "diff": diff})
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format"}, status=400)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        print(f"Error in reoptimize_travel: {str(e)}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def plan_multi_city(request):
+    """Plan one trip across several cities"""
+    try:
+        data = json.loads(request.body)
+        cities = data.get("cities", [])
+        if isinstance(cities, str):
+            cities = cities.split(",")
+        days = int(data.get("days", 5))
+
+        try:
+            weather_service = get_weather_service()
+        except ValueError:
+            weather_service = None
+        planner = MultiCityPlanner(get_travel_service(), weather_service)
+        plan = planner.plan(cities, days, hotels=data.get("hotels"), transport_mode=data.get("transport_mode"))
+        return JsonResponse(plan)
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format"}, status=400)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        print(f"Error in plan_multi_city: {str(e)}")
+        return JsonResponse({"error": str(e)}, status=500)
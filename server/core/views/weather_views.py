@@ -3,13 +3,10 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 import logging
 import json
-from ..services.weather_service import WeatherService
+from ..services.registry import get_weather_service
 
 logger = logging.getLogger(__name__)
 
-# Create a single instance of WeatherService to use caching
-weather_service = WeatherService()
-
 @csrf_exempt
 @require_http_methods(["GET", "OPTIONS"])
 def get_weather(request, city):
@@ -27,7 +24,7 @@ def get_weather(request, city):
         logger.info(f"🌤 Getting weather data for {city}")
         
         # Get weather data
-        weather_data = weather_service.get_weather_info(city)
+        weather_data = get_weather_service().get_weather_info(city)
         
         if weather_data is None:
             logger.error("❌ Failed to fetch weather data")
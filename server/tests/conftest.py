@@ -10,7 +10,35 @@ os.environ.setdefault('EMAIL_HOST', 'localhost')
 os.environ.setdefault('EMAIL_PORT', '587')
 os.environ.setdefault('EMAIL_HOST_USER', 'test@example.com')
 os.environ.setdefault('EMAIL_HOST_PASSWORD', 'test_password')
+os.environ.setdefault('GEOCODE_CACHE_PATH', ':memory:')
+os.environ.setdefault('NOMINATIM_MIN_INTERVAL', '0')
+os.environ.setdefault('MATRIX_CACHE_DIR', '')
 
 # Configure Django settings before running tests
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.test_settings')
 django.setup()
+
+import pytest
+from core.services.geocode_cache import GeocodeCache
+from core.services.itinerary_optimizer import ItineraryOptimizer
+from core.services.local_geocoder import LocalGeocoder
+from core.services.travel_modes import TravelTimeCache
+
+
+@pytest.fixture
+def make_optimizer():
+    """Build offline optimizers: in-memory geocode cache, bundled landmarks and a private travel-time cache.
+
+    Keyword arguments are passed to ItineraryOptimizer and override those defaults.
+    """
+    def make(**kwargs):
+        kwargs.setdefault('geocode_cache', GeocodeCache(':memory:'))
+        kwargs.setdefault('local_geocoder', LocalGeocoder())
+        kwargs.setdefault('travel_time_cache', TravelTimeCache())
+        return ItineraryOptimizer(**kwargs)
+    return make
+
+
+@pytest.fixture
+def optimizer(make_optimizer):
+    return make_optimizer()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from core.services.local_geocoder import LocalGeocoder
+from core.services.diversity import DiversityConstraints
+
+CITY = 'Testville'
+
+@pytest.fixture
+def optimizer(make_optimizer):
+    local = LocalGeocoder()
+    rng = np.random.default_rng(7)
+    for i, (lat, lon) in enumerate(rng.random((60, 2)) * 0.2):
+        local.add(f"Stop {i}", CITY, (12.9 + lat, 77.5 + lon))
+    return make_optimizer(local_geocoder=local, diversity=DiversityConstraints(max_per_category=100))
+
+def plan(days, stops):
+    return {
+        f"day_{d + 1}": [{'name': f"Stop {d * stops + i}", 'location': f"Stop {d * stops + i}"} for i in range(stops)]
+        for d in range(days)
+    }
+
+def test_no_report_without_deadline(optimizer):
+    assert 'optimization' not in optimizer.optimize_itinerary(plan(2, 4), CITY)
+
+def test_generous_deadline_converges(optimizer):
+    result = optimizer.optimize_itinerary(plan(3, 6), CITY, deadline_ms=2000)
+    report = result['optimization']
+    assert report['converged'] is True
+    assert report['objective'] == pytest.approx(sum(result[f"day_{d}_route_stats"]['final_length'] for d in (1, 2, 3)), abs=1e-2)
+    assert report['objective_unit'] == 'km'
+    assert all(result[f"day_{d}_route_stats"]['solver'] == 'exact' for d in (1, 2, 3))
+
+def test_expired_deadline_still_returns_full_plan(optimizer):
+    result = optimizer.optimize_itinerary(plan(2, 20), CITY, deadline_ms=0)
+    assert result['optimization']['converged'] is False
+    for day in ('day_1', 'day_2'):
+        assert len(result[day]) == 20
+        assert result[f"{day}_route_stats"]['solver'] == 'heuristic'
+    assert optimizer.deadline is None
+
+def test_more_time_never_worse(optimizer):
+    quick = optimizer.optimize_itinerary(plan(2, 25), CITY, deadline_ms=0)['optimization']['objective']
+    better = optimizer.optimize_itinerary(plan(2, 25), CITY, deadline_ms=500)['optimization']['objective']
+    assert better <= quick + 1e-6
+
+@patch('requests.get')
+def test_deadline_skips_network_geocoding(mock_get, optimizer):
+    itinerary = {'day_1': [
+        {'name': 'Stop 1', 'location': 'Stop 1'},
+        {'name': 'Somewhere new', 'location': 'Unknown Street 12'},
+        {'name': 'Stop 2', 'location': 'Stop 2'},
+    ]}
+    result = optimizer.optimize_itinerary(itinerary, CITY, deadline_ms=0)
+    assert mock_get.call_count == 0
+    assert result['optimization']['skipped_geocodes'] >= 1
+    assert result['optimization']['converged'] is False
@@ -0,0 +1,113 @@
+import pytest
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+from django.core.management import call_command
+from travel_app.models import Activity, DayPlan, Itinerary, User
+from travel_app.services.batch_reoptimizer import BatchReoptimizer
+
+START = date(2026, 8, 1)
+
+
+def make_trip(user, destination, days, status='planned'):
+    trip = Itinerary.objects.create(
+        user=user, title=f"{destination} trip", destination=destination, start_date=START,
+        end_date=START + timedelta(days=len(days) - 1), budget='medium', status=status
+    )
+    for number, activities in enumerate(days, start=1):
+        day = DayPlan.objects.create(itinerary=trip, day_number=number, weather={'condition': 'Sunny'})
+        for time, (name, location) in activities:
+            Activity.objects.create(day_plan=day, name=name, location=location, time=time, category='')
+    return trip
+
+
+@pytest.fixture
+def offline_optimizer(make_optimizer):
+    return lambda: make_optimizer(geocoder=Mock(geocode=Mock(return_value=(True, None))))
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='planner', email='planner@example.com', password='secret')
+
+
+@pytest.mark.django_db
+def test_itineraries_are_reordered_and_deduplicated_in_place(user, offline_optimizer):
+    zigzag = [
+        ('09:00', ('Hebbal Lake', 'Hebbal Lake')),
+        ('11:00', ('Lalbagh Botanical Garden', 'Lalbagh')),
+        ('14:00', ('Bangalore Palace', 'Bangalore Palace')),
+    ]
+    trip = make_trip(user, 'Bangalore', [zigzag, [('10:00', ('Lalbagh Botanical Garden', 'Lalbagh'))]])
+    make_trip(user, ' bangalore', [zigzag])
+    make_trip(user, 'Bangalore', [zigzag], status='completed')
+    ids_before = set(Activity.objects.values_list('id', flat=True))
+
+    stats = BatchReoptimizer(offline_optimizer, max_workers=2, chunk_size=1).run()
+
+    assert stats['cities'] == 1
+    assert stats['itineraries'] == 2
+    assert stats['activities_unmatched'] == 0
+    assert stats['itineraries_per_second'] > 0
+    # Rows are updated, never recreated
+    assert set(Activity.objects.values_list('id', flat=True)) == ids_before
+
+    day_1, day_2 = trip.days.all()
+    names = [a.name for a in day_1.activities.all()]
+    assert [a.time for a in day_1.activities.all()] == ['09:00', '11:00', '14:00']
+    # The palace lies between Hebbal and Lalbagh, so the route passes it in the middle
+    assert names[1] == 'Bangalore Palace'
+    # The garden already visited on day 1 is swapped for an unvisited place
+    swapped = day_2.activities.get()
+    assert swapped.name != 'Lalbagh Botanical Garden' and swapped.time == '10:00'
+
+    completed = Itinerary.objects.get(status='completed')
+    assert [a.name for a in completed.days.get().activities.all()][1] == 'Lalbagh Botanical Garden'
+
+
+@pytest.mark.django_db
+def test_city_geocoded_once_for_all_its_itineraries(user, offline_optimizer):
+    for _ in range(3):
+        make_trip(user, 'Bangalore', [[('09:00', ('Somewhere Unknown', 'Somewhere Unknown'))]])
+    make_trip(user, 'Delhi', [[('09:00', ('Lodhi Garden', 'Lodhi Garden'))]])
+    optimizers = []
+
+    def factory():
+        optimizers.append(offline_optimizer())
+        return optimizers[-1]
+
+    stats = BatchReoptimizer(factory, max_workers=2).run(['bangalore'])
+
+    assert stats['cities'] == 1 and stats['itineraries'] == 3
+    lookups = sum(optimizer.geocoder.geocode.call_count for optimizer in optimizers)
+    assert lookups == 1
+
+
+@pytest.mark.django_db
+def test_activities_the_optimizer_drops_are_kept(user, offline_optimizer):
+    # Shimla has no catalog, so the third cultural place has no alternative and is left out
+    temples = [
+        ('09:00', ('Jakhu Temple', 'Jakhu Temple')),
+        ('11:00', ('State Museum', 'State Museum')),
+        ('14:00', ('Kali Bari Temple', 'Kali Bari Temple')),
+    ]
+    trip = make_trip(user, 'Shimla', [temples])
+    before = {(a.id, a.name) for a in Activity.objects.all()}
+
+    stats = BatchReoptimizer(offline_optimizer, max_workers=1).run()
+
+    assert stats['activities_unmatched'] == 1
+    assert {(a.id, a.name) for a in Activity.objects.all()} == before
+    assert sorted(a.time for a in trip.days.get().activities.all()) == ['09:00', '11:00', '14:00']
+
+
+@pytest.mark.django_db
+def test_reoptimize_itineraries_command(capsys):
+    with patch('travel_app.management.commands.reoptimize_itineraries.BatchReoptimizer') as batch:
+        batch.return_value.run.return_value = {
+            'cities': 2, 'itineraries': 40, 'activities_updated': 12, 'activities_unmatched': 1,
+            'seconds': 2.0, 'itineraries_per_second': 20.0
+        }
+        call_command('reoptimize_itineraries', '--city', 'Delhi', '--workers', '4')
+    batch.assert_called_once_with(max_workers=4, chunk_size=200, transport_mode=None)
+    batch.return_value.run.assert_called_once_with(['Delhi'])
+    assert '40 itineraries in 2 cities (20.0 itineraries/s)' in capsys.readouterr().out
@@ -0,0 +1,42 @@
+import json
+import pytest
+from benchmarks.optimizer_bench import compare, main, mst_length, run_benchmarks
+from benchmarks.synthetic import DISTRIBUTIONS, SyntheticCity
+
+
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+def test_synthetic_city_is_reproducible_and_offline(distribution):
+    city = SyntheticCity(12, distribution, seed=3)
+    again = SyntheticCity(12, distribution, seed=3)
+    assert [p['lat'] for p in city.places] == [p['lat'] for p in again.places]
+    assert all(city.coordinates(p['location']) == (p['lat'], p['lon']) for p in city.places)
+    itinerary = city.itinerary(5)
+    assert len(itinerary) == 5
+    assert sum(len(day) for day in itinerary.values()) == 12
+
+def test_mst_length():
+    # Three points on the equator, 1 degree apart: the tree is the two short edges
+    assert mst_length([(0, 0), (0, 1), (0, 2)]) == pytest.approx(2 * 111.19, rel=1e-3)
+    assert mst_length([(0, 0)]) == 0.0
+
+def test_run_benchmarks_reports_tour_against_bound():
+    results = run_benchmarks([8], [1, 2], ['clustered'], ['day_route', 'itinerary'], repeats=1)
+    assert [(r['benchmark'], r['days']) for r in results] == [
+        ('day_route', 1), ('itinerary', 1), ('day_route', 2), ('itinerary', 2)
+    ]
+    for record in results:
+        assert record['tour_km'] >= record['lower_bound_km'] > 0
+        assert record['wall_ms_min'] <= record['wall_ms_median']
+        assert record['peak_kib'] > 0
+        assert record['solvers'] == {'exact': record['days']}
+
+def test_main_writes_json_and_compares(tmp_path, capsys):
+    out = tmp_path / 'results.json'
+    assert main(['--sizes', '5', '--days', '1', '--distributions', 'uniform', '--repeats', '1', '--out', str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert {r['benchmark'] for r in report['results']} == {'day_activities', 'day_route', 'itinerary'}
+    assert report['config']['sizes'] == [5]
+
+    rows = compare(report, report)
+    assert len(rows) == 3
+    assert all(row['speedup'] == 1.0 for row in rows)
@@ -0,0 +1,61 @@
+import random
+from core.services.day_clustering import balanced_sizes, cluster_days
+from core.services.distance_matrix import haversine_matrix
+
+def neighbourhoods(per_group, seed=0):
+    """Three tight groups of places far apart from each other"""
+    rng = random.Random(seed)
+    centers = [(12.90, 77.50), (13.05, 77.60), (12.95, 77.75)]
+    coords = []
+    for lat, lon in centers:
+        coords += [(lat + rng.random() * 0.01, lon + rng.random() * 0.01) for _ in range(per_group)]
+    rng.shuffle(coords)
+    return coords
+
+def test_balanced_sizes():
+    assert balanced_sizes(7, 3) == [3, 2, 2]
+    assert balanced_sizes(2, 3) == [1, 1, 0]
+
+def test_clusters_recover_neighbourhoods():
+    coords = neighbourhoods(4)
+    matrix = haversine_matrix(coords)
+
+    clusters = cluster_days(matrix, 3)
+
+    assert sorted(len(c) for c in clusters) == [4, 4, 4]
+    for members in clusters:
+        assert max(matrix[i, j] for i in members for j in members) < 3
+
+def test_clusters_are_balanced_and_complete():
+    matrix = haversine_matrix(neighbourhoods(5, seed=1))
+
+    clusters = cluster_days(matrix, 4)
+
+    assert sorted(i for c in clusters for i in c) == list(range(15))
+    assert max(map(len, clusters)) - min(map(len, clusters)) <= 1
+    assert clusters[0][0] == 0
+
+def test_explicit_sizes_are_respected():
+    matrix = haversine_matrix(neighbourhoods(2))
+
+    clusters = cluster_days(matrix, 3, sizes=[0, 4, 2])
+
+    assert [len(c) for c in clusters] == [0, 4, 2]
+
+def test_more_days_than_places():
+    matrix = haversine_matrix(neighbourhoods(1))
+
+    assert [len(c) for c in cluster_days(matrix, 5)] == [1, 1, 1, 0, 0]
+
+def test_regroup_days_reduces_daily_travel(optimizer):
+    north = ['Hebbal Lake', 'Hebbal', 'ISKCON Temple']
+    south = ['Lalbagh', 'Vidyarthi Bhavan', 'Bull Temple']
+    day_activities = {
+        'day_1': [{'name': n, 'location': n} for n in [north[0], south[0], north[1]]],
+        'day_2': [{'name': n, 'location': n} for n in [south[1], north[2], south[2]]],
+    }
+
+    regrouped = optimizer.regroup_days(day_activities, 'Bangalore')
+
+    groups = [set(a['name'] for a in regrouped[day]) for day in ['day_1', 'day_2']]
+    assert set(north) in groups and set(south) in groups
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from core.services.distance_matrix import haversine_matrix, haversine_cross, route_legs, route_length
+
+COORDS = [
+    (48.8566, 2.3522),   # Paris
+    (51.5074, -0.1278),  # London
+    (52.5200, 13.4050),  # Berlin
+]
+
+def test_matrix_matches_scalar_haversine(optimizer):
+    matrix = haversine_matrix(COORDS)
+
+    for i, a in enumerate(COORDS):
+        for j, b in enumerate(COORDS):
+            assert matrix[i, j] == pytest.approx(optimizer.haversine_distance(a[0], a[1], b[0], b[1]))
+
+def test_matrix_is_symmetric_with_zero_diagonal():
+    matrix = haversine_matrix(COORDS)
+
+    assert matrix.shape == (3, 3)
+    assert np.allclose(matrix, matrix.T)
+    assert np.all(np.diag(matrix) == 0)
+
+def test_cross_matrix_shape():
+    assert haversine_cross(COORDS[:1], COORDS).shape == (1, 3)
+
+def test_route_legs_and_length():
+    matrix = haversine_matrix(COORDS)
+
+    assert list(route_legs(matrix, [0, 1, 2])) == [matrix[0, 1], matrix[1, 2]]
+    assert route_length(matrix, [0, 1, 2]) == pytest.approx(matrix[0, 1] + matrix[1, 2])
+    assert route_length(matrix, [0]) == 0
+
+def test_nearest_neighbor_route(optimizer):
+    # Paris -> Berlin -> London: nearest neighbour from Paris visits London first
+    matrix = optimizer.distance_matrix([COORDS[0], COORDS[2], COORDS[1]])
+
+    assert optimizer.nearest_neighbor_route(matrix) == [0, 2, 1]
@@ -0,0 +1,73 @@
+from core.services.diversity import DiversityConstraints, DiversitySelector
+
+ALTERNATIVES = {
+    'cultural': [
+        {'name': 'Temple A', 'location': 'North', 'category': 'cultural'},
+        {'name': 'Temple B', 'location': 'South', 'category': 'cultural'},
+    ],
+    'nature': [{'name': 'Park A', 'location': 'East', 'category': 'nature'}],
+    'dining': [{'name': 'Cafe A', 'location': 'West', 'category': 'dining'}],
+}
+
+def identify(place):
+    return f"{place.get('name', '')}|{place.get('location', '')}".lower()
+
+def classify(place):
+    return place.get('category') or 'other'
+
+def make_selector(**kwargs):
+    return DiversitySelector(ALTERNATIVES, classify, identify, DiversityConstraints(**kwargs))
+
+def activity(name, category):
+    return {'name': name, 'location': name, 'category': category}
+
+def test_category_cap_per_day():
+    selector = make_selector(max_per_category=2)
+    day = selector.select_day([activity(f"Museum {i}", 'cultural') for i in range(3)])
+    assert [a['name'] for a in day] == ['Museum 0', 'Museum 1', 'Park A']
+    assert day[2]['note'] == 'Alternative activity for better variety'
+
+def test_counters_reset_each_day_but_visited_persists():
+    selector = make_selector(max_per_category=1)
+    selector.select_day([activity('Museum', 'cultural')])
+    day_two = selector.select_day([activity('Museum', 'cultural'), activity('Gallery', 'cultural')])
+    assert day_two[0]['name'] == 'Temple A'
+    assert day_two[0]['note'] == 'Alternative to Museum (previously visited)'
+    # Day two already used cultural for the substitute, so the cap pushes Gallery to another category
+    assert day_two[1]['name'] == 'Park A'
+
+def test_cursor_skips_visited_alternatives():
+    selector = make_selector()
+    selector.visited.add(identify(ALTERNATIVES['cultural'][0]))
+    selector.select_day([activity('Museum', 'cultural')])
+    day = selector.select_day([activity('Museum', 'cultural')])
+    assert day[0]['name'] == 'Temple B'
+    assert selector.cursors['cultural'] == 1
+
+def test_exhausted_pool_drops_duplicate():
+    selector = make_selector()
+    selector.select_day([activity('Lake', 'nature')])
+    selector.select_day([activity('Lake', 'nature')])
+    assert selector.select_day([activity('Lake', 'nature')]) == []
+
+def test_min_distinct_categories_per_trip():
+    selector = make_selector(max_per_category=5, min_distinct_categories=3)
+    day = selector.select_day([activity(f"Museum {i}", 'cultural') for i in range(4)])
+    assert [a['category'] for a in day] == ['cultural', 'cultural', 'nature', 'dining']
+    assert len(selector.trip_categories) == 3
+
+def test_min_distinct_counts_later_days():
+    selector = make_selector(max_per_category=5, min_distinct_categories=2)
+    day = selector.select_day([activity('Museum 0', 'cultural'), activity('Museum 1', 'cultural')], remaining=3)
+    assert [a['name'] for a in day] == ['Museum 0', 'Museum 1']
+
+def test_optimizer_applies_configured_constraints(make_optimizer):
+    optimizer = make_optimizer(diversity=DiversityConstraints(max_per_category=1))
+    activities = [
+        {'name': 'Palace Museum', 'location': 'Palace Road', 'description': 'Historical museum'},
+        {'name': 'Art Museum', 'location': 'Kasturba Road', 'description': 'Art museum'},
+    ]
+    optimized = optimizer.optimize_day_activities(activities, set(), 'Bangalore')
+    assert optimized[0]['category'] == 'cultural'
+    assert optimized[1]['note'] == 'Alternative activity for better variety'
+    assert optimized[1]['category'] != 'cultural'
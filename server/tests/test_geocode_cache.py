@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from core.services.geocode_cache import GeocodeCache, make_key
+
+@pytest.fixture
+def cache():
+    return GeocodeCache(':memory:')
+
+def test_make_key_normalizes_place_and_city():
+    assert make_key("  St. Mary's  Basilica ", 'BANGALORE') == ('st mary s basilica', 'bangalore')
+
+def test_set_and_lookup(cache):
+    cache.set('Cubbon Park', 'Bangalore', (12.9763, 77.5929))
+
+    assert cache.lookup('cubbon park', 'bangalore') == (True, (12.9763, 77.5929))
+    assert cache.lookup('Lalbagh', 'Bangalore') == (False, None)
+
+def test_failed_lookups_are_remembered(cache):
+    cache.set('Nowhere Street', 'Bangalore', None)
+
+    assert cache.lookup('Nowhere Street', 'Bangalore') == (True, None)
+
+def test_failed_lookups_expire():
+    cache = GeocodeCache(':memory:', failure_ttl=-1)
+    cache.set('Nowhere Street', 'Bangalore', None)
+
+    assert cache.lookup('Nowhere Street', 'Bangalore') == (False, None)
+
+def test_preload_and_get_many(cache):
+    cache.preload([
+        ('Cubbon Park', 'Bangalore', 12.9763, 77.5929),
+        ('Lalbagh', 'Bangalore', '12.9507', '77.5848'),
+    ])
+    cache.set('Nowhere Street', 'Bangalore', None)
+
+    results = cache.get_many([
+        ('Cubbon Park', 'Bangalore'),
+        ('Lalbagh', 'Bangalore'),
+        ('Nowhere Street', 'Bangalore'),
+        ('Ulsoor', 'Bangalore'),
+    ])
+    assert results == {
+        ('cubbon park', 'bangalore'): (12.9763, 77.5929),
+        ('lalbagh', 'bangalore'): (12.9507, 77.5848),
+        ('nowhere street', 'bangalore'): None,
+    }
+
+def test_cache_is_shared_through_the_database_file(tmp_path):
+    path = str(tmp_path / 'geocode.sqlite3')
+    GeocodeCache(path).set('Cubbon Park', 'Bangalore', (12.9763, 77.5929))
+
+    assert GeocodeCache(path).get('Cubbon Park', 'Bangalore') == (12.9763, 77.5929)
+
+@patch('requests.get')
+def test_optimizer_instances_share_cached_coordinates(mock_get, cache, make_optimizer):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = [{'lat': '48.8584', 'lon': '2.2945'}]
+    mock_get.return_value = mock_response
+
+    make_optimizer(geocode_cache=cache).get_coordinates('Eiffel Tower', 'Paris')
+    coords = make_optimizer(geocode_cache=cache).get_coordinates('eiffel tower', 'paris')
+
+    assert coords == (48.8584, 2.2945)
+    assert mock_get.call_count == 1
+
+@patch('requests.get')
+def test_optimizer_remembers_unknown_places(mock_get, cache, make_optimizer):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = []
+    mock_get.return_value = mock_response
+
+    assert make_optimizer(geocode_cache=cache).get_coordinates('Nowhere Street', 'Bangalore') is None
+    assert make_optimizer(geocode_cache=cache).get_coordinates('Nowhere Street', 'Bangalore') is None
+    assert mock_get.call_count == 1
@@ -0,0 +1,154 @@
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from core.services.geocode_cache import GeocodeCache
+from core.services.geocoding_queue import GeocodingQueue, NominatimGeocoder, RateLimiter
+from core.services.local_geocoder import LocalGeocoder
+
+@pytest.fixture
+def cache():
+    return GeocodeCache(':memory:')
+
+def make_response(data, status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    return response
+
+@patch('requests.get')
+def test_queue_deduplicates_and_uses_cache(mock_get, cache):
+    mock_get.return_value = make_response([{'lat': '12.9507', 'lon': '77.5848'}])
+    cache.set('Cubbon Park', 'Bangalore', (12.9763, 77.5929))
+
+    queue = GeocodingQueue(cache, NominatimGeocoder())
+    queue.add_many(['Cubbon Park', 'Lalbagh', 'lalbagh ', 'LALBAGH'], 'Bangalore')
+    results = queue.resolve()
+
+    assert mock_get.call_count == 1
+    assert results[('cubbon park', 'bangalore')] == (12.9763, 77.5929)
+    assert results[('lalbagh', 'bangalore')] == (12.9507, 77.5848)
+    assert cache.get('Lalbagh', 'Bangalore') == (12.9507, 77.5848)
+
+@patch('requests.get')
+def test_transient_failures_are_not_cached(mock_get, cache):
+    mock_get.return_value = make_response([], status_code=429)
+
+    queue = GeocodingQueue(cache, NominatimGeocoder())
+    queue.add('Lalbagh', 'Bangalore')
+
+    assert queue.resolve() == {}
+    assert queue.failed == [('lalbagh', 'bangalore')]
+    assert cache.lookup('Lalbagh', 'Bangalore') == (False, None)
+
+@patch('requests.get')
+def test_optimizer_retries_transient_failures_on_a_later_call(mock_get, cache, make_optimizer):
+    mock_get.return_value = make_response([], status_code=429)
+    optimizer = make_optimizer(
+        geocode_cache=cache, geocoder=NominatimGeocoder(), local_geocoder=LocalGeocoder(dataset_path=None)
+    )
+    itinerary = {'day_1': [
+        {'name': 'Museum Visit', 'location': 'Unknown Street 1'},
+        {'name': 'Park Walk', 'location': 'Unknown Street 2'},
+    ]}
+
+    optimizer.optimize_itinerary(itinerary, 'Bangalore')
+    # Throttled places are looked up once per call, not once per use
+    assert mock_get.call_count == 2
+    assert optimizer.place_coordinates == {}
+
+    mock_get.return_value = make_response([{'lat': '12.9763', 'lon': '77.5929'}])
+    optimizer.optimize_itinerary(itinerary, 'Bangalore')
+    assert mock_get.call_count == 4
+    assert optimizer.place_coordinates[('unknown street 1', 'bangalore')] == (12.9763, 77.5929)
+
+@patch('requests.get')
+def test_expired_deadline_skips_network(mock_get, cache):
+    cache.set('Cubbon Park', 'Bangalore', (12.9763, 77.5929))
+
+    queue = GeocodingQueue(cache, NominatimGeocoder())
+    queue.add_many(['Cubbon Park', 'Lalbagh'], 'Bangalore')
+    results = queue.resolve(deadline=time.perf_counter())
+
+    assert mock_get.call_count == 0
+    assert results == {('cubbon park', 'bangalore'): (12.9763, 77.5929)}
+    assert queue.skipped == [('lalbagh', 'bangalore')]
+    assert cache.lookup('Lalbagh', 'Bangalore') == (False, None)
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(':memory:', min_interval=0.05)
+
+    start = time.time()
+    for _ in range(3):
+        limiter.acquire()
+
+    assert time.time() - start >= 0.1
+
+def test_rate_limiter_is_shared_through_the_database_file(tmp_path):
+    path = str(tmp_path / 'geocode.sqlite3')
+    first = RateLimiter(path, min_interval=0.05)
+    second = RateLimiter(path, min_interval=0.05)
+
+    start = time.time()
+    first.acquire()
+    second.acquire()
+    first.acquire()
+
+    assert time.time() - start >= 0.1
+
+@patch('requests.get')
+def test_optimize_itinerary_geocodes_each_place_once(mock_get, cache, make_optimizer):
+    mock_get.return_value = make_response([{'lat': '12.9763', 'lon': '77.5929'}])
+    itinerary = {
+        'day_1': [
+            {'name': 'Museum Visit', 'location': 'City Center', 'description': 'Historical museum'},
+            {'name': 'Park Walk', 'location': 'Nature Area', 'description': 'Beautiful park'},
+        ],
+        'day_2': [
+            {'name': 'Art Gallery', 'location': 'City Center', 'description': 'Modern art'},
+            {'name': 'Lake View', 'location': 'Nature Area', 'description': 'Quiet lake'},
+        ]
+    }
+
+    optimizer = make_optimizer(geocode_cache=cache, geocoder=NominatimGeocoder())
+    optimized = optimizer.optimize_itinerary(itinerary, 'Bangalore')
+
+    assert mock_get.call_count == 2
+    assert optimized['day_1'][0]['travel_to_next'] == '0 minutes'
+
+def test_rate_limiter_gives_up_when_the_slot_is_past_the_deadline():
+    limiter = RateLimiter(':memory:', min_interval=0.3)
+    assert limiter.acquire()
+
+    start = time.perf_counter()
+    assert limiter.acquire(deadline=start + 0.1) is False
+    assert time.perf_counter() - start < 0.1
+    # The refused caller did not take a slot
+    assert limiter.acquire(deadline=start + 1) is True
+    assert time.perf_counter() - start < 0.5
+
+@patch('requests.get')
+def test_request_timeout_is_capped_by_the_deadline(mock_get):
+    mock_get.return_value = make_response([])
+    NominatimGeocoder(timeout=10).geocode('Lalbagh', 'Bangalore', deadline=time.perf_counter() + 0.5)
+    assert 0 < mock_get.call_args.kwargs['timeout'] <= 0.5
+
+@patch('requests.get')
+def test_optimize_itinerary_keeps_its_deadline_behind_the_rate_limit(mock_get, cache, make_optimizer):
+    mock_get.return_value = make_response([{'lat': '12.9763', 'lon': '77.5929'}])
+    limiter = RateLimiter(':memory:', min_interval=1.0)
+    optimizer = make_optimizer(
+        geocode_cache=cache, geocoder=NominatimGeocoder(limiter), local_geocoder=LocalGeocoder(dataset_path=None)
+    )
+    itinerary = {'day_1': [
+        {'name': 'Museum Visit', 'location': 'Unknown Street 1'},
+        {'name': 'Park Walk', 'location': 'Unknown Street 2'},
+        {'name': 'Art Gallery', 'location': 'Unknown Street 3'},
+    ]}
+
+    start = time.perf_counter()
+    optimized = optimizer.optimize_itinerary(itinerary, 'Bangalore', deadline_ms=300)
+
+    assert time.perf_counter() - start < 0.5
+    assert mock_get.call_count == 1
+    assert optimized['optimization']['skipped_geocodes'] >= 2
+    assert not optimized['optimization']['converged']
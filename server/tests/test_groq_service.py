@@ -1,7 +1,8 @@
 import pytest
 import os
+import time
 from unittest.mock import patch, MagicMock
-from core.services.groq_service import GroqService
+from core.services.groq_service import Conversation, GroqService
 
 @pytest.fixture
 def mock_env():
@@ -44,22 +45,32 @@ def test_process_message_initial(groq_service, mock_groq_client):
     assert "preferences" in response
 
 def test_process_message_complete(groq_service, mock_groq_client):
-    groq_service.current_preferences = {
+    conversation = Conversation("complete", {
         "destination": "Paris",
         "days": 3,
         "interests": ["sightseeing"],
         "budget": "moderate"
-    }
-    groq_service.conversation_state = "complete"
+    })
     
     mock_completion = MagicMock()
     mock_completion.choices = [MagicMock(message=MagicMock(content="Test itinerary"))]
     mock_groq_client.chat.completions.create.return_value = mock_completion
     
-    response = groq_service.process_message("Complete")
+    response = groq_service.process_message("Complete", conversation)
     assert response["state"] == "complete"
     assert "itinerary" in response["data"]
 
+def test_conversations_do_not_share_state(groq_service):
+    paris, rome = Conversation(), Conversation()
+    groq_service.process_message("Paris", paris)
+    groq_service.process_message("Rome", rome)
+    response = groq_service.process_message("4 days", paris)
+    assert response["state"] == "asking_interests"
+    assert response["preferences"] == {"destination": "Paris", "days": 4}
+    assert rome.state == "asking_duration"
+    assert rome.preferences == {"destination": "Rome"}
+    assert not hasattr(groq_service, "conversation_state")
+
 def test_generate_itinerary_success(groq_service, mock_groq_client):
     mock_completion = MagicMock()
     mock_completion.choices = [MagicMock(message=MagicMock(content="Test itinerary"))]
@@ -95,3 +106,59 @@ def test_generate_itinerary_error(groq_service, mock_groq_client):
          pytest.raises(Exception) as exc_info:
         groq_service.generate_itinerary(preferences)
     assert str(exc_info.value) == "API Error"
+
+def stream_chunks(*texts):
+    return iter([MagicMock(choices=[MagicMock(delta=MagicMock(content=text))]) for text in texts])
+
+def test_stream_itinerary_relays_tokens_then_data(groq_service, mock_groq_client):
+    mock_groq_client.chat.completions.create.return_value = stream_chunks("Day 1: ", None, "Louvre")
+
+    louvre = {'name': 'Louvre', 'description': 'Art museum'}
+    with patch.object(groq_service.weather_service, 'get_forecast', return_value=[]), \
+         patch.object(groq_service.travel_service, 'get_attractions', return_value=[louvre]), \
+         patch.object(groq_service.travel_service, 'get_restaurants', return_value=[]):
+        events = list(groq_service.stream_itinerary({"destination": "Paris", "days": 1, "interests": [], "budget": "moderate"}))
+
+    assert events[0] == ('status', 'fetching_sources')
+    assert events[1] == ('sources', {"weather_data": [], "attractions": [louvre], "restaurants": []})
+    assert events[2:4] == [('token', "Day 1: "), ('token', "Louvre")]
+    assert events[4] == ('data', {
+        "itinerary": "Day 1: Louvre", "weather_data": [], "attractions": [louvre], "restaurants": []
+    })
+    assert mock_groq_client.chat.completions.create.call_args.kwargs['stream'] is True
+
+def test_stream_itinerary_announces_itself_before_fetching_sources(groq_service, mock_groq_client):
+    mock_groq_client.chat.completions.create.return_value = stream_chunks("Day 1")
+
+    def slow(*args):
+        time.sleep(0.2)
+        return []
+
+    with patch.object(groq_service.weather_service, 'get_forecast', side_effect=slow) as forecast, \
+         patch.object(groq_service.travel_service, 'get_attractions', side_effect=slow), \
+         patch.object(groq_service.travel_service, 'get_restaurants', side_effect=slow):
+        events = groq_service.stream_itinerary({"destination": "Paris", "days": 1})
+        assert next(events) == ('status', 'fetching_sources')
+        forecast.assert_not_called()
+        start = time.perf_counter()
+        assert next(events)[0] == 'sources'
+        # The three lookups run side by side
+        assert time.perf_counter() - start < 0.5
+
+def test_stream_message_asks_next_question_without_calling_groq(groq_service, mock_groq_client):
+    events = list(groq_service.stream_message("Paris", Conversation()))
+    assert [event for event, _ in events] == ['done']
+    assert events[0][1]["state"] == "asking_duration"
+    mock_groq_client.chat.completions.create.assert_not_called()
+
+def test_stream_message_ends_with_error_event(groq_service, mock_groq_client):
+    mock_groq_client.chat.completions.create.side_effect = Exception("API Error")
+    conversation = Conversation("asking_budget", {"destination": "Paris", "days": 2, "interests": ["food"]})
+
+    with patch.object(groq_service.weather_service, 'get_forecast', return_value=[]), \
+         patch.object(groq_service.travel_service, 'get_attractions', return_value=[]), \
+         patch.object(groq_service.travel_service, 'get_restaurants', return_value=[]):
+        events = list(groq_service.stream_message("luxury", conversation))
+
+    assert [event for event, _ in events] == ['status', 'sources', 'error']
+    assert events[-1][1]["preferences"]["budget"] == "luxury"
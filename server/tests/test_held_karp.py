@@ -0,0 +1,95 @@
+import itertools
+import random
+import time
+import numpy as np
+import pytest
+from core.services import held_karp
+from core.services.held_karp import held_karp_path
+from core.services.distance_matrix import haversine_matrix, route_length
+
+def random_matrix(n, seed):
+    rng = random.Random(seed)
+    return haversine_matrix([(12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2) for _ in range(n)])
+
+def brute_force(matrix, start, end=None):
+    n = len(matrix)
+    middle = [i for i in range(n) if i != start and i != end]
+    best = None
+    for perm in itertools.permutations(middle):
+        route = [start] + list(perm) + ([end] if end is not None else [])
+        length = route_length(matrix, route)
+        if best is None or length < best:
+            best = length
+    return best
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_brute_force(seed):
+    matrix = random_matrix(7, seed)
+
+    route, cost = held_karp_path(matrix)
+
+    assert route[0] == 0
+    assert sorted(route) == list(range(7))
+    assert cost == pytest.approx(brute_force(matrix, 0))
+    assert route_length(matrix, route) == pytest.approx(cost)
+
+def test_fixed_start_and_end():
+    matrix = random_matrix(7, seed=9)
+
+    route, cost = held_karp_path(matrix, start=5, end=2)
+
+    assert route[0] == 5 and route[-1] == 2
+    assert cost == pytest.approx(brute_force(matrix, 5, 2))
+
+def test_start_equal_to_end_is_a_round_trip():
+    matrix = random_matrix(4, seed=2)
+
+    route, _ = held_karp_path(matrix, start=0, end=0)
+
+    assert route[0] == 0
+    assert sorted(route) == [0, 1, 2, 3]
+
+def test_trivial_matrices():
+    assert held_karp_path(np.zeros((1, 1))) == ([0], 0.0)
+    assert held_karp_path(np.array([[0, 3], [3, 0]]), start=1)[0] == [1, 0]
+
+def test_results_are_memoized_by_content():
+    held_karp.clear_cache()
+    matrix = random_matrix(6, seed=1)
+
+    first, _ = held_karp_path(matrix)
+    second, _ = held_karp_path(matrix.copy())
+
+    assert first == second
+    assert len(held_karp._cache) == 1
+
+def test_twelve_stops_solve_quickly():
+    held_karp.clear_cache()
+    matrix = random_matrix(12, seed=5)
+
+    started = time.perf_counter()
+    held_karp_path(matrix)
+
+    assert time.perf_counter() - started < 0.5
+
+def test_optimizer_uses_exact_solver_for_small_days(optimizer):
+    places = [
+        {'name': 'Lalbagh', 'location': 'Lalbagh'},
+        {'name': 'Hebbal Lake', 'location': 'Hebbal Lake'},
+        {'name': 'Vidyarthi Bhavan', 'location': 'Vidyarthi Bhavan'},
+        {'name': 'Bangalore Palace', 'location': 'Bangalore Palace'},
+    ]
+
+    route = optimizer.optimize_day_route(places, 'Bangalore', start_location='MG Road', end_location='MG Road')
+
+    assert optimizer.last_route_stats['solver'] == 'exact'
+    assert sorted(p['name'] for p in route) == sorted(p['name'] for p in places)
+
+def test_optimizer_falls_back_to_heuristic_for_large_days(make_optimizer):
+    optimizer = make_optimizer(exact_route_max_stops=3)
+    places = [{'name': name, 'location': name} for name in ['Lalbagh', 'Hebbal Lake', 'Cubbon Park', 'Ulsoor Lake']]
+
+    route = optimizer.optimize_day_route(places, 'Bangalore')
+
+    assert optimizer.last_route_stats['solver'] == 'heuristic'
+    assert route[0]['name'] == 'Lalbagh'
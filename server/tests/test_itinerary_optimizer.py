@@ -1,11 +1,6 @@
-import pytest
 from unittest.mock import patch, MagicMock
 from core.services.itinerary_optimizer import ItineraryOptimizer
 
-@pytest.fixture
-def optimizer():
-    return ItineraryOptimizer()
-
 def test_optimizer_initialization(optimizer):
     assert isinstance(optimizer, ItineraryOptimizer)
     assert isinstance(optimizer.visited_places, set)
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch
+from core.services.geocode_cache import GeocodeCache
+from core.services.local_geocoder import LocalGeocoder
+
+@pytest.fixture
+def local_geocoder():
+    return LocalGeocoder()
+
+def test_exact_and_alias_lookup(local_geocoder):
+    assert local_geocoder.lookup('Cubbon Park', 'Bangalore') == (12.9763, 77.5929)
+    assert local_geocoder.lookup('Hare Krishna Hill, Rajajinagar', 'Bengaluru') == (13.0098, 77.5511)
+
+def test_lookup_strips_city_suffix(local_geocoder):
+    assert local_geocoder.lookup('Cubbon Park, Bangalore', 'Bangalore') == (12.9763, 77.5929)
+
+def test_prefix_lookup(local_geocoder):
+    assert local_geocoder.prefix('lalbagh', 'Bangalore') == ['lalbagh', 'lalbagh road', 'lalbagh botanical garden']
+    assert local_geocoder.lookup('Bannerghatta Nat', 'Bangalore') == (12.8003, 77.5775)
+    assert local_geocoder.prefix('lal', 'Bangalore') == []
+
+def test_ambiguous_prefix_is_not_trusted():
+    local_geocoder = LocalGeocoder(dataset_path=None)
+    local_geocoder.add('National Gallery of Modern Art', 'Bangalore', (12.9887, 77.5857))
+    local_geocoder.add('National Military Memorial', 'Bangalore', (12.9780, 77.5970))
+    local_geocoder.add('Lake View Cafe', 'Bangalore', (12.9716, 77.6412))
+    local_geocoder.add('Lakeside Promenade', 'Bangalore', (12.9400, 77.6200))
+
+    assert local_geocoder.lookup('National', 'Bangalore') is None
+    assert local_geocoder.lookup('Lake', 'Bangalore') is None
+    # Unique, or covering most of the name, is still a match
+    assert local_geocoder.lookup('National Military', 'Bangalore') == (12.9780, 77.5970)
+    assert local_geocoder.lookup('Lake View', 'Bangalore') == (12.9716, 77.6412)
+
+def test_fuzzy_lookup(local_geocoder):
+    assert local_geocoder.lookup('Cubon Park', 'Bangalore') == (12.9763, 77.5929)
+
+def test_lookup_is_scoped_to_city(local_geocoder):
+    assert local_geocoder.lookup('Cubbon Park', 'Paris') is None
+    assert local_geocoder.lookup('City Center', 'Bangalore') is None
+
+def test_index_includes_geocode_cache_entries():
+    cache = GeocodeCache(':memory:')
+    cache.set('Eiffel Tower', 'Paris', (48.8584, 2.2945))
+
+    local_geocoder = LocalGeocoder(dataset_path=None, geocode_cache=cache)
+
+    assert local_geocoder.lookup('eiffel tower', 'paris') == (48.8584, 2.2945)
+
+@patch('requests.get')
+def test_optimizer_resolves_landmarks_without_network(mock_get, optimizer):
+    itinerary = {
+        'day_1': [
+            {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh', 'description': 'Garden'},
+            {'name': 'Bangalore Palace', 'location': 'Palace Road', 'description': 'Palace'},
+        ]
+    }
+
+    optimized = optimizer.optimize_itinerary(itinerary, 'Bangalore')
+
+    mock_get.assert_not_called()
+    assert optimized['day_1'][0]['travel_to_next'].endswith('minutes')
@@ -0,0 +1,131 @@
+import numpy as np
+from core.services import matrix_store
+from core.services.matrix_store import MatrixStore, get_matrix_store
+from core.services.distance_matrix import haversine_cross, haversine_matrix
+
+PLACES = {
+    'lalbagh': (12.9507, 77.5848),
+    'cubbon park': (12.9763, 77.5929),
+    'ulsoor': (12.9817, 77.6285),
+}
+
+class CountingCompute:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, origins, destinations):
+        self.calls.append((len(origins), len(destinations)))
+        return haversine_cross(origins, destinations)
+
+def test_slices_are_computed_once(tmp_path):
+    store = MatrixStore(str(tmp_path))
+    compute = CountingCompute()
+    ids = list(PLACES)
+    first = store.get('distance', ids, list(PLACES.values()), compute)
+    second = store.get('distance', ids[::-1], list(PLACES.values())[::-1], compute)
+    assert compute.calls == [(3, 3)]
+    np.testing.assert_allclose(second, first[::-1, ::-1])
+
+def test_store_persists_across_instances(tmp_path):
+    compute = CountingCompute()
+    MatrixStore(str(tmp_path)).get('distance', list(PLACES), list(PLACES.values()), compute)
+    reopened = MatrixStore(str(tmp_path))
+    reopened.get('distance', ['ulsoor', 'lalbagh'], [PLACES['ulsoor'], PLACES['lalbagh']], compute)
+    assert compute.calls == [(3, 3)]
+    assert isinstance(reopened._layers['distance'], np.memmap)
+
+def test_new_places_fill_only_missing_pairs(tmp_path):
+    store = MatrixStore(str(tmp_path))
+    compute = CountingCompute()
+    store.get('distance', ['lalbagh', 'cubbon park'], [PLACES['lalbagh'], PLACES['cubbon park']], compute)
+    matrix = store.get('distance', list(PLACES), list(PLACES.values()), compute)
+    # Only the new place's row and column are computed
+    assert compute.calls == [(2, 2), (1, 3), (2, 1)]
+    np.testing.assert_allclose(matrix, haversine_matrix(list(PLACES.values())))
+
+def test_asymmetric_layers_fill_rows_and_columns(tmp_path):
+    def one_way(origins, destinations):
+        # Leaving a place costs its latitude on top of the distance, so a->b != b->a
+        return haversine_cross(origins, destinations) + np.asarray(origins)[:, :1]
+
+    store = MatrixStore(str(tmp_path))
+    store.get('road', ['lalbagh', 'cubbon park'], [PLACES['lalbagh'], PLACES['cubbon park']], one_way)
+    matrix = store.get('road', list(PLACES), list(PLACES.values()), one_way)
+    expected = one_way(list(PLACES.values()), list(PLACES.values()))
+    np.fill_diagonal(expected, 0.0)
+    np.testing.assert_allclose(matrix, expected)
+
+def test_growth_keeps_computed_pairs(tmp_path, monkeypatch):
+    monkeypatch.setattr(matrix_store, 'INITIAL_CAPACITY', 2)
+    store = MatrixStore(str(tmp_path))
+    compute = CountingCompute()
+    store.get('distance', ['lalbagh', 'cubbon park'], [PLACES['lalbagh'], PLACES['cubbon park']], compute)
+    store.get('distance', ['ulsoor', 'lalbagh'], [PLACES['ulsoor'], PLACES['lalbagh']], compute)
+    assert store.capacity == 4
+    store.get('distance', ['lalbagh', 'cubbon park'], [PLACES['lalbagh'], PLACES['cubbon park']], compute)
+    assert compute.calls == [(2, 2), (1, 2), (1, 1)]
+
+def test_moved_place_is_invalidated(tmp_path):
+    store = MatrixStore(str(tmp_path))
+    compute = CountingCompute()
+    store.get('distance', list(PLACES), list(PLACES.values()), compute)
+    moved = dict(PLACES, ulsoor=(13.0358, 77.5970))
+    matrix = store.get('distance', list(moved), list(moved.values()), compute)
+    assert compute.calls == [(3, 3), (1, 3), (2, 1)]
+    np.testing.assert_allclose(matrix, haversine_matrix(list(moved.values())))
+
+def test_explicit_invalidate(tmp_path):
+    store = MatrixStore(str(tmp_path))
+    compute = CountingCompute()
+    store.get('distance', list(PLACES), list(PLACES.values()), compute)
+    store.invalidate('cubbon park')
+    store.get('distance', ['lalbagh', 'ulsoor'], [PLACES['lalbagh'], PLACES['ulsoor']], compute)
+    assert compute.calls == [(3, 3)]
+    store.get('distance', list(PLACES), list(PLACES.values()), compute)
+    assert compute.calls == [(3, 3), (1, 3), (2, 1)]
+
+def test_full_store_reuses_oldest_slot(tmp_path, monkeypatch):
+    monkeypatch.setattr(matrix_store, 'INITIAL_CAPACITY', 2)
+    store = MatrixStore(str(tmp_path), max_places=2)
+    compute = CountingCompute()
+    store.get('distance', ['lalbagh', 'cubbon park'], [PLACES['lalbagh'], PLACES['cubbon park']], compute)
+    matrix = store.get('distance', ['ulsoor', 'cubbon park'], [PLACES['ulsoor'], PLACES['cubbon park']], compute)
+    assert store.capacity == 2
+    assert set(store.index) == {'ulsoor', 'cubbon park'}
+    np.testing.assert_allclose(matrix, haversine_matrix([PLACES['ulsoor'], PLACES['cubbon park']]))
+    # The evicted place is computed again; the pair still held is read back
+    store.get('distance', ['ulsoor', 'cubbon park'], [PLACES['ulsoor'], PLACES['cubbon park']], compute)
+    assert compute.calls == [(2, 2), (1, 2), (1, 1)]
+    assert MatrixStore(str(tmp_path), max_places=2).get(
+        'distance', ['cubbon park', 'ulsoor'], [PLACES['cubbon park'], PLACES['ulsoor']], compute
+    ).shape == (2, 2)
+    assert compute.calls == [(2, 2), (1, 2), (1, 1)]
+
+def test_requests_larger_than_the_store_bypass_it(tmp_path):
+    store = MatrixStore(str(tmp_path), max_places=2)
+    compute = CountingCompute()
+    matrix = store.get('distance', list(PLACES), list(PLACES.values()), compute)
+    assert matrix.shape == (3, 3)
+    assert store.index == {}
+
+def test_store_disabled_without_directory(monkeypatch):
+    monkeypatch.setenv('MATRIX_CACHE_DIR', '')
+    assert get_matrix_store('Bangalore') is None
+    # Opt-in: nothing is written unless a directory is configured
+    monkeypatch.delenv('MATRIX_CACHE_DIR')
+    assert get_matrix_store('Bangalore') is None
+
+def test_optimizer_reads_route_matrices_from_store(tmp_path, monkeypatch, optimizer):
+    monkeypatch.setenv('MATRIX_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(matrix_store, '_stores', {})
+    places = [
+        {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+        {'name': 'Ulsoor Lake', 'location': 'Ulsoor'},
+        {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+    ]
+    routed = optimizer.optimize_day_route(places, 'Bangalore')
+    optimizer.add_travel_times(routed, 'Bangalore')
+    store = get_matrix_store('Bangalore')
+    assert set(store.index) == {'lalbagh', 'ulsoor', 'cubbon park'}
+    assert (tmp_path / 'bangalore' / 'distance.npy').exists()
+    assert all('travel_to_next' in a for a in routed[:-1])
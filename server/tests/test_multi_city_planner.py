@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import Mock
+from core.services.local_geocoder import LocalGeocoder
+from core.services.multi_city_planner import MAX_CITIES, MAX_DAYS, MultiCityPlanner
+
+CENTERS = {
+    'delhi': (28.6139, 77.2090),
+    'jaipur': (26.9124, 75.7873),
+    'agra': (27.1767, 78.0081),
+    'mumbai': (19.0760, 72.8777)
+}
+
+
+class FakeOptimizer:
+    def optimize_itinerary(self, itinerary, city, **kwargs):
+        result = {day: list(reversed(activities)) for day, activities in itinerary.items()}
+        for day in itinerary:
+            result[f"{day}_route_stats"] = {'city': city}
+        return result
+
+
+def attractions(city, count):
+    return [{'name': f"{city} place {i}", 'address': f"{city} street {i}"} for i in range(count)]
+
+
+@pytest.fixture
+def geocoder():
+    local = LocalGeocoder(dataset_path=None)
+    local.city_centers.update(CENTERS)
+    return local
+
+
+@pytest.fixture
+def travel_service():
+    service = Mock()
+    counts = {'Delhi': 12, 'Jaipur': 6, 'Agra': 3, 'Mumbai': 0}
+    service.get_attractions.side_effect = lambda city: attractions(city, counts.get(city, 0))
+    return service
+
+
+def make_planner(travel_service, geocoder, weather_service=None):
+    return MultiCityPlanner(travel_service, weather_service, local_geocoder=geocoder, optimizer_factory=FakeOptimizer)
+
+
+def test_order_cities_starts_at_first_and_avoids_backtracking(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    # Delhi -> Jaipur -> Agra doubles back; Delhi -> Agra -> Jaipur does not
+    assert planner.order_cities(['Delhi', 'Jaipur', 'Agra']) == ['Delhi', 'Agra', 'Jaipur']
+
+def test_order_cities_keeps_unknown_cities_last(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    assert planner.order_cities(['Delhi', 'Atlantis', 'Jaipur', 'Agra']) == ['Delhi', 'Agra', 'Jaipur', 'Atlantis']
+
+def test_allocate_days_by_density(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    allocation = planner.allocate_days({'Delhi': 12, 'Jaipur': 6, 'Agra': 3}, 7)
+    assert allocation == {'Delhi': 3, 'Jaipur': 2, 'Agra': 2}
+    assert sum(allocation.values()) == 7
+
+def test_allocate_days_fewer_days_than_cities(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    assert planner.allocate_days({'Delhi': 12, 'Jaipur': 6, 'Agra': 3}, 2) == {'Delhi': 1, 'Jaipur': 1, 'Agra': 0}
+
+def test_plan_numbers_days_across_cities(travel_service, geocoder):
+    weather_service = Mock()
+    weather_service.get_forecast.side_effect = lambda city, days: [{'city': city, 'day': d + 1} for d in range(days)]
+    planner = make_planner(travel_service, geocoder, weather_service)
+
+    plan = planner.plan(['Delhi', 'Jaipur', 'Agra'], 5)
+
+    assert [c['city'] for c in plan['cities']] == ['Delhi', 'Agra', 'Jaipur']
+    assert [(c['days'], c['start_day']) for c in plan['cities']] == [(2, 1), (1, 3), (2, 4)]
+    assert [(t['from'], t['to']) for t in plan['transfers']] == [('Delhi', 'Agra'), ('Agra', 'Jaipur')]
+    assert all(t['distance_km'] > 100 for t in plan['transfers'])
+    assert [plan[f"day_{d}_city"] for d in range(1, 6)] == ['Delhi'] * 2 + ['Agra'] + ['Jaipur'] * 2
+    assert plan['day_3_weather'] == {'city': 'Agra', 'day': 3}
+    assert plan['day_5_route_stats'] == {'city': 'Jaipur'}
+    assert all(a['name'].startswith('Agra') for a in plan['day_3'])
+    assert 'day_6' not in plan
+    assert travel_service.get_attractions.call_count == 3
+
+def test_plan_falls_back_to_catalog(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    plan = planner.plan(['Mumbai'], 2)
+    assert plan['cities'] == [{'city': 'Mumbai', 'days': 2, 'start_day': 1}]
+    assert plan['transfers'] == []
+    assert plan['day_1'] and plan['day_2']
+
+def test_plan_rejects_bad_input(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    with pytest.raises(ValueError):
+        planner.plan([' ', ''], 3)
+    with pytest.raises(ValueError):
+        planner.plan(['Delhi'], 0)
+    with pytest.raises(ValueError):
+        planner.plan([f"City {i}" for i in range(MAX_CITIES + 1)], 30)
+    with pytest.raises(ValueError):
+        planner.plan(['Delhi'], MAX_DAYS + 1)
+    with pytest.raises(ValueError):
+        planner.plan(['Delhi'], 3, hotels=['Taj Palace'])
+
+def test_plan_visits_repeated_city_once(travel_service, geocoder):
+    planner = make_planner(travel_service, geocoder)
+    plan = planner.plan(['Delhi', 'Jaipur', ' delhi '], 4)
+    assert [c['city'] for c in plan['cities']] == ['Delhi', 'Jaipur']
+    assert sorted(c['start_day'] for c in plan['cities']) == [1, 3]
+    assert [plan[f"day_{d}_city"] for d in range(1, 5)] == ['Delhi'] * 2 + ['Jaipur'] * 2
+    assert 'day_5' not in plan
+    assert travel_service.get_attractions.call_count == 2
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from core.services.diversity import DiversityConstraints, DiversitySelector
+from core.services.local_geocoder import LocalGeocoder
+from core.services.optimizer_trace import OptimizerTrace
+
+CITY = 'Testville'
+
+@pytest.fixture
+def optimizer(make_optimizer):
+    local = LocalGeocoder()
+    rng = np.random.default_rng(11)
+    for i, (lat, lon) in enumerate(rng.random((30, 2)) * 0.2):
+        local.add(f"Stop {i}", CITY, (12.9 + lat, 77.5 + lon))
+    local.add('Hotel', CITY, (13.0, 77.6))
+    return make_optimizer(local_geocoder=local, diversity=DiversityConstraints(max_per_category=100))
+
+def plan(days, stops):
+    return {
+        f"day_{d + 1}": [{'name': f"Stop {d * stops + i}", 'location': f"Stop {d * stops + i}"} for i in range(stops)]
+        for d in range(days)
+    }
+
+def test_trace_is_opt_in(optimizer):
+    result = optimizer.optimize_itinerary(plan(2, 4), CITY)
+    assert 'trace' not in result
+    assert optimizer.trace is None
+
+def test_trace_reports_stages_counters_and_routes(optimizer):
+    result = optimizer.optimize_itinerary(plan(2, 6), CITY, hotel='Hotel', regroup_days=True, schedule=True, trace=True)
+    trace = result['trace']
+    assert optimizer.trace is None
+
+    assert set(trace['stages_ms']) == {
+        'geocoding', 'selection', 'regroup', 'route_matrices', 'routing', 'scheduling', 'travel_times'
+    }
+    assert sum(trace['stages_ms'].values()) <= trace['total_ms']
+    assert trace['counters']['geocode_local_hits'] == 13
+    assert trace['counters']['geocode_lookups'] == 0
+    assert trace['counters']['geocode_memo_hits'] > 0
+    assert trace['counters']['travel_time_cache_misses'] > 0
+
+    for day in ('day_1', 'day_2'):
+        route = trace['routes'][day]
+        assert route['stops'] == len(result[day])
+        assert route['final_length'] == result[f"{day}_route_stats"]['final_length']
+        assert route['final_length'] <= route['given_length'] + 1e-6
+        assert route['unit'] == 'km'
+    assert trace['substitutions'] == {'count': 0, 'by_reason': {}, 'items': []}
+
+def test_trace_counts_network_lookups(optimizer):
+    itinerary = {'day_1': [
+        {'name': 'Stop 1', 'location': 'Stop 1'},
+        {'name': 'Somewhere new', 'location': 'Unknown Street 12'},
+    ]}
+    with patch.object(optimizer.geocoder, 'geocode', return_value=(True, (12.95, 77.55))) as geocode:
+        trace = optimizer.optimize_itinerary(itinerary, CITY, trace=True)['trace']
+    assert geocode.call_count == 1
+    assert trace['counters']['geocode_lookups'] == 1
+    assert trace['counters']['geocode_local_hits'] == 1
+
+def test_selector_reports_substitution_reasons():
+    alternatives = {
+        'cultural': [{'name': 'Temple A', 'location': 'North', 'category': 'cultural'}],
+        'nature': [{'name': 'Park A', 'location': 'East', 'category': 'nature'}],
+    }
+    trace = OptimizerTrace()
+    selector = DiversitySelector(
+        alternatives,
+        lambda place: place.get('category') or 'other',
+        lambda place: place['name'].lower(),
+        DiversityConstraints(max_per_category=1),
+        visited={'museum 0'},
+        on_substitute=lambda original, substitute, reason: trace.substitution('day_1', original, substitute, reason)
+    )
+    selector.select_day([
+        {'name': 'Museum 0', 'location': 'Museum 0', 'category': 'cultural'},
+        {'name': 'Museum 1', 'location': 'Museum 1', 'category': 'cultural'},
+    ])
+    report = trace.as_dict()['substitutions']
+    assert report['by_reason'] == {'previously_visited': 1, 'category_limit': 1}
+    assert report['items'][0] == {
+        'day': 'day_1', 'original': 'Museum 0', 'replacement': 'Temple A', 'category': 'cultural', 'reason': 'previously_visited'
+    }
@@ -0,0 +1,49 @@
+import numpy as np
+from core.services.parallel_routing import ParallelDayRouter
+from core.services.route_solver import solve_route
+
+def random_matrix(n, seed):
+    points = np.random.default_rng(seed).random((n, 2)) * 10
+    return np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+
+def test_parallel_routes_match_sequential():
+    problems = [
+        (random_matrix(8, 1), None, None),
+        (random_matrix(11, 2), 9, 10),
+        (random_matrix(6, 3), 4, 5),
+    ]
+    router = ParallelDayRouter(workers=2)
+    parallel = router.route(problems)
+    sequential = [solve_route(matrix, start, end) for matrix, start, end in problems]
+    assert [route for route, _ in parallel] == [route for route, _ in sequential]
+    assert all(stats['solver'] == 'exact' for _, stats in parallel)
+
+def test_parallel_heuristic_days_are_valid_routes():
+    problems = [(random_matrix(30, seed), None, None) for seed in range(3)]
+    results = ParallelDayRouter(workers=2, time_budget=0.02).route(problems)
+    for (route, stats), (matrix, _, _) in zip(results, problems):
+        assert sorted(route) == list(range(len(matrix)))
+        assert route[0] == 0
+        assert stats['final_length'] <= stats['initial_length'] + 1e-9
+
+def test_empty_problem_list():
+    assert ParallelDayRouter(workers=2).route([]) == []
+
+def test_optimize_itinerary_same_result_in_parallel(make_optimizer):
+    itinerary = {
+        'day_1': [
+            {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+            {'name': 'Bull Temple', 'location': 'Basavanagudi'},
+            {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+        ],
+        'day_2': [
+            {'name': 'Bangalore Palace', 'location': 'Palace Road'},
+            {'name': 'Ulsoor Lake', 'location': 'Ulsoor'},
+            {'name': 'Commercial Street', 'location': 'Commercial Street'},
+        ],
+        'day_3': [{'name': 'Hebbal Lake', 'location': 'Hebbal'}],
+    }
+    sequential = make_optimizer(route_workers=0).optimize_itinerary({k: [dict(a) for a in v] for k, v in itinerary.items()}, 'Bangalore', hotel='MG Road')
+    parallel = make_optimizer(route_workers=2).optimize_itinerary({k: [dict(a) for a in v] for k, v in itinerary.items()}, 'Bangalore', hotel='MG Road')
+    assert parallel == sequential
+    assert 'day_1_route_stats' in parallel
@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pytest
+from django.core.management import call_command
+from core.services import place_catalog
+from core.services.place_catalog import PlaceCatalog, compile_place_catalog, get_place_catalog
+
+PLACES = [
+    {'name': 'Red Fort', 'location': 'Chandni Chowk', 'category': 'cultural', 'lat': 28.6562, 'lon': 77.2410},
+    {'name': 'Connaught Place', 'location': 'CP', 'category': 'shopping', 'lat': 28.6315, 'lon': 77.2167},
+    {'name': 'Humayun’s Tomb', 'location': 'Nizamuddin', 'category': 'cultural', 'lat': None, 'lon': None},
+]
+
+@pytest.fixture
+def fresh_catalogs(monkeypatch, tmp_path):
+    monkeypatch.setattr(place_catalog, '_catalogs', {})
+    monkeypatch.setenv('PLACE_CATALOG_DIR', str(tmp_path / 'catalogs'))
+    return tmp_path / 'catalogs'
+
+def test_compiled_catalog_is_memory_mapped(tmp_path):
+    compile_place_catalog(PLACES, str(tmp_path))
+    catalog = PlaceCatalog.load(str(tmp_path))
+    assert isinstance(catalog.coords, np.memmap)
+    assert len(catalog) == 3
+    assert catalog.as_dict() == {
+        'cultural': [
+            {'name': 'Red Fort', 'location': 'Chandni Chowk', 'category': 'cultural'},
+            {'name': 'Humayun’s Tomb', 'location': 'Nizamuddin', 'category': 'cultural'},
+        ],
+        'shopping': [{'name': 'Connaught Place', 'location': 'CP', 'category': 'shopping'}],
+    }
+
+def test_spatial_index_skips_places_without_coordinates():
+    catalog = PlaceCatalog.from_places(PLACES)
+    index = catalog.spatial_index(lambda p: p['name'])
+    assert index.nearest('cultural', (28.59, 77.25), set())['name'] == 'Red Fort'
+    assert index.nearest('cultural', (28.59, 77.25), {'Red Fort'}) is None
+
+def test_catalog_selected_by_city(fresh_catalogs):
+    assert get_place_catalog('bangalore').as_dict()['nature'][0]['name'] == 'Lalbagh Botanical Garden'
+    assert 'Red Fort' in [p['name'] for p in get_place_catalog('delhi').as_dict()['cultural']]
+    assert len(get_place_catalog('atlantis')) == 0
+
+def test_compiled_catalog_wins_over_bundled_source(fresh_catalogs):
+    compile_place_catalog(PLACES, str(fresh_catalogs / 'delhi'))
+    catalog = get_place_catalog('delhi')
+    assert isinstance(catalog.coords, np.memmap)
+    assert len(catalog) == 3
+    assert get_place_catalog('delhi') is catalog
+
+def test_optimizer_uses_catalog_for_plan_city(fresh_catalogs, optimizer):
+    optimizer.use_catalog('New Delhi')
+    assert 'Lalbagh Botanical Garden' not in [p['name'] for p in optimizer.alternative_places.get('nature', [])]
+    assert 'Red Fort' in [p['name'] for p in optimizer.alternative_places['cultural']]
+    optimizer.use_catalog('Atlantis')
+    assert optimizer.alternative_places == {}
+
+def test_compile_command(fresh_catalogs):
+    call_command('compile_place_catalog', 'Bangalore', 'Agra', out_dir=str(fresh_catalogs))
+    catalog = PlaceCatalog.load(str(fresh_catalogs / 'bangalore'))
+    assert len(catalog) == 25
+    assert list(catalog.as_dict()) == ['cultural', 'nature', 'shopping', 'dining', 'entertainment']
+    assert np.isfinite(np.asarray(catalog.coords)).all()
+    assert os.path.exists(fresh_catalogs / 'agra' / 'meta.json')
@@ -0,0 +1,83 @@
+import pytest
+
+@pytest.fixture
+def itinerary(optimizer):
+    plan = {
+        'day_1': [
+            {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+            {'name': 'Bull Temple', 'location': 'Basavanagudi'},
+            {'name': 'MTR Restaurant', 'location': 'Lalbagh Road'},
+        ],
+        'day_2': [
+            {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+            {'name': 'Bangalore Palace', 'location': 'Palace Road'},
+        ],
+        'day_2_weather': {'condition': 'Sunny'},
+        'day_3': [
+            {'name': 'Ulsoor Lake', 'location': 'Ulsoor'},
+            {'name': 'Commercial Street', 'location': 'Commercial Street'},
+        ],
+    }
+    return optimizer.optimize_itinerary(plan, 'Bangalore')
+
+def test_only_affected_day_is_replanned(optimizer, itinerary):
+    changes = [{'op': 'add', 'day': 'day_2', 'activity': {'name': "St. Mary's Basilica", 'location': 'Shivajinagar'}}]
+    updated, diff = optimizer.reoptimize_itinerary(itinerary, changes, 'Bangalore')
+
+    assert list(diff) == ['day_2']
+    assert updated['day_1'] is itinerary['day_1']
+    assert updated['day_3'] is itinerary['day_3']
+    assert updated['day_2_weather'] == {'condition': 'Sunny'}
+    assert [a['name'] for a in diff['day_2']['added']] == ["St. Mary's Basilica"]
+    assert len(diff['day_2']['order']) == 3
+    assert all('travel_to_next' in a for a in updated['day_2'][:-1])
+    assert 'route_stats' in diff['day_2']
+
+def test_input_itinerary_is_not_mutated(optimizer, itinerary):
+    before = [dict(a) for a in itinerary['day_1']]
+    optimizer.reoptimize_itinerary(itinerary, [{'op': 'remove', 'day': 'day_1', 'index': 0}], 'Bangalore')
+    assert itinerary['day_1'] == before
+
+def test_remove_reports_removed_place(optimizer, itinerary):
+    changes = [{'op': 'remove', 'day': 'day_1', 'name': 'Bull Temple'}]
+    updated, diff = optimizer.reoptimize_itinerary(itinerary, changes, 'Bangalore')
+    assert diff['day_1']['removed'] == ['bull temple|basavanagudi']
+    assert diff['day_1']['added'] == []
+    assert 'Bull Temple' not in [a['name'] for a in updated['day_1']]
+    assert 'travel_to_next' not in updated['day_1'][-1]
+
+def test_move_touches_both_days(optimizer, itinerary):
+    changes = [{'op': 'move', 'from_day': 'day_3', 'to_day': 'day_2', 'name': 'Ulsoor Lake'}]
+    updated, diff = optimizer.reoptimize_itinerary(itinerary, changes, 'Bangalore')
+    assert set(diff) == {'day_2', 'day_3'}
+    assert [a['name'] for a in updated['day_3']] == ['Commercial Street']
+    assert 'Ulsoor Lake' in [a['name'] for a in updated['day_2']]
+
+def test_invalid_changes_raise(optimizer, itinerary):
+    with pytest.raises(ValueError):
+        optimizer.reoptimize_itinerary(itinerary, [{'op': 'swap'}], 'Bangalore')
+    with pytest.raises(ValueError):
+        optimizer.reoptimize_itinerary(itinerary, [{'op': 'remove', 'day': 'day_9', 'index': 0}], 'Bangalore')
+    with pytest.raises(ValueError):
+        optimizer.reoptimize_itinerary(itinerary, [{'op': 'remove', 'day': 'day_1', 'name': 'Nowhere'}], 'Bangalore')
+
+def test_malformed_indices_raise_value_error(optimizer, itinerary):
+    malformed = [
+        {'op': 'remove', 'day': 'day_1', 'index': None},
+        {'op': 'remove', 'day': 'day_1', 'index': 'first'},
+        {'op': 'remove', 'day': 'day_1', 'index': [0]},
+        {'op': 'add', 'day': 'day_1', 'activity': {'name': 'X', 'location': 'X'}, 'position': {'at': 1}},
+        {'op': 'move', 'from_day': 'day_3', 'to_day': 'day_2', 'index': 0, 'position': -1},
+        'remove day_1',
+    ]
+    for change in malformed:
+        with pytest.raises(ValueError):
+            optimizer.reoptimize_itinerary(itinerary, [change], 'Bangalore')
+
+def test_day_without_a_route_drops_stale_stats(optimizer, itinerary):
+    assert 'day_3_route_stats' in itinerary
+    changes = [{'op': 'remove', 'day': 'day_3', 'index': 0}]
+    updated, diff = optimizer.reoptimize_itinerary(itinerary, changes, 'Bangalore')
+    assert len(updated['day_3']) == 1
+    assert 'day_3_route_stats' not in updated
+    assert 'route_stats' not in diff['day_3']
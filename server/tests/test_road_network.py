@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import pytest
+from django.core.management import call_command
+from core.services import road_network
+from core.services.road_network import RoadNetwork, compile_road_graph
+from core.services.local_geocoder import LocalGeocoder
+
+GRID = 5
+SPACING = 0.01  # degrees, roughly 1.1 km
+
+def write_grid(tmp_path):
+    """A 5x5 street grid at 36 km/h (100 s per block) with one slow avenue"""
+    nodes = tmp_path / 'nodes.csv'
+    edges = tmp_path / 'edges.csv'
+    with open(nodes, 'w') as f:
+        f.write('id,lat,lon\n')
+        for r in range(GRID):
+            for c in range(GRID):
+                f.write(f"n{r}_{c},{12.9 + r * SPACING},{77.5 + c * SPACING}\n")
+    with open(edges, 'w') as f:
+        f.write('source,target,length_m,speed_kmh,oneway\n')
+        for r in range(GRID):
+            for c in range(GRID):
+                if c + 1 < GRID:
+                    f.write(f"n{r}_{c},n{r}_{c + 1},1000,36,0\n")
+                if r + 1 < GRID:
+                    speed = 9 if c == 0 else 36
+                    f.write(f"n{r}_{c},n{r + 1}_{c},1000,{speed},0\n")
+    return str(nodes), str(edges)
+
+@pytest.fixture
+def network(tmp_path):
+    nodes, edges = write_grid(tmp_path)
+    compile_road_graph(nodes, edges, str(tmp_path / 'graph'))
+    return RoadNetwork(str(tmp_path / 'graph'))
+
+def node(r, c):
+    return r * GRID + c
+
+def test_compiled_arrays_are_memory_mapped(network):
+    assert isinstance(network.indptr, np.memmap)
+    assert network.n_nodes == GRID * GRID
+    # Stored in the types scipy searches, so the graph reuses the mapped arrays
+    assert network.indptr.dtype == np.int32 and network.weights.dtype == np.float64
+    assert np.shares_memory(network.graph.data, network.weights)
+    assert np.shares_memory(network.graph.indptr, network.indptr)
+
+def test_shortest_time_avoids_slow_avenue(network):
+    # Straight up the slow first column takes 1600 s; the detour via column 1 takes 600 s
+    assert network.shortest_time(node(0, 0), node(4, 0)) == pytest.approx(600)
+    assert network.shortest_time(node(0, 0), node(4, 4)) == pytest.approx(800)
+    assert network.shortest_time(node(2, 2), node(2, 2)) == 0
+
+def test_oneway_edges(tmp_path):
+    (tmp_path / 'nodes.csv').write_text('id,lat,lon\na,0,0\nb,0,0.01\n')
+    (tmp_path / 'edges.csv').write_text('source,target,length_m,speed_kmh,oneway\na,b,1000,36,1\n')
+    compile_road_graph(str(tmp_path / 'nodes.csv'), str(tmp_path / 'edges.csv'), str(tmp_path / 'graph'))
+    network = RoadNetwork(str(tmp_path / 'graph'))
+
+    assert network.shortest_time(0, 1) == pytest.approx(100)
+    assert network.shortest_time(1, 0) == float('inf')
+
+@pytest.mark.parametrize('use_scipy', [True, False])
+def test_time_matrix_matches_point_queries(network, monkeypatch, use_scipy):
+    if not use_scipy:
+        monkeypatch.setattr(road_network, 'csgraph_dijkstra', None)
+    coords = [(12.9, 77.5), (12.94, 77.54), (12.92, 77.51)]
+
+    matrix = network.time_matrix(coords)
+    nodes, access = network.nearest_nodes(coords)
+
+    assert matrix.shape == (3, 3)
+    for i in range(3):
+        for j in range(3):
+            if i != j:
+                expected = network.shortest_time(int(nodes[i]), int(nodes[j])) + access[i] + access[j]
+                assert matrix[i, j] == pytest.approx(expected)
+
+def test_rectangular_time_matrix(network):
+    coords = [(12.9, 77.5), (12.94, 77.54), (12.92, 77.51)]
+    full = network.time_matrix(coords)
+    assert network.time_matrix(coords[:1], coords[1:]) == pytest.approx(full[:1, 1:])
+
+def test_search_widens_for_targets_beyond_the_first_limit(network, monkeypatch):
+    coords = [(12.9, 77.5), (12.94, 77.5)]
+    expected = network.time_matrix(coords)
+    monkeypatch.setattr(road_network, 'SEARCH_SPEED_KMH', 1000.0)
+    monkeypatch.setattr(road_network, 'MIN_SEARCH_SECONDS', 1.0)
+    assert network.time_matrix(coords) == pytest.approx(expected)
+
+def test_nearest_nodes_match_brute_force(network, monkeypatch):
+    rng = np.random.default_rng(1)
+    coords = [(12.9 + rng.uniform(-0.01, 0.05), 77.5 + rng.uniform(-0.01, 0.05)) for _ in range(20)]
+    _, access = network.nearest_nodes(coords)
+    monkeypatch.setattr(road_network, 'cKDTree', None)
+    _, brute_access = network.nearest_nodes(coords)
+    # Ties may pick different nodes, but never a farther one
+    assert access == pytest.approx(brute_access)
+
+def test_optimizer_uses_road_travel_times(network, make_optimizer):
+    optimizer = make_optimizer(local_geocoder=LocalGeocoder(dataset_path=None), road_network=network)
+    optimizer.local_geocoder.add('Start', 'Testville', (12.9, 77.5))
+    optimizer.local_geocoder.add('Finish', 'Testville', (12.94, 77.5))
+    activities = [{'name': 'A', 'location': 'Start'}, {'name': 'B', 'location': 'Finish'}]
+
+    optimizer.add_travel_times(activities, 'Testville')
+
+    assert activities[0]['travel_to_next'] == '10 minutes'
+
+def test_compile_command(tmp_path):
+    nodes, edges = write_grid(tmp_path)
+
+    call_command('compile_road_graph', 'New Town', nodes, edges, '--out-dir', str(tmp_path / 'graphs'))
+
+    assert os.path.exists(tmp_path / 'graphs' / 'new_town' / 'meta.json')
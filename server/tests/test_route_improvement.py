@@ -0,0 +1,74 @@
+import itertools
+import random
+import numpy as np
+import pytest
+from core.services.distance_matrix import haversine_matrix, route_length
+from core.services.route_improvement import improve_route
+
+def random_coords(n, seed):
+    rng = random.Random(seed)
+    return [(12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2) for _ in range(n)]
+
+def best_open_path(matrix, fixed_end=False):
+    n = len(matrix)
+    middle = range(1, n - 1) if fixed_end else range(1, n)
+    best = None
+    for perm in itertools.permutations(middle):
+        route = [0] + list(perm) + ([n - 1] if fixed_end else [])
+        length = route_length(matrix, route)
+        best = length if best is None else min(best, length)
+    return best
+
+def test_improvement_never_lengthens_route():
+    matrix = haversine_matrix(random_coords(12, seed=1))
+    route = list(range(12))
+
+    improved, stats = improve_route(matrix, route)
+
+    assert sorted(improved) == route
+    assert improved[0] == 0
+    assert stats['final_length'] <= stats['initial_length']
+    assert stats['improvement'] == pytest.approx(stats['initial_length'] - stats['final_length'], abs=1e-3)
+    assert stats['converged']
+
+def test_untangles_crossing_route():
+    # A square visited corner-to-corner crosses itself
+    matrix = haversine_matrix([(0, 0), (0, 1), (1, 0), (1, 1)])
+
+    improved, stats = improve_route(matrix, [0, 3, 1, 2])
+
+    assert route_length(matrix, improved) == pytest.approx(best_open_path(matrix))
+    assert stats['improvement'] > 0
+
+@pytest.mark.parametrize('seed', range(5))
+def test_reaches_near_optimal_on_small_instances(seed):
+    matrix = haversine_matrix(random_coords(7, seed))
+
+    improved, _ = improve_route(matrix, list(range(7)))
+
+    assert route_length(matrix, improved) <= best_open_path(matrix) * 1.1
+
+def test_fixed_end_stays_last():
+    matrix = haversine_matrix(random_coords(8, seed=3))
+
+    improved, _ = improve_route(matrix, list(range(8)), fixed_end=True)
+
+    assert improved[0] == 0
+    assert improved[-1] == 7
+
+def test_asymmetric_matrix_deltas_are_exact():
+    rng = np.random.default_rng(0)
+    matrix = rng.random((9, 9)) * 10
+
+    improved, stats = improve_route(matrix, list(range(9)))
+
+    assert stats['final_length'] == pytest.approx(route_length(matrix, improved), abs=1e-3)
+    assert stats['final_length'] <= stats['initial_length']
+
+def test_zero_budget_reports_not_converged():
+    matrix = haversine_matrix(random_coords(30, seed=4))
+
+    improved, stats = improve_route(matrix, list(range(30)), time_budget=0)
+
+    assert sorted(improved) == list(range(30))
+    assert not stats['converged']
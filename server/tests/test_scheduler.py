@@ -0,0 +1,101 @@
+import numpy as np
+from core.services.scheduler import DEFAULT_DURATIONS, DayScheduler, parse_duration, parse_opening_hours, parse_time, format_time
+
+def flat_travel(n, minutes=20):
+    travel = np.full((n, n), float(minutes))
+    np.fill_diagonal(travel, 0)
+    return travel
+
+def test_time_helpers():
+    assert parse_time('09:30') == 570
+    assert format_time(570) == '09:30'
+
+def test_schedule_respects_opening_hours():
+    activities = [
+        {'name': 'Evening Market', 'category': 'shopping', 'opening_hours': '17:00-21:00'},
+        {'name': 'Museum', 'category': 'cultural', 'opening_hours': {'open': '10:00', 'close': '17:00'}},
+        {'name': 'Garden', 'category': 'nature'},
+    ]
+
+    scheduled, unscheduled = DayScheduler().schedule(activities, flat_travel(3))
+
+    assert unscheduled == []
+    times = {a['name']: parse_time(a['time']) for a in scheduled}
+    assert times['Museum'] >= parse_time('10:00')
+    assert parse_time(scheduled[[a['name'] for a in scheduled].index('Museum')]['end_time']) <= parse_time('17:00')
+    assert times['Evening Market'] >= parse_time('17:00')
+    assert [parse_time(a['time']) for a in scheduled] == sorted(times.values())
+
+def test_free_form_opening_hours():
+    assert parse_opening_hours('9 AM - 5 PM') == (540, 1020)
+    assert parse_opening_hours('09:00-17:00 (Mon-Fri)') == (540, 1020)
+    assert parse_opening_hours('10.30am to 6pm') == (630, 1080)
+    assert parse_opening_hours('18:00-02:00') == (1080, 1440)
+    assert parse_opening_hours({'open': '9 AM', 'close': '1 PM'}) == (540, 780)
+    for malformed in ('Closed', 'Open 24 hours', '25:00-26:00', 'Mon-Fri', '', None, {'open': 'dawn', 'close': '17:00'}):
+        assert parse_opening_hours(malformed) is None
+
+def test_malformed_opening_hours_fall_back_to_the_day():
+    activities = [
+        {'name': 'Temple', 'category': 'cultural', 'opening_hours': 'Closed'},
+        {'name': 'Fort', 'category': 'cultural', 'opening_hours': 'Mon-Fri'},
+        {'name': 'Market', 'category': 'shopping', 'opening_hours': '9 AM - 5 PM'},
+    ]
+    scheduler = DayScheduler()
+    assert scheduler.time_windows(activities) == [(540, 1320), (540, 1320), (540, 1020)]
+    scheduled, unscheduled = scheduler.schedule(activities, flat_travel(3))
+    assert unscheduled == [] and len(scheduled) == 3
+
+def test_free_form_durations():
+    assert parse_duration(90) == 90
+    assert parse_duration('45') == 45
+    assert parse_duration('2 hours') == 120
+    assert parse_duration('1.5 hrs') == 90
+    assert parse_duration('1h30m') == 90
+    assert parse_duration('1 hour 30 minutes') == 90
+    for malformed in ('half a day', 'varies', '', None, 0, '-5', True):
+        assert parse_duration(malformed) is None
+    scheduler = DayScheduler()
+    assert scheduler.duration({'category': 'shopping', 'duration': '2 hours'}) == 120
+    assert scheduler.duration({'category': 'shopping', 'duration': 'a while'}) == DEFAULT_DURATIONS['shopping']
+
+def test_meals_land_in_meal_windows():
+    activities = [
+        {'name': 'Lunch Spot', 'category': 'dining'},
+        {'name': 'Dinner Place', 'category': 'dining'},
+        {'name': 'Palace', 'category': 'cultural'},
+    ]
+
+    scheduled, _ = DayScheduler().schedule(activities, flat_travel(3))
+
+    times = {a['name']: parse_time(a['time']) for a in scheduled}
+    assert parse_time('12:00') <= times['Lunch Spot'] <= parse_time('14:30')
+    assert parse_time('19:00') <= times['Dinner Place'] <= parse_time('21:30')
+
+def test_infeasible_activities_are_reported():
+    activities = [
+        {'name': 'Long Tour', 'duration': 600},
+        {'name': 'Another Long Tour', 'duration': 600},
+    ]
+
+    scheduled, unscheduled = DayScheduler().schedule(activities, flat_travel(2))
+
+    assert len(scheduled) == 1
+    assert len(unscheduled) == 1
+
+def test_optimizer_schedules_days(optimizer):
+    itinerary = {
+        'day_1': [
+            {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh', 'description': 'Garden'},
+            {'name': 'MTR Restaurant', 'location': 'Lalbagh Road', 'description': 'Famous restaurant'},
+            {'name': 'Bangalore Palace', 'location': 'Palace Road', 'description': 'Palace', 'duration': '2 hours'},
+        ]
+    }
+
+    optimized = optimizer.optimize_itinerary(itinerary, 'Bangalore', schedule=True)
+
+    times = [a['time'] for a in optimized['day_1']]
+    assert all(times)
+    assert times == sorted(times)
+    meal = next(a for a in optimized['day_1'] if a['name'] == 'MTR Restaurant')
+    assert '12:00' <= meal['time'] <= '14:30'
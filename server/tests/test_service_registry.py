@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from django.test import Client
+from core.services import registry
+from core.services.registry import ServiceRegistry
+from core.services.weather_service import WeatherService
+
+
+@pytest.fixture
+def fresh_registry():
+    registry.get_service_registry().clear()
+    yield registry.get_service_registry()
+    registry.get_service_registry().clear()
+
+
+def test_service_is_built_once_across_threads():
+    services = ServiceRegistry()
+    built = []
+
+    def factory():
+        time.sleep(0.01)
+        built.append(object())
+        return built[-1]
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(services.get('slow', factory))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(service is built[0] for service in seen)
+
+
+def test_failed_factory_is_retried():
+    services = ServiceRegistry()
+    factory = MagicMock(side_effect=[ValueError("API key not found"), 'ready'])
+    with pytest.raises(ValueError):
+        services.get('weather', factory)
+    assert services.get('weather', factory) == 'ready'
+    assert services.get('weather', factory) == 'ready'
+    assert factory.call_count == 2
+
+
+def test_groq_service_borrows_shared_clients(fresh_registry):
+    with patch('core.services.registry.GroqService') as groq, \
+            patch('core.services.registry.WeatherService') as weather, \
+            patch('core.services.registry.TravelPlannerService') as travel:
+        assert registry.get_groq_service() is registry.get_groq_service()
+    groq.assert_called_once_with(weather.return_value, travel.return_value)
+    assert registry.get_weather_service() is weather.return_value
+
+
+def test_chat_requests_share_one_groq_service(fresh_registry):
+    with patch('core.services.registry.GroqService') as groq:
+        groq.return_value.process_message.side_effect = lambda message, conversation: {
+            'reply': 'How many days?', 'state': 'asking_duration',
+            'preferences': {'destination': message}, 'data': {}
+        }
+        client = Client()
+        for city in ('Paris', 'Rome'):
+            response = client.post('/api/chat/process', json.dumps({
+                'message': city, 'currentState': {'state': 'asking_destination'}, 'preferences': {}
+            }), content_type='application/json')
+            assert response.json()['preferences'] == {'destination': city}
+    groq.assert_called_once()
+    conversations = [call.args[1] for call in groq.return_value.process_message.call_args_list]
+    assert [c.state for c in conversations] == ['asking_destination', 'asking_destination']
+    assert conversations[0] is not conversations[1]
+
+
+def test_weather_calls_share_one_session(monkeypatch):
+    monkeypatch.setenv('WEATHER_API_KEY', 'test-key')
+    service = WeatherService()
+    with patch.object(service.session, 'get') as get:
+        get.return_value.json.return_value = {'location': {}, 'current': {}}
+        service.get_weather_info('Paris')
+        service.get_weather_info('Rome')
+    assert get.call_count == 2
+
+
+def test_each_thread_gets_its_own_session(monkeypatch):
+    monkeypatch.setenv('WEATHER_API_KEY', 'test-key')
+    service = WeatherService()
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(service.session))
+    thread.start()
+    thread.join()
+    assert service.session is service.session
+    assert sessions[0] is not service.session
@@ -14,8 +14,11 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'corsheaders',
     'core',
+    'travel_app',
 ]
 
+AUTH_USER_MODEL = 'travel_app.User'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -0,0 +1,65 @@
+import pytest
+from core.services import spatial_index
+from core.services.spatial_index import PlaceIndex, SpatialIndex
+
+POINTS = [(12.97, 77.59), (12.90, 77.60), (13.03, 77.59), (12.99, 77.70)]
+
+@pytest.fixture(params=[True, False], ids=['kdtree', 'linear'])
+def use_tree(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(spatial_index, 'cKDTree', None)
+    return request.param
+
+def test_nearest_point(use_tree):
+    index = SpatialIndex(POINTS)
+    assert index.nearest((12.91, 77.60), lambda i: True) == 1
+    assert index.nearest((13.02, 77.59), lambda i: True) == 2
+
+def test_nearest_skips_rejected_points(use_tree):
+    index = SpatialIndex(POINTS)
+    assert index.nearest((12.91, 77.60), lambda i: i not in (1, 0)) == 2
+    assert index.nearest((12.91, 77.60), lambda i: False) is None
+
+def test_empty_index():
+    assert SpatialIndex([]).nearest((0, 0), lambda i: True) is None
+
+def test_place_index_filters_by_category_and_visited(use_tree):
+    places = [
+        {'name': 'A', 'location': 'a', 'category': 'nature'},
+        {'name': 'B', 'location': 'b', 'category': 'nature'},
+        {'name': 'C', 'location': 'c', 'category': 'dining'},
+    ]
+    identify = lambda p: p['name']
+    index = PlaceIndex(places, POINTS[:3], identify)
+    assert index.nearest('nature', (12.91, 77.60), set())['name'] == 'B'
+    assert index.nearest('nature', (12.91, 77.60), {'B'})['name'] == 'A'
+    assert index.nearest('dining', (12.91, 77.60), {'C'}) is None
+    assert index.nearest('shopping', (12.91, 77.60), set()) is None
+
+def test_place_index_nearest_across_categories(use_tree):
+    places = [
+        {'name': 'A', 'location': 'a', 'category': 'nature'},
+        {'name': 'B', 'location': 'b', 'category': 'dining'},
+        {'name': 'C', 'location': 'c', 'category': 'cultural'},
+    ]
+    index = PlaceIndex(places, POINTS[:3], lambda p: p['name'])
+    assert index.nearest_in(['dining', 'cultural'], (13.02, 77.59), set())['name'] == 'C'
+    assert index.nearest_in(['dining', 'cultural'], (13.02, 77.59), {'C'})['name'] == 'B'
+    assert index.nearest_in(['shopping'], (13.02, 77.59), set()) is None
+
+def test_substitute_is_nearest_to_the_day(optimizer):
+    visited = {optimizer.get_place_identifier({'name': 'Cubbon Park', 'location': 'Cubbon Park'})}
+    # A day around Basavanagudi: Lalbagh is the closest unvisited park
+    near = optimizer.local_geocoder.lookup('Basavanagudi', 'Bangalore')
+    place = optimizer.get_alternative_place('nature', visited, set(), near, 'Bangalore')
+    assert place['name'] == 'Lalbagh Botanical Garden'
+    # Up in Hebbal the lake there wins instead of the first list entry
+    near = optimizer.local_geocoder.lookup('Hebbal', 'Bangalore')
+    place = optimizer.get_alternative_place('nature', visited, set(), near, 'Bangalore')
+    assert place['name'] == 'Hebbal Lake'
+
+def test_substitute_without_location_keeps_list_order(make_optimizer):
+    optimizer = make_optimizer(city='Bangalore')
+    place = optimizer.get_alternative_place('nature', set(), set())
+    assert place['name'] == 'Lalbagh Botanical Garden'
+    assert optimizer.get_alternative_place('nature', set(), {'nature'}) is None
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from core.services.travel_modes import TravelTimeCache, mode_time_matrix, resolve_mode, PROFILES, MODE_SWITCH_MINUTES
+
+DISTANCES = np.array([
+    [0.0, 0.5, 6.0],
+    [0.5, 0.0, 5.5],
+    [6.0, 5.5, 0.0],
+])
+
+def test_resolve_mode_maps_preferences():
+    assert resolve_mode('public') == 'transit'
+    assert resolve_mode('private') == 'car'
+    assert resolve_mode('Walking') == 'walking'
+    assert resolve_mode('mixed') == 'mixed'
+    assert resolve_mode(None) == 'default'
+    assert resolve_mode('hovercraft') == 'default'
+
+def test_default_mode_keeps_city_average_speed():
+    minutes = mode_time_matrix(DISTANCES, 'default')
+    assert minutes[0, 2] == pytest.approx(18.0)
+    assert np.all(np.diag(minutes) == 0)
+
+def test_transit_pays_fixed_wait_per_leg():
+    minutes = mode_time_matrix(DISTANCES, 'transit')
+    assert minutes[0, 1] > PROFILES['transit'].fixed_minutes
+    assert np.all(np.diag(minutes) == 0)
+
+def test_mixed_walks_short_legs_and_rides_long_ones():
+    mixed = mode_time_matrix(DISTANCES, 'mixed')
+    walking = mode_time_matrix(DISTANCES, 'walking')
+    transit = mode_time_matrix(DISTANCES, 'transit')
+    assert mixed[0, 1] == pytest.approx(walking[0, 1])
+    assert mixed[0, 2] == pytest.approx(transit[0, 2] + MODE_SWITCH_MINUTES)
+
+def test_cache_reuses_matrices_per_city_and_mode():
+    cache = TravelTimeCache()
+    coords = [(12.97, 77.59), (12.98, 77.60)]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.zeros((2, 2))
+
+    first = cache.get_or_compute('Bangalore', 'walking', coords, compute)
+    second = cache.get_or_compute(' bangalore ', 'walking', coords, compute)
+    cache.get_or_compute('Bangalore', 'car', coords, compute)
+    assert first is second
+    assert len(calls) == 2
+    assert cache.hits == 1
+    assert not first.flags.writeable
+
+def test_cache_evicts_least_recently_used():
+    cache = TravelTimeCache(size=1)
+    cache.get_or_compute('a', 'car', [(0, 0)], lambda: np.zeros((1, 1)))
+    cache.get_or_compute('b', 'car', [(0, 0)], lambda: np.zeros((1, 1)))
+    assert len(cache._entries) == 1
+
+def test_travel_to_next_uses_transport_mode(make_optimizer):
+    activities = [
+        {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+        {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+    ]
+    default = [dict(a) for a in activities]
+    walking = [dict(a) for a in activities]
+    make_optimizer().add_travel_times(default, 'Bangalore')
+    make_optimizer(transport_mode='walking').add_travel_times(walking, 'Bangalore')
+    assert int(walking[0]['travel_to_next'].split()[0]) > int(default[0]['travel_to_next'].split()[0])
+
+def test_mode_routes_on_travel_time(make_optimizer):
+    optimizer = make_optimizer(transport_mode='public')
+    coords = [(12.9716, 77.5946), (12.9507, 77.5848), (12.9763, 77.5929)]
+    cost = optimizer.route_cost_matrix(coords, 'Bangalore')
+    assert cost[0, 1] > PROFILES['transit'].fixed_minutes
+    assert optimizer.travel_time_cache.misses == 1
+    optimizer.route_cost_matrix(coords, 'Bangalore')
+    assert optimizer.travel_time_cache.hits == 1
+
+def test_optimize_itinerary_accepts_preference(make_optimizer):
+    optimizer = make_optimizer()
+    itinerary = {'day_1': [
+        {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+        {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+        {'name': 'Bangalore Palace', 'location': 'Palace Road'},
+    ]}
+    result = optimizer.optimize_itinerary(itinerary, 'Bangalore', transport_mode='walking')
+    assert all('travel_to_next' in a for a in result['day_1'][:-1])
+
+def test_requested_mode_does_not_leak_into_later_calls(make_optimizer):
+    optimizer = make_optimizer()
+    itinerary = {'day_1': [
+        {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+        {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+    ]}
+    walking = optimizer.optimize_itinerary(itinerary, 'Bangalore', transport_mode='walking')['day_1'][0]['travel_to_next']
+    assert optimizer.transport_mode == 'default'
+    later = optimizer.optimize_itinerary(itinerary, 'Bangalore')
+    expected = make_optimizer().optimize_itinerary(itinerary, 'Bangalore')
+    assert later['day_1'][0]['travel_to_next'] == expected['day_1'][0]['travel_to_next'] != walking
+
+    changes = [{'op': 'move', 'from_day': 'day_1', 'to_day': 'day_1', 'index': 1, 'position': 0}]
+    optimizer.reoptimize_itinerary(later, changes, 'Bangalore', transport_mode='car')
+    assert optimizer.transport_mode == 'default'
@@ -54,7 +54,7 @@ def test_extract_activity_preference(travel_service):
         assert len(preferences) == 2
         assert preferences == ['cultural', 'museums']
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_places(mock_get, travel_service):
     mock_location_response = MagicMock()
     mock_location_response.status_code = 200
@@ -89,7 +89,7 @@ def test_get_places(mock_get, travel_service):
     assert len(result) == 1
     assert result[0]['name'] == 'Test Place'
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_attractions(mock_get, travel_service):
     mock_location_response = MagicMock()
     mock_location_response.status_code = 200
@@ -124,7 +124,7 @@ def test_get_attractions(mock_get, travel_service):
     assert len(result) == 1
     assert result[0]['name'] == 'Test Attraction'
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_restaurants(mock_get, travel_service):
     mock_location_response = MagicMock()
     mock_location_response.status_code = 200
@@ -159,7 +159,7 @@ def test_get_restaurants(mock_get, travel_service):
     assert len(result) == 1
     assert result[0]['name'] == 'Test Restaurant'
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_travel_plan(mock_get, travel_service):
     mock_location_response = MagicMock()
     mock_location_response.status_code = 200
@@ -196,7 +196,7 @@ def test_get_travel_plan(mock_get, travel_service):
     assert 'budget' in result
     assert result['budget'] == 'medium'
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_location_id(mock_get, travel_service):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -38,14 +38,14 @@ def test_get_places_success(travel_service):
         ]
     }
 
-    with patch('requests.get', side_effect=[mock_location_response, mock_places_response]):
+    with patch('requests.Session.get', side_effect=[mock_location_response, mock_places_response]):
         result = travel_service.get_places('Paris', 'attractions')
         assert result is not None
         assert len(result) == 1
         assert result[0]['name'] == 'Test Place'
 
 def test_get_places_error(travel_service):
-    with patch('requests.get', side_effect=Exception('API Error')):
+    with patch('requests.Session.get', side_effect=Exception('API Error')):
         result = travel_service.get_places('InvalidCity', 'attractions')
         assert result == []
 
@@ -79,7 +79,7 @@ def test_get_attractions_success(travel_service):
         ]
     }
 
-    with patch('requests.get', side_effect=[mock_location_response, mock_attractions_response]):
+    with patch('requests.Session.get', side_effect=[mock_location_response, mock_attractions_response]):
         result = travel_service.get_attractions('Paris')
         assert result is not None
         assert len(result) == 1
@@ -115,7 +115,7 @@ def test_generate_itinerary_success(travel_service):
         ]
     }
 
-    with patch('requests.get', side_effect=[mock_location_response, mock_places_response]):
+    with patch('requests.Session.get', side_effect=[mock_location_response, mock_places_response]):
         result = travel_service.generate_itinerary('Paris', 3, 'medium', ['culture'])
         assert result is not None
         assert 'itinerary' in result
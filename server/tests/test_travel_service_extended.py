@@ -31,7 +31,7 @@ def test_get_places_with_filters(travel_service):
         ]
     }
     
-    with patch('requests.get', side_effect=[location_mock, places_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, places_mock]):
         places = travel_service.get_places('Paris', 'attractions')
         assert len(places) == 1
         assert places[0]['name'] == 'Eiffel Tower'
@@ -47,7 +47,7 @@ def test_get_places_empty_response(travel_service):
     places_mock = MagicMock()
     places_mock.json.return_value = {'data': []}
     
-    with patch('requests.get', side_effect=[location_mock, places_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, places_mock]):
         places = travel_service.get_places('NonexistentCity', 'attractions')
         assert len(places) == 0
 
@@ -73,8 +73,8 @@ def test_get_restaurants_with_cuisine(travel_service, mocker):
         ]
     }
     
-    # Setup mock for requests.get
-    mock_get = mocker.patch('requests.get')
+    # Setup mock for Session.get
+    mock_get = mocker.patch('requests.Session.get')
     mock_get.side_effect = [location_response, restaurant_response]
     
     restaurants = travel_service.get_restaurants('Paris')
@@ -107,7 +107,7 @@ def test_generate_itinerary_with_preferences(travel_service):
         ]
     }
     
-    with patch('requests.get', side_effect=[location_mock, places_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, places_mock]):
         itinerary = travel_service.generate_itinerary(
             destination='Paris',
             days=2,
@@ -136,7 +136,7 @@ def test_fetch_destination_info(travel_service):
         'location_string': 'Paris, France'
     }
 
-    with patch('requests.get', side_effect=[location_mock, details_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, details_mock]):
         info = travel_service.fetch_destination_info('Paris')
         assert info is not None
         assert info['name'] == 'Paris'
@@ -163,7 +163,7 @@ def test_get_attractions(travel_service):
         ]
     }
 
-    with patch('requests.get', side_effect=[location_mock, attractions_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, attractions_mock]):
         attractions = travel_service.get_attractions('Paris')
         assert len(attractions) == 1
         assert attractions[0]['name'] == 'Eiffel Tower'
@@ -253,7 +253,7 @@ def test_determine_conversation_state_flow(travel_service):
 def test_get_travel_plan_comprehensive(travel_service):
     """Test comprehensive travel plan generation"""
     # Mock get_places to return test data
-    with patch('requests.get') as mock_requests:
+    with patch('requests.Session.get') as mock_requests:
         mock_location = MagicMock()
         mock_location.status_code = 200
         mock_location.json.return_value = {
@@ -923,7 +923,7 @@ def test_create_day_activities_edge_cases(travel_service):
 def test_api_error_handling(travel_service, mocker):
     """Test API error handling scenarios"""
     # Test API request failure
-    mock_get = mocker.patch('requests.get')
+    mock_get = mocker.patch('requests.Session.get')
     mock_get.side_effect = requests.exceptions.RequestException("API Error")
     
     result = travel_service._get_location_id("NonexistentCity")
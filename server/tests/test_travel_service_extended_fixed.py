@@ -30,7 +30,7 @@ def test_get_places_with_filters(travel_service):
         ]
     }
     
-    with patch('requests.get', side_effect=[location_mock, places_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, places_mock]):
         places = travel_service.get_places('Paris', 'attractions')
         assert len(places) == 1
         assert places[0]['name'] == 'Eiffel Tower'
@@ -46,13 +46,13 @@ def test_get_places_empty_response(travel_service):
     places_mock = MagicMock()
     places_mock.json.return_value = {'data': []}
     
-    with patch('requests.get', side_effect=[location_mock, places_mock]):
+    with patch('requests.Session.get', side_effect=[location_mock, places_mock]):
         places = travel_service.get_places('NonexistentCity', 'attractions')
         assert len(places) == 0
 
 def test_get_restaurants_with_cuisine(travel_service):
     """Test getting restaurants with cuisine information"""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         location_response = MagicMock()
         location_response.json.return_value = {
             'data': [{'result_object': {'location_id': '12345'}}]
@@ -79,7 +79,7 @@ def test_get_restaurants_with_cuisine(travel_service):
 
 def test_generate_itinerary_with_preferences(travel_service):
     """Test itinerary generation with user preferences"""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         location_response = MagicMock()
         location_response.json.return_value = {
             'data': [{'result_object': {'location_id': '12345'}}]
@@ -30,10 +30,9 @@ def test_plan_travel_get_invalid_days(client):
 
 def test_plan_travel_post_success(client):
     """Test successful POST request for travel planning"""
-    with patch('core.views.travel_views.TravelPlannerService') as MockService:
-        # Create a mock instance with the required api_key parameter
+    with patch('core.views.travel_views.get_travel_service') as get_service:
         mock_instance = MagicMock()
-        MockService.return_value = mock_instance
+        get_service.return_value = mock_instance
         mock_instance.generate_itinerary.return_value = {
             'itinerary': 'Day 1: Visit Eiffel Tower',
             'weather': {'temperature': 20, 'condition': 'Sunny'}
@@ -84,10 +83,9 @@ def test_plan_travel_post_invalid_json(client):
 
 def test_plan_travel_post_service_error(client):
     """Test POST request when service returns an error"""
-    with patch('core.views.travel_views.TravelPlannerService') as MockService:
-        # Create a mock instance with the required api_key parameter
+    with patch('core.views.travel_views.get_travel_service') as get_service:
         mock_instance = MagicMock()
-        MockService.return_value = mock_instance
+        get_service.return_value = mock_instance
         mock_instance.generate_itinerary.return_value = {
             'error': 'Service unavailable'
         }
@@ -105,3 +103,57 @@ def test_plan_travel_post_service_error(client):
         assert response.status_code == 400
         data = response.json()
         assert data['error'] == 'Service unavailable'
+
+def test_reoptimize_travel_returns_diff(client):
+    """Test re-planning a single edited day"""
+    itinerary = {
+        'day_1': [
+            {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+            {'name': 'Cubbon Park', 'location': 'Cubbon Park'}
+        ],
+        'day_2': [{'name': 'Ulsoor Lake', 'location': 'Ulsoor'}]
+    }
+    data = {
+        'itinerary': itinerary,
+        'city': 'Bangalore',
+        'changes': [{'op': 'remove', 'day': 'day_1', 'name': 'Cubbon Park'}]
+    }
+    response = client.post('/api/travel/reoptimize', json.dumps(data), content_type='application/json')
+    assert response.status_code == 200
+    result = response.json()
+    assert list(result['diff']) == ['day_1']
+    assert [a['name'] for a in result['itinerary']['day_1']] == ['Lalbagh Botanical Garden']
+
+def test_reoptimize_travel_invalid_change(client):
+    """Test re-planning with an unknown day"""
+    data = {
+        'itinerary': {'day_1': []},
+        'city': 'Bangalore',
+        'changes': [{'op': 'remove', 'day': 'day_5', 'index': 0}]
+    }
+    response = client.post('/api/travel/reoptimize', json.dumps(data), content_type='application/json')
+    assert response.status_code == 400
+    assert response.json()['error'] == 'Unknown day: day_5'
+
+def test_reoptimize_travel_malformed_index(client):
+    """Test re-planning with a non-numeric activity index"""
+    data = {
+        'itinerary': {'day_1': [{'name': 'Cubbon Park', 'location': 'Cubbon Park'}]},
+        'city': 'Bangalore',
+        'changes': [{'op': 'remove', 'day': 'day_1', 'index': None}]
+    }
+    response = client.post('/api/travel/reoptimize', json.dumps(data), content_type='application/json')
+    assert response.status_code == 400
+    assert response.json()['error'] == 'Invalid index: None'
+
+def test_plan_multi_city_requires_cities(client):
+    """Test multi-city planning without cities"""
+    response = client.post('/api/travel/multi-city', json.dumps({'cities': [], 'days': 3}), content_type='application/json')
+    assert response.status_code == 400
+    assert response.json()['error'] == 'At least one city is required'
+
+def test_plan_multi_city_rejects_long_trips(client):
+    """Test multi-city planning beyond the longest trip accepted"""
+    response = client.post('/api/travel/multi-city', json.dumps({'cities': ['Delhi'], 'days': 10000}), content_type='application/json')
+    assert response.status_code == 400
+    assert response.json()['error'] == 'At most 30 days can be planned in one trip'
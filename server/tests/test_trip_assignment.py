@@ -0,0 +1,89 @@
+import itertools
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from core.services.min_cost_flow import MinCostFlow
+from core.services.trip_assignment import Candidate, TripAssigner
+
+HERE = (12.97, 77.59)
+
+
+def candidate(name, category, rating=4.0, coords=HERE, day=0, alternative=False):
+    return Candidate({'name': name, 'location': name, 'rating': rating}, category, coords, day, alternative)
+
+
+def test_min_cost_flow_matches_brute_force_assignment():
+    rng = np.random.default_rng(5)
+    cost = rng.integers(0, 50, size=(5, 5)).astype(float)
+    flow = MinCostFlow(12)
+    edges = {}
+    for i in range(5):
+        flow.add_edge(0, 2 + i, 1, 0.0)
+        flow.add_edge(7 + i, 1, 1, 0.0)
+        for j in range(5):
+            edges[i, j] = flow.add_edge(2 + i, 7 + j, 1, cost[i, j])
+    sent, total = flow.solve(0, 1)
+    best = min(sum(cost[i, p[i]] for i in range(5)) for p in itertools.permutations(range(5)))
+    assert sent == 5
+    assert total == pytest.approx(best)
+    assert sum(flow.flow(edge) for edge in edges.values()) == 5
+
+def test_min_cost_flow_rejects_negative_costs():
+    with pytest.raises(ValueError):
+        MinCostFlow(2).add_edge(0, 1, 1, -1.0)
+
+def test_outdoor_places_avoid_rainy_days():
+    candidates = [candidate('Park', 'nature', day=1), candidate('Museum', 'cultural', day=0)]
+    assigned = TripAssigner().assign(candidates, [1, 1], bad_weather=[False, True])
+    assert assigned == [[0], [1]]
+
+def test_categories_are_capped_and_balanced():
+    candidates = [candidate(f"Park {i}", 'nature', rating=5.0) for i in range(2)]
+    candidates += [candidate(f"Museum {i}", 'cultural', rating=5.0) for i in range(2)]
+    assigned = TripAssigner(max_per_category=2).assign(candidates, [2, 2])
+    # Putting both parks on one day costs a balance penalty, so each day gets one of each
+    for day in assigned:
+        assert sorted(candidates[i].category for i in day) == ['cultural', 'nature']
+
+    capped = TripAssigner(max_per_category=1).assign(candidates[:2] + candidates[2:3], [3])
+    assert sorted(candidates[i].category for i in capped[0]) == ['cultural', 'nature']
+
+def test_top_places_are_shared_across_days():
+    # Streaming the days in order would let day 1 take both top places
+    candidates = [candidate('Top A', 'cultural', rating=5.0), candidate('Top B', 'cultural', rating=5.0)]
+    candidates += [candidate(f"Fair {i}", category, rating=3.0) for i, category in enumerate(['nature', 'shopping', 'dining'])]
+    assigned = TripAssigner().assign(candidates, [2, 2])
+    assert all(len(day) == 2 for day in assigned)
+    assert [sum(candidates[i].rating(4.0) == 5.0 for i in day) for day in assigned] == [1, 1]
+
+def test_distance_keeps_places_near_their_day():
+    far = (13.10, 77.70)
+    candidates = [
+        candidate('Near 1', 'cultural', day=0), candidate('Near 2', 'nature', day=0),
+        candidate('Far 1', 'cultural', coords=far, day=1), candidate('Far 2', 'nature', coords=far, day=1),
+    ]
+    assigned = TripAssigner().assign(candidates, [2, 2])
+    assert [sorted(day) for day in assigned] == [[0, 1], [2, 3]]
+
+def test_optimizer_global_assignment_fills_duplicates_from_catalog(make_optimizer):
+    optimizer = make_optimizer(geocoder=Mock(geocode=Mock(return_value=(True, None))))
+    itinerary = {
+        'day_1': [
+            {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+            {'name': 'Bangalore Palace', 'location': 'Bangalore Palace'},
+        ],
+        'day_2': [
+            {'name': 'Cubbon Park', 'location': 'Cubbon Park'},
+            {'name': 'Lalbagh Botanical Garden', 'location': 'Lalbagh'},
+        ],
+        'day_2_weather': {'condition': 'Heavy rain'},
+    }
+    result = optimizer.optimize_itinerary(itinerary, 'Bangalore', global_assignment=True)
+
+    names = [a['name'] for day in ('day_1', 'day_2') for a in result[day]]
+    assert len(result['day_1']) == 2 and len(result['day_2']) == 2
+    assert len(set(names)) == 4
+    assert 'Cubbon Park' in names and 'Bangalore Palace' in names
+    assert all(a['category'] != 'nature' for a in result['day_2'])
+    assert any(a.get('note') == 'Suggested to balance the trip' for a in result['day_2'])
+    assert result['day_2_weather'] == {'condition': 'Heavy rain'}
@@ -62,6 +62,57 @@ def test_process_chat_view_options(client):
     response = client.options('/api/chat/process')
     assert response.status_code == 200
 
+def test_process_chat_stream_view(client):
+    with patch('core.views.chat_views.get_groq_service') as get_service:
+        get_service.return_value.stream_message.return_value = iter([
+            ('status', {'stage': 'fetching_sources'}),
+            ('token', {'text': 'Day 1: '}),
+            ('token', {'text': 'Eiffel Tower'}),
+            ('done', {
+                'reply': 'Day 1: Eiffel Tower',
+                'state': 'complete',
+                'data': {'itinerary': 'Day 1: Eiffel Tower', 'weather_data': [], 'attractions': [], 'restaurants': []},
+                'preferences': {'destination': 'Paris'}
+            }),
+        ])
+        data = {
+            'message': 'luxury',
+            'currentState': {'state': 'asking_budget'},
+            'preferences': {'destination': 'Paris'}
+        }
+        response = client.post('/api/chat/process/stream',
+                             json.dumps(data),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/event-stream'
+        body = b''.join(response.streaming_content).decode()
+        events = [
+            (block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+            for block in body.strip().split('\n\n')
+        ]
+        assert events[0] == ('status', {'stage': 'fetching_sources'})
+        assert events[1] == ('token', {'text': 'Day 1: '})
+        assert events[-1][0] == 'done'
+        assert events[-1][1]['message'] == 'Day 1: Eiffel Tower'
+        assert events[-1][1]['currentState']['state'] == 'complete'
+        assert 'attractions' in events[-1][1]['currentState']['data']
+        conversation = get_service.return_value.stream_message.call_args.args[1]
+        assert conversation.state == 'asking_budget'
+
+def test_process_chat_stream_view_invalid_json(client):
+    response = client.post('/api/chat/process/stream',
+                         'invalid json',
+                         content_type='application/json')
+    assert response.status_code == 500
+
+def test_process_chat_stream_view_malformed_state(client):
+    response = client.post('/api/chat/process/stream',
+                         json.dumps({'message': 'Paris', 'currentState': 'asking_destination'}),
+                         content_type='application/json')
+    assert response.status_code == 500
+    assert 'error' in response.json()
+
 def test_send_itinerary_email_success(client, mock_smtp):
     with patch.dict(os.environ, {
         'SMTP_USERNAME': 'test@example.com',
@@ -0,0 +1,100 @@
+import pytest
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+from django.core.management import call_command
+from travel_app.models import Activity, DayPlan, Itinerary, User
+from travel_app.services.weather_replanning import WeatherReplanner
+
+TODAY = date(2026, 7, 1)
+
+SUNNY = {'condition': 'Sunny', 'temp_c': 28}
+
+
+def make_trip(user, destination, start, days, activities, status='planned'):
+    trip = Itinerary.objects.create(
+        user=user, title=f"{destination} trip", destination=destination, start_date=start,
+        end_date=start + timedelta(days=days - 1), budget='medium', status=status
+    )
+    for number in range(1, days + 1):
+        day = DayPlan.objects.create(itinerary=trip, day_number=number, weather=SUNNY)
+        for name, location, category in activities.get(number, []):
+            Activity.objects.create(day_plan=day, name=name, location=location, time='10:00', category=category)
+    return trip
+
+
+def forecast(conditions):
+    """Fake WeatherService.get_forecast returning conditions[city] for consecutive days from TODAY"""
+    def get_forecast(city, days):
+        return [
+            {'day': (TODAY + timedelta(days=i)).isoformat(), 'condition': condition, 'temp_c': 24}
+            for i, condition in enumerate(conditions.get(city, [])[:days])
+        ]
+    service = Mock()
+    service.get_forecast.side_effect = get_forecast
+    return service
+
+
+@pytest.fixture
+def optimizer(make_optimizer):
+    optimizer = make_optimizer()
+    with patch.object(optimizer.geocoder, 'geocode', return_value=(True, None)):
+        yield optimizer
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='traveller', email='traveller@example.com', password='secret')
+
+
+@pytest.mark.django_db
+def test_only_days_turning_rainy_are_replanned(user, optimizer):
+    rainy_trip = make_trip(user, 'Bangalore', TODAY + timedelta(days=1), 3, {
+        1: [('Cubbon Park', 'Cubbon Park', 'nature'), ('Bangalore Palace', 'Bangalore Palace', 'cultural')],
+        2: [('Lalbagh Botanical Garden', 'Lalbagh', 'nature')],
+    })
+    make_trip(user, 'bangalore', TODAY, 1, {1: [('Ulsoor Lake', 'Ulsoor Lake', 'nature')]})
+    make_trip(user, 'Bangalore', TODAY, 2, {1: [('Hebbal Lake', 'Hebbal Lake', 'nature')]}, status='completed')
+    weather = forecast({'Bangalore': ['Sunny', 'Moderate rain', 'Sunny', 'Partly cloudy']})
+
+    stats = WeatherReplanner(weather, optimizer).run(TODAY)
+
+    assert weather.get_forecast.call_count == 1
+    assert stats == {'cities': 1, 'trips': 2, 'days_changed': 2, 'days_replanned': 1, 'activities_swapped': 1}
+
+    day_1, day_2, day_3 = rainy_trip.days.all()
+    assert day_1.weather['condition'] == 'Moderate rain'
+    assert day_3.weather['condition'] == 'Partly cloudy'
+    swapped = day_1.activities.get(time='10:00', description__startswith='Indoor alternative')
+    assert swapped.description == 'Indoor alternative to Cubbon Park (moderate rain forecast)'
+    assert swapped.category in ('cultural', 'entertainment')
+    # The palace is already part of the trip, so it is not offered again
+    assert swapped.name != 'Bangalore Palace'
+    assert [a.name for a in day_2.activities.all()] == ['Lalbagh Botanical Garden']
+
+    # Nothing is left to change on a second run
+    assert WeatherReplanner(weather, optimizer).run(TODAY)['days_changed'] == 0
+
+
+@pytest.mark.django_db
+def test_days_outside_forecast_are_ignored(user, optimizer):
+    make_trip(user, 'Delhi', TODAY + timedelta(days=30), 2, {1: [('Lodhi Garden', 'Lodhi Garden', 'nature')]})
+    make_trip(user, 'Delhi', TODAY - timedelta(days=5), 2, {1: [('Lodhi Garden', 'Lodhi Garden', 'nature')]})
+    weather = forecast({'Delhi': ['Heavy rain'] * 10})
+
+    stats = WeatherReplanner(weather, optimizer).run(TODAY)
+
+    assert stats['trips'] == 0
+    weather.get_forecast.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_replan_for_weather_command(user, capsys):
+    with patch('travel_app.management.commands.replan_for_weather.WeatherService') as service, \
+            patch('travel_app.management.commands.replan_for_weather.WeatherReplanner') as replanner:
+        replanner.return_value.run.return_value = {
+            'cities': 1, 'trips': 2, 'days_changed': 1, 'days_replanned': 1, 'activities_swapped': 2
+        }
+        call_command('replan_for_weather', '--date', '2026-07-01', '--horizon', '5')
+    replanner.assert_called_once_with(service.return_value, horizon_days=5)
+    replanner.return_value.run.assert_called_once_with(date(2026, 7, 1))
+    assert '2 activities moved indoors' in capsys.readouterr().out
@@ -39,7 +39,7 @@ def test_get_forecast_success(weather_service):
     }
     mock_response.status_code = 200
 
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         result = weather_service.get_forecast('Paris', 1)
         assert result is not None
         assert len(result) == 1
@@ -49,7 +49,7 @@ def test_get_forecast_success(weather_service):
         assert result[0]['condition'] == 'Sunny'
 
 def test_get_forecast_error(weather_service):
-    with patch('requests.get', side_effect=requests.RequestException('API Error')):
+    with patch('requests.Session.get', side_effect=requests.RequestException('API Error')):
         result = weather_service.get_forecast('InvalidCity', 1)
         assert result == []
 
@@ -96,12 +96,12 @@ def test_get_weather_info_success(weather_service):
     }
     mock_response.status_code = 200
 
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         result = weather_service.get_weather_info('Paris')
         assert result['location']['name'] == 'Paris'
         assert result['current']['temp_c'] == 20
 
 def test_get_weather_info_error(weather_service):
-    with patch('requests.get', side_effect=requests.RequestException('API Error')):
+    with patch('requests.Session.get', side_effect=requests.RequestException('API Error')):
         result = weather_service.get_weather_info('InvalidCity')
         assert 'error' in result
@@ -40,7 +40,7 @@ def mock_response():
 
 def test_weather_service_get_info(mock_response):
     """Test weather service get_weather_info method"""
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         service = WeatherService()
         weather_data = service.get_weather_info('Paris')
         
@@ -54,14 +54,14 @@ def test_weather_service_get_info_failure():
     mock_error_response.status_code = 404
     mock_error_response.raise_for_status.side_effect = requests.exceptions.HTTPError('City not found')
     
-    with patch('requests.get', return_value=mock_error_response):
+    with patch('requests.Session.get', return_value=mock_error_response):
         service = WeatherService()
         weather_data = service.get_weather_info('NonexistentCity')
         assert weather_data == {'error': 'City not found'}
 
 def test_weather_service_get_info_error():
     """Test weather service error handling"""
-    with patch('requests.get', side_effect=requests.exceptions.RequestException('API Error')):
+    with patch('requests.Session.get', side_effect=requests.exceptions.RequestException('API Error')):
         service = WeatherService()
         weather_data = service.get_weather_info('Paris')
         assert weather_data == {'error': 'API Error'}
@@ -85,7 +85,7 @@ def test_weather_service_partial_data():
         }
     }
     
-    with patch('requests.get', return_value=mock_partial_response):
+    with patch('requests.Session.get', return_value=mock_partial_response):
         service = WeatherService()
         weather_data = service.get_weather_info('Paris')
         
@@ -105,7 +105,7 @@ def test_weather_service_empty_response():
         'current': {}
     }
     
-    with patch('requests.get', return_value=mock_empty_response):
+    with patch('requests.Session.get', return_value=mock_empty_response):
         service = WeatherService()
         weather_data = service.get_weather_info('Paris')
         assert 'location' in weather_data
@@ -126,7 +126,7 @@ def test_weather_service_api_error_handling():
         'current': {'temp_c': 25}
     }
     
-    with patch('requests.get', side_effect=[mock_timeout, mock_success]):
+    with patch('requests.Session.get', side_effect=[mock_timeout, mock_success]):
         service = WeatherService()
         # First call should return error due to timeout
         weather_data = service.get_weather_info('Paris')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from travel_app.services.batch_reoptimizer import CHUNK_SIZE, BatchReoptimizer
+
+
+class Command(BaseCommand):
+    help = 'Re-optimize saved itineraries in bulk, city by city'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--city', action='append', dest='cities', help='Only this city (repeatable)')
+        parser.add_argument('--workers', type=int, default=8, help='Itineraries optimized in parallel')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Itineraries written back per batch')
+        parser.add_argument('--mode', dest='transport_mode', help='Transport mode to route with')
+
+    def handle(self, *args, **options):
+        optimizer = BatchReoptimizer(
+            max_workers=options['workers'], chunk_size=options['chunk_size'], transport_mode=options['transport_mode']
+        )
+        stats = optimizer.run(options['cities'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-optimized {stats['itineraries']} itineraries in {stats['cities']} cities "
+            f"({stats['itineraries_per_second']} itineraries/s): "
+            f"{stats['activities_updated']} activities updated, {stats['activities_unmatched']} left as saved"
+        ))
@@ -0,0 +1,25 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from core.services.weather_service import WeatherService
+from travel_app.services.weather_replanning import FORECAST_DAYS, WeatherReplanner
+
+
+class Command(BaseCommand):
+    help = 'Re-fetch forecasts for upcoming trips and move days that turned rainy indoors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='Day to treat as today (YYYY-MM-DD)')
+        parser.add_argument('--horizon', type=int, default=FORECAST_DAYS, help='Days ahead to check')
+
+    def handle(self, *args, **options):
+        try:
+            weather_service = WeatherService()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        stats = WeatherReplanner(weather_service, horizon_days=options['horizon']).run(options['date'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {stats['trips']} trips in {stats['cities']} cities: "
+            f"{stats['days_changed']} days changed, {stats['days_replanned']} re-planned, "
+            f"{stats['activities_swapped']} activities moved indoors"
+        ))
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from django.db import transaction
+from core.services.itinerary_optimizer import ItineraryOptimizer
+from ..models import Activity, Itinerary
+from .weather_replanning import ACTIVE_STATUSES, city_key
+
+logger = logging.getLogger(__name__)
+
+# Itineraries loaded, optimized and written back together
+CHUNK_SIZE = 200
+
+
+class BatchReoptimizer:
+    """Re-optimizes saved itineraries in bulk, e.g. after a catalog or geocode refresh.
+
+    Itineraries are streamed from the database grouped by city. Each city's
+    locations are geocoded once into a coordinate memo shared by all workers,
+    and its distance (and road) matrices are warmed once in the city's matrix
+    store, so per-itinerary calls only slice what is already loaded. Each
+    group is optimized on a thread pool with one optimizer per worker thread.
+    Results are written back per chunk with bulk updates: activities keep
+    their row and the day's time slots, reordered along the new route, and
+    substitutes overwrite the activity they replace. Rows are never deleted.
+    """
+
+    def __init__(
+        self,
+        optimizer_factory: Callable[[], ItineraryOptimizer] = ItineraryOptimizer,
+        max_workers: int = 8,
+        chunk_size: int = CHUNK_SIZE,
+        statuses: Optional[List[str]] = None,
+        transport_mode: Optional[str] = None
+    ):
+        self.optimizer_factory = optimizer_factory
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.statuses = statuses or ACTIVE_STATUSES
+        self.transport_mode = transport_mode
+
+    def city_groups(self, cities: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        """Stored destination spellings of each city with itineraries to re-optimize"""
+        wanted = {city_key(city) for city in cities} if cities else None
+        groups = defaultdict(set)
+        destinations = Itinerary.objects.filter(status__in=self.statuses).values_list('destination', flat=True).distinct()
+        for destination in destinations.iterator():
+            key = city_key(destination)
+            if key and (wanted is None or key in wanted):
+                groups[key].add(destination)
+        return dict(groups)
+
+    def chunks(self, destinations: Set[str]) -> Iterator[List[Itinerary]]:
+        """A city's itineraries with their days and activities, chunk_size at a time"""
+        ids = Itinerary.objects.filter(
+            destination__in=destinations, status__in=self.statuses
+        ).order_by('id').values_list('id', flat=True)
+        chunk = []
+        for itinerary_id in ids.iterator():
+            chunk.append(itinerary_id)
+            if len(chunk) == self.chunk_size:
+                yield self.load(chunk)
+                chunk = []
+        if chunk:
+            yield self.load(chunk)
+
+    def load(self, ids: List) -> List[Itinerary]:
+        return list(Itinerary.objects.filter(id__in=ids).prefetch_related('days__activities'))
+
+    def prepare_city(self, optimizer: ItineraryOptimizer, destinations: Set[str], city: str):
+        """Geocode every location planned in the city once and warm its matrices"""
+        locations = list(Activity.objects.filter(
+            day_plan__itinerary__destination__in=destinations,
+            day_plan__itinerary__status__in=self.statuses
+        ).values_list('location', flat=True).distinct())
+        optimizer.use_catalog(city)
+        optimizer.prefetch_coordinates(locations, city)
+
+        # Without a persistent store there is nothing to warm; days slice their own small matrices
+        if optimizer.get_matrix_store(city) is None:
+            return
+        located = [(location, optimizer.get_coordinates(location, city)) for location in locations]
+        located = [(location, coords) for location, coords in located if coords]
+        if len(located) > 1:
+            optimizer.mode_time_matrix(
+                [coords for _, coords in located], city, [optimizer.place_id(location) for location, _ in located]
+            )
+
+    def itinerary_plan(self, itinerary: Itinerary) -> Dict:
+        """Saved itinerary in the shape optimize_itinerary takes"""
+        plan = {}
+        for day in itinerary.days.all():
+            plan[f"day_{day.day_number}"] = [
+                {
+                    'id': activity.id,
+                    'name': activity.name,
+                    'location': activity.location,
+                    'description': activity.description,
+                    'category': activity.category,
+                    'time': activity.time
+                }
+                for activity in day.activities.all()
+            ]
+            plan[f"day_{day.day_number}_weather"] = day.weather
+        return plan
+
+    def apply(self, itinerary: Itinerary, optimized: Dict) -> Tuple[List[Activity], int]:
+        """Changed activities for an optimized plan, and how many saved ones it left out.
+
+        Activities the optimizer dropped (e.g. over a category cap with no
+        alternative in the catalog) are left untouched; a background job never
+        deletes what the user saved.
+        """
+        changed, unmatched = [], 0
+        for day in itinerary.days.all():
+            activities = {activity.id: activity for activity in day.activities.all()}
+            matched = []
+            for planned in optimized.get(f"day_{day.day_number}", []):
+                activity = activities.get(planned.get('id'))
+                if activity is not None and all(activity is not other for other, _ in matched):
+                    matched.append((activity, planned))
+            unmatched += len(activities) - len(matched)
+            # Matched activities share their own time slots in route order; the others keep theirs
+            times = sorted(activity.time for activity, _ in matched)
+            for slot, (activity, planned) in zip(times, matched):
+                values = {
+                    'name': planned['name'],
+                    'location': planned['location'],
+                    'category': planned.get('category') or activity.category,
+                    'description': planned.get('note') or activity.description,
+                    'time': slot
+                }
+                if any(getattr(activity, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(activity, field, value)
+                    changed.append(activity)
+        return changed, unmatched
+
+    def optimize_group(self, city: str, destinations: Set[str], stats: Dict):
+        """Optimize one city's itineraries on a worker pool, writing back per chunk"""
+        coordinates = {}
+        local = threading.local()
+
+        def city_optimizer() -> ItineraryOptimizer:
+            if not hasattr(local, 'optimizer'):
+                local.optimizer = self.optimizer_factory()
+                # Workers share one coordinate memo, filled once for the whole city
+                local.optimizer.place_coordinates = coordinates
+            return local.optimizer
+
+        def optimize(itinerary: Itinerary) -> Dict:
+            return city_optimizer().optimize_itinerary(
+                self.itinerary_plan(itinerary), itinerary.destination, transport_mode=self.transport_mode
+            )
+
+        seed = self.optimizer_factory()
+        seed.place_coordinates = coordinates
+        self.prepare_city(seed, destinations, city)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for chunk in self.chunks(destinations):
+                changed, unmatched = [], 0
+                for itinerary, optimized in zip(chunk, pool.map(optimize, chunk)):
+                    activities, left_out = self.apply(itinerary, optimized)
+                    changed += activities
+                    unmatched += left_out
+                with transaction.atomic():
+                    Activity.objects.bulk_update(changed, ['name', 'location', 'category', 'description', 'time'])
+                stats['itineraries'] += len(chunk)
+                stats['activities_updated'] += len(changed)
+                stats['activities_unmatched'] += unmatched
+
+    def run(self, cities: Optional[List[str]] = None) -> Dict:
+        """Re-optimize every active itinerary, or only those in the given cities"""
+        started = time.perf_counter()
+        stats = {'cities': 0, 'itineraries': 0, 'activities_updated': 0, 'activities_unmatched': 0}
+        for destinations in self.city_groups(cities).values():
+            self.optimize_group(sorted(destinations)[0], destinations, stats)
+            stats['cities'] += 1
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['itineraries_per_second'] = round(stats['itineraries'] / elapsed, 2) if elapsed > 0 else 0.0
+        logger.info(f"Batch re-optimization: {stats}")
+        return stats
@@ -0,0 +1,182 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from django.db import transaction
+from django.db.models import F
+from core.services.itinerary_optimizer import ItineraryOptimizer
+from core.services.travel_service import INDOOR_CATEGORIES, OUTDOOR_CATEGORIES, is_bad_weather
+from ..models import Activity, DayPlan, Itinerary
+
+logger = logging.getLogger(__name__)
+
+# WeatherAPI forecasts reach this many days ahead
+FORECAST_DAYS = 10
+
+# Categories the optimizer assigns; anything else is re-classified from the text
+KNOWN_CATEGORIES = {'cultural', 'nature', 'shopping', 'dining', 'entertainment'}
+
+ACTIVE_STATUSES = ['planned', 'ongoing']
+
+
+def city_key(city: str) -> str:
+    return ' '.join((city or '').lower().split())
+
+
+class WeatherReplanner:
+    """Re-plans saved trips whose forecast has turned bad since they were created.
+
+    Upcoming trips are grouped by destination so each city's forecast is
+    fetched once, and the fetches run concurrently. Stored day weather is
+    compared with the new forecast in one pass. Activities are loaded and
+    re-planned only for days that flipped to bad weather, so the cost follows
+    the number of changed days rather than the number of trips. Outdoor
+    activities on those days are swapped for the nearest unused indoor place
+    from the city's catalog.
+    """
+
+    def __init__(
+        self,
+        weather_service,
+        optimizer: Optional[ItineraryOptimizer] = None,
+        horizon_days: int = FORECAST_DAYS,
+        max_workers: int = 8
+    ):
+        self.weather_service = weather_service
+        self.optimizer = optimizer or ItineraryOptimizer()
+        self.horizon_days = horizon_days
+        self.max_workers = max_workers
+
+    def upcoming_trips(self, today: date) -> Dict[str, List[Itinerary]]:
+        """Active trips overlapping the forecast window, grouped by destination"""
+        last_day = today + timedelta(days=self.horizon_days - 1)
+        trips = Itinerary.objects.filter(
+            status__in=ACTIVE_STATUSES, end_date__gte=today, start_date__lte=last_day
+        ).only('id', 'destination', 'start_date', 'end_date')
+        grouped = defaultdict(list)
+        for trip in trips:
+            grouped[city_key(trip.destination)].append(trip)
+        return dict(grouped)
+
+    def fetch_forecasts(self, grouped: Dict[str, List[Itinerary]], today: date) -> Dict[str, Dict[str, Dict]]:
+        """One forecast per city, indexed by date, long enough for its latest trip"""
+        def fetch(key: str) -> Dict[str, Dict]:
+            trips = grouped[key]
+            days = min(self.horizon_days, (max(trip.end_date for trip in trips) - today).days + 1)
+            forecast = self.weather_service.get_forecast(trips[0].destination, days) or []
+            return {entry['day']: entry for entry in forecast if entry.get('day')}
+
+        keys = list(grouped)
+        if not keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as pool:
+            return dict(zip(keys, pool.map(fetch, keys)))
+
+    def changed_days(
+        self,
+        grouped: Dict[str, List[Itinerary]],
+        forecasts: Dict[str, Dict[str, Dict]],
+        today: date
+    ) -> List[Tuple[DayPlan, Dict]]:
+        """Upcoming days whose forecast condition differs from the stored one"""
+        trips = {trip.id: trip for key in grouped for trip in grouped[key]}
+        changed = []
+        days = DayPlan.objects.filter(itinerary_id__in=list(trips)).only('id', 'itinerary_id', 'day_number', 'weather')
+        for day in days:
+            trip = trips[day.itinerary_id]
+            day_date = trip.start_date + timedelta(days=day.day_number - 1)
+            if day_date < today:
+                continue
+            weather = forecasts.get(city_key(trip.destination), {}).get(day_date.isoformat())
+            if weather and weather.get('condition') != (day.weather or {}).get('condition'):
+                changed.append((day, weather))
+        return changed
+
+    def activity_category(self, activity: Activity) -> str:
+        if activity.category in KNOWN_CATEGORIES:
+            return activity.category
+        return self.optimizer.get_place_category({
+            'name': activity.name, 'location': activity.location, 'description': activity.description
+        })
+
+    def indoor_alternative(self, near: Optional[Tuple[float, float]], used: Set[str]) -> Optional[Dict]:
+        """Closest unused indoor place of the current catalog to near"""
+        if near:
+            place = self.optimizer.get_alternative_index().nearest_in(INDOOR_CATEGORIES, near, used)
+            if place:
+                return place
+        # Without a reference point take the first unused indoor place
+        for category in INDOOR_CATEGORIES:
+            for place in self.optimizer.alternative_places.get(category, []):
+                if self.optimizer.get_place_identifier(place) not in used:
+                    return place
+        return None
+
+    def day_center(self, activities: List[Activity], city: str) -> Optional[Tuple[float, float]]:
+        coords = [self.optimizer.get_coordinates(a.location or a.name, city) for a in activities]
+        coords = [c for c in coords if c]
+        if not coords:
+            return self.optimizer.local_geocoder.city_center(city)
+        return (sum(c[0] for c in coords) / len(coords), sum(c[1] for c in coords) / len(coords))
+
+    def replan_day(self, activities: List[Activity], weather: Dict, used: Set[str], city: str) -> List[Activity]:
+        """Swap a day's outdoor activities for nearby indoor ones; returns the changed activities"""
+        self.optimizer.use_catalog(city)
+        condition = weather.get('condition', '').lower()
+        swapped = []
+        for activity in activities:
+            if self.activity_category(activity) not in OUTDOOR_CATEGORIES:
+                continue
+            near = self.optimizer.get_coordinates(activity.location or activity.name, city)
+            place = self.indoor_alternative(near or self.day_center(activities, city), used)
+            if not place:
+                continue
+            used.add(self.optimizer.get_place_identifier(place))
+            activity.description = f"Indoor alternative to {activity.name} ({condition} forecast)"
+            activity.name = place['name']
+            activity.location = place['location']
+            activity.category = place['category']
+            swapped.append(activity)
+        return swapped
+
+    def run(self, today: Optional[date] = None) -> Dict:
+        """Refresh forecasts for upcoming trips and re-plan the days that turned bad"""
+        today = today or date.today()
+        grouped = self.upcoming_trips(today)
+        forecasts = self.fetch_forecasts(grouped, today)
+        changed = self.changed_days(grouped, forecasts, today)
+
+        # Only days that flipped from good to bad weather need new activities
+        replan = [(day, weather) for day, weather in changed if is_bad_weather(weather) and not is_bad_weather(day.weather)]
+        trip_ids = {day.itinerary_id for day, _ in replan}
+        activities_by_day = defaultdict(list)
+        used_by_trip = defaultdict(set)
+        activities = Activity.objects.filter(day_plan__itinerary_id__in=trip_ids).annotate(trip_id=F('day_plan__itinerary_id'))
+        for activity in activities:
+            activities_by_day[activity.day_plan_id].append(activity)
+            used_by_trip[activity.trip_id].add(
+                self.optimizer.get_place_identifier({'name': activity.name, 'location': activity.location})
+            )
+
+        trips = {trip.id: trip for key in grouped for trip in grouped[key]}
+        swapped = []
+        for day, weather in replan:
+            city = trips[day.itinerary_id].destination
+            swapped += self.replan_day(activities_by_day[day.id], weather, used_by_trip[day.itinerary_id], city)
+
+        for day, weather in changed:
+            day.weather = weather
+        with transaction.atomic():
+            DayPlan.objects.bulk_update([day for day, _ in changed], ['weather'])
+            Activity.objects.bulk_update(swapped, ['name', 'location', 'category', 'description'])
+
+        stats = {
+            'cities': len(grouped),
+            'trips': len(trips),
+            'days_changed': len(changed),
+            'days_replanned': len(replan),
+            'activities_swapped': len(swapped)
+        }
+        logger.info(f"Weather replanning: {stats}")
+        return stats